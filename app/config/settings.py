@@ -12,6 +12,45 @@ MODEL_NAME = "distilbert-base-uncased-finetuned-sst-2-english"
 MAX_LENGTH = 512
 BATCH_SIZE = 32
 
+# Inference precision: "fp32", "int8" (dynamic quantization, CPU only) or "bf16"
+MODEL_PRECISION = "fp32"
+
+# Forward-pass backend: "eager", "torchscript" (torch.jit.trace) or "compile"
+MODEL_BACKEND = "eager"
+
+# (batch size, sequence length) shapes run at startup by non-eager backends so
+# tracing and compilation happen before the first request. Include a batch
+# size of 1 and a larger one, since torch.compile specializes on size 1.
+BACKEND_WARMUP_SHAPES = [(1, 16), (BATCH_SIZE, 128)]
+
+# Models served through the model registry, by key. Each entry holds
+# ModelManager arguments: model_name and optionally labels (label id to name;
+# defaults to the model config's id2label), precision and backend.
+MODEL_REGISTRY = {
+    "sst2": {"model_name": MODEL_NAME}
+}
+DEFAULT_MODEL = "sst2"
+
+# Approximate weight memory the registry may keep loaded before it evicts the
+# least recently used model
+MODEL_MEMORY_BUDGET_BYTES = 2 * 1024 * 1024 * 1024
+
+# Profile written by the autotune command and applied when an analyzer starts
+# on the same host (None disables profiles)
+AUTOTUNE_PROFILE_PATH = "~/.cache/ai-sentiment-analyzer/autotune.json"
+
+# Minimum share of labels a reduced-precision mode must agree with fp32 on
+PRECISION_MIN_AGREEMENT = 0.99
+
+# Long-document scoring: tokens shared by consecutive windows, and how window
+# logits are combined ("mean", "weighted" by window length, or "max_confidence")
+LONG_DOC_STRIDE = 128
+LONG_DOC_AGGREGATION = "mean"
+
+# Pooling of the encoder's last hidden state for embedding export: "cls" (first
+# token) or "mean" (average over non-padding tokens)
+EMBEDDING_POOLING = "cls"
+
 # Sentiment labels
 SENTIMENT_LABELS = {
     0: "NEGATIVE",
@@ -19,4 +58,74 @@ SENTIMENT_LABELS = {
 }
 
 # Confidence threshold for predictions
-CONFIDENCE_THRESHOLD = 0.5 
\ No newline at end of file
+CONFIDENCE_THRESHOLD = 0.5
+
+# Micro-batching settings for the asyncio front end
+MICRO_BATCH_MAX_SIZE = BATCH_SIZE
+MICRO_BATCH_MAX_WAIT_MS = 5
+
+# In-memory result cache settings (set CACHE_MAX_ENTRIES to 0 to disable)
+CACHE_MAX_ENTRIES = 100_000
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Persistent prediction store (SQLite file path, None disables the store)
+PREDICTION_STORE_PATH = None
+
+# Multi-process pool settings (None derives the value from the CPU count)
+POOL_NUM_WORKERS = None
+POOL_THREADS_PER_WORKER = None
+POOL_MAX_RESTARTS = 2
+
+# In-process analyzer pool: concurrent inference slots sharing one model, and
+# the total PyTorch intra-op threads split between them (None uses the CPU count)
+ANALYZER_POOL_SLOTS = 2
+ANALYZER_POOL_THREAD_BUDGET = None
+
+# Pipelined batch execution: overlap tokenization and post-processing with the
+# forward pass, keeping at most PIPELINE_DEPTH batches in flight per stage
+PIPELINE_ENABLED = False
+PIPELINE_DEPTH = 2
+
+# Priority scheduler: lanes from highest to lowest priority, texts per
+# preemptible chunk, and completed requests per lane kept for latency stats
+SCHEDULER_LANES = ("interactive", "batch")
+SCHEDULER_CHUNK_SIZE = BATCH_SIZE
+SCHEDULER_LATENCY_WINDOW = 1000
+
+# Number of equal-width confidence histogram bins kept by SentimentAggregator
+AGGREGATOR_HISTOGRAM_BINS = 100
+
+# Bulk scoring jobs: records analyzed and checkpointed together, and seconds
+# between progress lines
+BULK_BATCH_SIZE = 256
+BULK_PROGRESS_INTERVAL_S = 5.0
+
+# Cascade mode: first-stage confidence needed to skip the transformer, and
+# the hashed n-gram features of the first-stage classifier
+CASCADE_THRESHOLD = 0.9
+CASCADE_NUM_FEATURES = 2 ** 18
+CASCADE_NGRAM_RANGE = (1, 2)
+
+# Record per-stage timings and batch statistics (see app/utils/metrics.py)
+METRICS_ENABLED = False
+
+# Distributed scoring: address the coordinator listens on, texts per batch sent
+# to a worker, batches in flight per worker, heartbeat timing, attempts per
+# batch before a job fails, and an optional shared token workers must present
+DISTRIBUTED_HOST = "127.0.0.1"
+DISTRIBUTED_PORT = 8765
+DISTRIBUTED_BATCH_SIZE = 256
+DISTRIBUTED_MAX_IN_FLIGHT = 2
+DISTRIBUTED_HEARTBEAT_INTERVAL_S = 1.0
+DISTRIBUTED_HEARTBEAT_TIMEOUT_S = 5.0
+DISTRIBUTED_MAX_ATTEMPTS = 3
+DISTRIBUTED_TOKEN = None
+
+# Local HTTP inference server settings
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+SERVER_MAX_QUEUE = 1024
+SERVER_MAX_BATCH_SIZE = BATCH_SIZE
+SERVER_MAX_WAIT_MS = 5
+SERVER_REQUEST_TIMEOUT_S = 10.0
+SERVER_MAX_BODY_BYTES = 1024 * 1024
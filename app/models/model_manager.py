@@ -7,11 +7,32 @@ and model initialization across the application.
 Author: Ofelia Webb <ofelia.b.webb@gmail.com>
 """
 
+import contextlib
+import time
+import warnings
+
 import torch
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
-from typing import Tuple
+from typing import Callable, ContextManager, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app.config.settings import (
+    BACKEND_WARMUP_SHAPES,
+    EMBEDDING_POOLING,
+    MODEL_BACKEND,
+    MODEL_NAME,
+    MODEL_PRECISION,
+    SENTIMENT_LABELS
+)
+from app.utils.metrics import get_metrics
+
+# Supported inference precisions
+PRECISIONS = ("fp32", "int8", "bf16")
+
+# Supported forward-pass backends
+BACKENDS = ("eager", "torchscript", "compile")
 
-from app.config.settings import MODEL_NAME
+# Ways of pooling the encoder's last hidden state into one embedding per text
+POOLINGS = ("cls", "mean")
 
 class ModelManager:
     """
@@ -22,24 +43,96 @@ class ModelManager:
     model access across the application.
     
     Attributes:
+        model_name (str): The HuggingFace model name or local directory loaded
+        labels (Dict[int, str]): Mapping from label id to label name
         device (torch.device): The device (CPU/GPU) the model is running on
+        precision (str): The precision the model runs in (fp32, int8 or bf16)
+        backend (str): The forward-pass backend in use (eager, torchscript or compile)
+        load_timings (Dict[str, float]): Seconds spent loading the tokenizer and
+            model and building the backend
         tokenizer (AutoTokenizer): The tokenizer for text preprocessing
         model (AutoModelForSequenceClassification): The loaded sentiment analysis model
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        precision: str = MODEL_PRECISION,
+        backend: str = MODEL_BACKEND,
+        warmup_shapes: Sequence[Tuple[int, int]] = BACKEND_WARMUP_SHAPES,
+        tokenizer: Optional[AutoTokenizer] = None,
+        labels: Optional[Mapping[int, str]] = None
+    ):
         """
         Initialize the model manager.
         
         This method:
         1. Determines the appropriate device (CPU/GPU)
         2. Loads the tokenizer and model
-        3. Moves the model to the appropriate device
+        3. Applies the requested precision
+        4. Moves the model to the appropriate device
+        5. Builds the requested forward-pass backend and warms it up
+        
+        Args:
+            model_name: HuggingFace model name or local directory to load
+                (defaults to MODEL_NAME)
+            precision: One of:
+                - "fp32": Full precision (default)
+                - "int8": Dynamic INT8 quantization of the Linear layers.
+                  Quantized kernels are CPU only, so the model runs on CPU.
+                - "bf16": bfloat16 autocast during inference. Falls back to
+                  fp32 with a warning if the device does not support it.
+            backend: One of:
+                - "eager": Plain PyTorch module calls (default)
+                - "torchscript": A graph recorded with ``torch.jit.trace``
+                - "compile": A ``torch.compile`` graph with dynamic shapes
+                If tracing, compilation or warm-up fails, or the result does
+                not match eager mode, the eager backend is used with a warning.
+            warmup_shapes: (batch size, sequence length) pairs run through a
+                non-eager backend at startup so tracing and compilation do
+                not happen on the first request
+            tokenizer: An already loaded tokenizer to use instead of loading
+                the one saved with the model, e.g. one shared with another
+                model that has the same vocabulary
+            labels: Mapping from label id to label name. Defaults to
+                SENTIMENT_LABELS for MODEL_NAME and to the model config's
+                ``id2label`` for any other model.
         """
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+        self.model_name = model_name
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-        self.model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+        start = time.perf_counter()
+        self.tokenizer = tokenizer or AutoTokenizer.from_pretrained(model_name)
+        tokenizer_loaded = time.perf_counter()
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        if labels is None:
+            labels = SENTIMENT_LABELS if model_name == MODEL_NAME else self.model.config.id2label
+        self.labels: Dict[int, str] = {int(index): name for index, name in labels.items()}
+        
+        if precision == "int8":
+            self.device = torch.device("cpu")
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        elif precision == "bf16" and not _supports_bf16(self.device):
+            warnings.warn(
+                f"bf16 is not supported on {self.device}; falling back to fp32",
+                RuntimeWarning
+            )
+            precision = "fp32"
+        self.precision = precision
         self.model.to(self.device)
+        model_loaded = time.perf_counter()
+        self.backend = backend
+        self._forward = self._build_backend(backend, list(warmup_shapes))
+        self.load_timings = {
+            "tokenizer_load_seconds": tokenizer_loaded - start,
+            "model_load_seconds": model_loaded - tokenizer_loaded,
+            "backend_build_seconds": time.perf_counter() - model_loaded
+        }
     
     def get_model_and_tokenizer(self) -> Tuple[AutoModelForSequenceClassification, AutoTokenizer]:
         """
@@ -52,6 +145,19 @@ class ModelManager:
         """
         return self.model, self.tokenizer
     
+    def memory_bytes(self) -> int:
+        """
+        Estimate the memory held by the model's parameters and buffers.
+        
+        Weights packed by INT8 quantization are not parameters, so the
+        estimate for an int8 model covers only its unquantized layers.
+        
+        Returns:
+            The total size of all parameter and buffer tensors, in bytes
+        """
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
     def get_device(self) -> torch.device:
         """
         Get the current device being used.
@@ -59,4 +165,181 @@ class ModelManager:
         Returns:
             The torch device being used (CPU/GPU)
         """
-        return self.device 
\ No newline at end of file
+        return self.device
+
+    def inference_context(self) -> ContextManager:
+        """
+        Get the context manager that forward passes should run under.
+        
+        Returns:
+            A bfloat16 autocast context for bf16 precision, otherwise a
+            no-op context
+        """
+        if self.precision == "bf16":
+            return torch.autocast(device_type=self.device.type, dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """
+        Run the selected backend on a tokenized batch.
+        
+        Args:
+            input_ids: Token ids of shape (batch size, sequence length)
+            attention_mask: Attention mask of the same shape
+            
+        Returns:
+            The classification logits of shape (batch size, number of labels)
+        """
+        with get_metrics().time("forward"), torch.no_grad(), self.inference_context():
+            return self._forward(input_ids, attention_mask)
+
+    def forward_with_embeddings(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: torch.Tensor,
+        pooling: str = EMBEDDING_POOLING
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Run one forward pass and return the logits and pooled embeddings.
+        
+        The encoder's last hidden state is captured with a forward hook on the
+        base model, so no per-layer hidden states are kept. Hooks do not fire
+        inside traced or compiled graphs, so this always runs the eager module
+        regardless of the selected backend.
+        
+        Args:
+            input_ids: Token ids of shape (batch size, sequence length)
+            attention_mask: Attention mask of the same shape
+            pooling: "cls" for the first token's hidden state or "mean" for
+                the average over non-padding tokens
+        
+        Returns:
+            Tuple containing:
+                - The classification logits of shape (batch size, number of labels)
+                - The pooled embeddings of shape (batch size, hidden size)
+        
+        Raises:
+            ValueError: If pooling is not one of POOLINGS
+        """
+        if pooling not in POOLINGS:
+            raise ValueError(f"pooling must be one of {POOLINGS}, got {pooling!r}")
+        captured = {}
+        
+        def capture(module, inputs, output):
+            captured["hidden"] = output[0]
+        
+        handle = self.model.base_model.register_forward_hook(capture)
+        try:
+            with get_metrics().time("forward"), torch.no_grad(), self.inference_context():
+                logits = self.model(
+                    input_ids=input_ids, attention_mask=attention_mask, return_dict=False
+                )[0]
+        finally:
+            handle.remove()
+        
+        hidden = captured["hidden"]
+        if pooling == "cls":
+            return logits, hidden[:, 0]
+        mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+        return logits, (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+    
+    def _build_backend(
+        self,
+        backend: str,
+        warmup_shapes: List[Tuple[int, int]]
+    ) -> Callable[[torch.Tensor, torch.Tensor], torch.Tensor]:
+        """
+        Build the forward function for a backend, falling back to eager on failure.
+        
+        Args:
+            backend: The requested backend
+            warmup_shapes: Shapes used for tracing, compilation and validation
+            
+        Returns:
+            A callable mapping (input_ids, attention_mask) to logits
+        """
+        eager = _LogitsModule(self.model)
+        if backend == "eager":
+            return eager
+        
+        try:
+            shapes = warmup_shapes or [(1, 16)]
+            with torch.no_grad(), self.inference_context():
+                if backend == "torchscript":
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        compiled = torch.jit.trace(
+                            eager, self._dummy_inputs(*shapes[0]), check_trace=False
+                        )
+                else:
+                    compiled = torch.compile(eager, dynamic=True)
+                for batch_size, length in shapes:
+                    inputs = self._dummy_inputs(batch_size, length)
+                    if not torch.allclose(
+                        compiled(*inputs).float(), eager(*inputs).float(), atol=1e-3
+                    ):
+                        raise RuntimeError(
+                            f"output differs from eager mode for shape ({batch_size}, {length})"
+                        )
+        except Exception as error:
+            warnings.warn(
+                f"{backend} backend unavailable ({error}); falling back to eager",
+                RuntimeWarning
+            )
+            self.backend = "eager"
+            return eager
+        return compiled
+
+    def _dummy_inputs(self, batch_size: int, length: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Create deterministic dummy inputs for tracing and warm-up.
+        
+        Args:
+            batch_size: Number of rows
+            length: Sequence length
+            
+        Returns:
+            Tuple of (input_ids, attention_mask) on the model's device
+        """
+        generator = torch.Generator().manual_seed(0)
+        input_ids = torch.randint(
+            0, self.model.config.vocab_size, (batch_size, length), generator=generator
+        )
+        attention_mask = torch.ones_like(input_ids)
+        if length > 1:
+            attention_mask[0, length // 2:] = 0
+        return input_ids.to(self.device), attention_mask.to(self.device)
+
+class _LogitsModule(torch.nn.Module):
+    """
+    Wraps a sequence classification model to return logits from positional inputs.
+    
+    Tracing and compilation work on plain tensors, so this module hides the
+    keyword arguments and output dataclass of the HuggingFace model.
+    """
+    
+    def __init__(self, model: AutoModelForSequenceClassification):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        return self.model(
+            input_ids=input_ids, attention_mask=attention_mask, return_dict=False
+        )[0]
+
+def _supports_bf16(device: torch.device) -> bool:
+    """
+    Check whether bfloat16 autocast is supported and fast on a device.
+    
+    Args:
+        device: The device the model runs on
+        
+    Returns:
+        True if bf16 inference is supported
+    """
+    if device.type == "cuda":
+        return torch.cuda.is_bf16_supported()
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
@@ -0,0 +1,248 @@
+"""
+Registry of sequence classification models served side by side.
+
+This module provides a registry that holds several models in one process,
+each with its own label map. Models are loaded on first use and kept in
+least recently used order; when the estimated weight memory of the loaded
+models exceeds the configured budget, the least recently used ones are
+evicted. Tokenizers are shared between models whose tokenizers serialize
+identically, e.g. a domain fine-tune and the base model it started from.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> registry = ModelRegistry({
+    ...     "sst2": {"model_name": "distilbert-base-uncased-finetuned-sst-2-english"},
+    ...     "reviews": {"model_name": "./models/reviews", "labels": {0: "BAD", 1: "GOOD"}}
+    ... })
+    >>> registry.get_analyzer("reviews").analyze("Arrived broken.")
+    {'text': 'Arrived broken.', 'sentiment': 'BAD', ...}
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional
+
+from transformers import AutoTokenizer
+
+from app.config.settings import DEFAULT_MODEL, MODEL_MEMORY_BUDGET_BYTES, MODEL_REGISTRY
+from app.models.model_manager import ModelManager
+from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+class ModelRegistry:
+    """
+    A lazily loading, memory-bounded collection of sentiment models.
+    
+    Attributes:
+        memory_budget_bytes (int): Weight memory allowed before evicting models
+        default_model (str): Key used when no model is selected
+        loads (int): Number of model loads so far
+        evictions (int): Number of models evicted to stay within the budget
+    """
+
+    def __init__(
+        self,
+        models: Optional[Mapping[str, Mapping]] = None,
+        memory_budget_bytes: int = MODEL_MEMORY_BUDGET_BYTES,
+        default_model: str = DEFAULT_MODEL
+    ):
+        """
+        Initialize the registry without loading any model.
+        
+        Args:
+            models: Model specs by key (defaults to MODEL_REGISTRY). Each spec
+                holds ModelManager arguments (model_name, labels, precision,
+                backend) and optionally "tokenizer", the tokenizer to load if
+                it differs from model_name.
+            memory_budget_bytes: Weight memory the loaded models may use. The
+                most recently used model is always kept, even if it alone
+                exceeds the budget.
+            default_model: Key used when no model is selected
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self.default_model = default_model
+        self.loads = 0
+        self.evictions = 0
+        self._specs: Dict[str, Dict] = {}
+        self._analyzers: "OrderedDict[str, SentimentAnalyzer]" = OrderedDict()
+        self._tokenizers: Dict[str, AutoTokenizer] = {}
+        self._tokenizer_sources: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        for key, spec in (MODEL_REGISTRY if models is None else models).items():
+            self.register(key, **spec)
+    
+    def register(self, key: str, model_name: str, **options) -> None:
+        """
+        Add or replace a model spec. A loaded model with the same key is unloaded.
+        
+        Args:
+            key: Name used to select the model
+            model_name: HuggingFace model name or local directory
+            **options: labels, precision, backend, warmup_shapes or tokenizer
+        """
+        with self._lock:
+            self._specs[key] = dict(options, model_name=model_name)
+            self.evict(key)
+    
+    def models(self) -> List[str]:
+        """
+        Get the keys of all registered models.
+        """
+        with self._lock:
+            return list(self._specs)
+    
+    def loaded_models(self) -> List[str]:
+        """
+        Get the keys of the loaded models, least recently used first.
+        """
+        with self._lock:
+            return list(self._analyzers)
+    
+    def get_analyzer(self, key: Optional[str] = None) -> SentimentAnalyzer:
+        """
+        Get the analyzer for a model, loading the model if needed.
+        
+        Args:
+            key: The model key (defaults to ``default_model``)
+        
+        Returns:
+            SentimentAnalyzer: An analyzer using the model and its label map
+        
+        Raises:
+            ValueError: If the key is not registered
+        """
+        key = key or self.default_model
+        with self._lock:
+            analyzer = self._analyzers.get(key)
+            if analyzer is not None:
+                self._analyzers.move_to_end(key)
+                return analyzer
+            if key not in self._specs:
+                raise ValueError(f"model must be one of {tuple(self._specs)}, got {key!r}")
+            
+            spec = dict(self._specs[key])
+            tokenizer = self._load_tokenizer(spec.pop("tokenizer", spec["model_name"]))
+            analyzer = SentimentAnalyzer(model_manager=ModelManager(tokenizer=tokenizer, **spec))
+            self._analyzers[key] = analyzer
+            self.loads += 1
+            self._enforce_budget()
+            return analyzer
+    
+    def get_model_manager(self, key: Optional[str] = None) -> ModelManager:
+        """
+        Get the ModelManager for a model, loading the model if needed.
+        """
+        return self.get_analyzer(key).model_manager
+    
+    def evict(self, key: str) -> bool:
+        """
+        Unload a model. Callers still holding its analyzer can keep using it.
+        
+        Args:
+            key: The model key
+        
+        Returns:
+            True if the model was loaded
+        """
+        with self._lock:
+            if self._analyzers.pop(key, None) is None:
+                return False
+            self._release_tokenizers()
+            return True
+    
+    def memory_bytes(self) -> int:
+        """
+        Get the estimated weight memory of the loaded models.
+        """
+        with self._lock:
+            return sum(
+                analyzer.model_manager.memory_bytes() for analyzer in self._analyzers.values()
+            )
+    
+    def stats(self) -> Dict:
+        """
+        Get registry statistics.
+        
+        Returns:
+            A dictionary containing:
+                - models: Registered model keys
+                - loaded: Loaded model keys, least recently used first
+                - memory_bytes: Estimated weight memory of the loaded models
+                - memory_budget_bytes: The configured budget
+                - tokenizers: Number of distinct tokenizers loaded
+                - loads: Number of model loads so far
+                - evictions: Number of budget evictions so far
+        """
+        with self._lock:
+            return {
+                "models": self.models(),
+                "loaded": self.loaded_models(),
+                "memory_bytes": self.memory_bytes(),
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "tokenizers": len(self._tokenizers),
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
+    
+    def _load_tokenizer(self, source: str) -> AutoTokenizer:
+        """
+        Load a tokenizer, reusing a loaded one that serializes identically.
+        
+        Args:
+            source: HuggingFace tokenizer name or local directory
+        
+        Returns:
+            The shared tokenizer instance
+        """
+        fingerprint = self._tokenizer_sources.get(source)
+        if fingerprint is not None:
+            return self._tokenizers[fingerprint]
+        tokenizer = AutoTokenizer.from_pretrained(source)
+        fingerprint = _tokenizer_fingerprint(tokenizer)
+        self._tokenizer_sources[source] = fingerprint
+        return self._tokenizers.setdefault(fingerprint, tokenizer)
+    
+    def _enforce_budget(self) -> None:
+        """
+        Evict least recently used models until the loaded ones fit the budget.
+        """
+        while len(self._analyzers) > 1 and self.memory_bytes() > self.memory_budget_bytes:
+            self._analyzers.popitem(last=False)
+            self.evictions += 1
+        self._release_tokenizers()
+    
+    def _release_tokenizers(self) -> None:
+        """
+        Drop tokenizers no loaded model uses any more.
+        """
+        in_use = {id(analyzer.model_manager.tokenizer) for analyzer in self._analyzers.values()}
+        for fingerprint, tokenizer in list(self._tokenizers.items()):
+            if id(tokenizer) not in in_use:
+                del self._tokenizers[fingerprint]
+        self._tokenizer_sources = {
+            source: fingerprint
+            for source, fingerprint in self._tokenizer_sources.items()
+            if fingerprint in self._tokenizers
+        }
+
+def _tokenizer_fingerprint(tokenizer: AutoTokenizer) -> str:
+    """
+    Hash a tokenizer's full configuration so identical tokenizers can be shared.
+    
+    Fast tokenizers serialize their normalizer, pre-tokenizer, vocabulary and
+    post-processor; slow ones fall back to their class and vocabulary.
+    
+    Args:
+        tokenizer: A loaded tokenizer
+    
+    Returns:
+        A hex digest identifying the tokenizer's behaviour
+    """
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        state = backend.to_str()
+    else:
+        state = type(tokenizer).__name__ + repr(sorted(tokenizer.get_vocab().items()))
+    state += repr((tokenizer.model_max_length, tokenizer.padding_side, tokenizer.truncation_side))
+    return hashlib.sha256(state.encode("utf-8")).hexdigest()
@@ -0,0 +1,434 @@
+"""
+Local HTTP inference server.
+
+This module provides a lightweight HTTP server for the sentiment analyzer,
+built only on the standard library. Texts from concurrent connections are
+collected into shared model batches. The queue of waiting texts is bounded:
+requests that would overflow it are rejected with 429 instead of piling up
+(413 if they could never fit), and requests that wait longer than their
+timeout get 504. The model loads in the background while the server already
+answers health checks.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Endpoints:
+    POST /analyze   {"text": "..."} -> {"result": {...}}
+                    {"texts": ["...", ...]} -> {"results": [...]}
+    GET  /health    Liveness, model state and queue depth (always 200)
+    GET  /ready     200 once the model is loaded, 503 before
+    GET  /metrics   Inference and queue metrics in Prometheus text format
+
+Example:
+    $ poetry run sentiment-server --port 8000
+    $ curl -s localhost:8000/analyze -d '{"text": "I love this product!"}'
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config.settings import (
+    SERVER_HOST,
+    SERVER_MAX_BATCH_SIZE,
+    SERVER_MAX_BODY_BYTES,
+    SERVER_MAX_QUEUE,
+    SERVER_MAX_WAIT_MS,
+    SERVER_PORT,
+    SERVER_REQUEST_TIMEOUT_S
+)
+
+from app.utils.metrics import get_metrics
+
+if TYPE_CHECKING:
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+class QueueFullError(Exception):
+    """Raised when a request does not fit in the inference queue."""
+
+class InferenceBatcher:
+    """
+    A bounded queue of texts served in batches by a background thread.
+    
+    Attributes:
+        max_queue (int): Maximum number of texts waiting for inference
+        max_batch_size (int): Maximum number of texts per model batch
+        max_wait (float): Seconds to wait for a batch to fill after the first text
+        batches_run (int): Number of batches sent to the model
+        rejected (int): Number of texts rejected because the queue was full
+    """
+    
+    def __init__(
+        self,
+        analyze: Callable[[List[str]], List[Dict]],
+        max_queue: int = SERVER_MAX_QUEUE,
+        max_batch_size: int = SERVER_MAX_BATCH_SIZE,
+        max_wait_ms: float = SERVER_MAX_WAIT_MS
+    ):
+        """
+        Initialize the batcher and start its worker thread.
+        
+        Args:
+            analyze: Function analyzing a list of texts, in order
+            max_queue: Maximum number of texts waiting for inference
+            max_batch_size: Maximum number of texts per model batch
+            max_wait_ms: Milliseconds to wait for a batch to fill
+        """
+        self.analyze = analyze
+        self.max_queue = max_queue
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches_run = 0
+        self.rejected = 0
+        self._queue: Deque[Tuple[str, Future]] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> List[Future]:
+        """
+        Queue texts for inference, all or nothing.
+        
+        Args:
+            texts: The texts of one request
+            
+        Returns:
+            One future per text, resolved with its result dictionary
+            
+        Raises:
+            QueueFullError: If the texts do not fit in the queue
+        """
+        futures = [Future() for _ in texts]
+        with self._condition:
+            if len(self._queue) + len(texts) > self.max_queue:
+                self.rejected += len(texts)
+                raise QueueFullError(f"inference queue is full ({self.max_queue} texts)")
+            self._queue.extend(zip(texts, futures))
+            self._condition.notify()
+        return futures
+
+    def queue_depth(self) -> int:
+        """
+        Get the number of texts waiting for inference.
+        """
+        with self._condition:
+            return len(self._queue)
+
+    def close(self) -> None:
+        """
+        Stop the worker thread after the current batch.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _next_batch(self) -> List[Tuple[str, Future]]:
+        """
+        Wait for texts and collect up to one batch of them.
+        """
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._queue) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = []
+            while self._queue and len(batch) < self.max_batch_size:
+                batch.append(self._queue.popleft())
+        # Requests that timed out while queued have cancelled their futures
+        return [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+
+    def _run(self) -> None:
+        """
+        Serve batches until the batcher is closed.
+        """
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._closed:
+                    return
+                continue
+            try:
+                results = self.analyze([text for text, _ in batch])
+            except Exception as error:
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+            self.batches_run += 1
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+class SentimentServer:
+    """
+    An HTTP server answering sentiment requests through an InferenceBatcher.
+    
+    Attributes:
+        httpd (ThreadingHTTPServer): The underlying HTTP server
+        batcher (InferenceBatcher): The shared inference queue
+        request_timeout (float): Seconds a request may wait for its results
+        ready (threading.Event): Set once the model is loaded
+        load_error (Optional[str]): Error message if the model failed to load
+    """
+    
+    def __init__(
+        self,
+        host: str = SERVER_HOST,
+        port: int = SERVER_PORT,
+        analyzer: Optional["SentimentAnalyzer"] = None,
+        max_queue: int = SERVER_MAX_QUEUE,
+        max_batch_size: int = SERVER_MAX_BATCH_SIZE,
+        max_wait_ms: float = SERVER_MAX_WAIT_MS,
+        request_timeout: float = SERVER_REQUEST_TIMEOUT_S
+    ):
+        """
+        Bind the server and start loading the model in the background.
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            analyzer: Analyzer to serve. Defaults to the warmed-up singleton
+                from ``get_analyzer()``.
+            max_queue: Maximum number of texts waiting for inference
+            max_batch_size: Maximum number of texts per model batch
+            max_wait_ms: Milliseconds to wait for a batch to fill
+            request_timeout: Seconds a request may wait for its results
+        """
+        self._analyzer = analyzer
+        self.request_timeout = request_timeout
+        self.ready = threading.Event()
+        self.load_error: Optional[str] = None
+        self.batcher = InferenceBatcher(self._analyze, max_queue, max_batch_size, max_wait_ms)
+        self.httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.sentiment_server = self
+        get_metrics().register_collector("server", self._queue_stats)
+        threading.Thread(target=self._load_model, name="model-loader", daemon=True).start()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """
+        The (host, port) the server is listening on.
+        """
+        return self.httpd.server_address[:2]
+
+    def serve_forever(self) -> None:
+        """
+        Handle requests until ``shutdown`` is called.
+        """
+        self.httpd.serve_forever()
+
+    def shutdown(self) -> None:
+        """
+        Stop accepting requests and stop the batcher.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.batcher.close()
+        get_metrics().unregister_collector("server")
+
+    def health(self) -> Dict:
+        """
+        Get the liveness and readiness state.
+        """
+        return {
+            "status": "ok" if self.load_error is None else "error",
+            "model_loaded": self.ready.is_set(),
+            "load_error": self.load_error,
+            "queue_depth": self.batcher.queue_depth(),
+            "max_queue": self.batcher.max_queue,
+            "batches_run": self.batcher.batches_run,
+            "rejected": self.batcher.rejected
+        }
+
+    def _queue_stats(self) -> Dict:
+        """
+        Get the batcher's queue statistics for the metrics registry.
+        """
+        return {
+            "queue_depth": self.batcher.queue_depth(),
+            "max_queue": self.batcher.max_queue,
+            "batches_run": self.batcher.batches_run,
+            "rejected_texts": self.batcher.rejected
+        }
+
+    def _load_model(self) -> None:
+        """
+        Load and warm up the analyzer, then mark the server ready.
+        """
+        try:
+            if self._analyzer is None:
+                from app.utils.sentiment_utils import get_analyzer, warmup
+                warmup()
+                self._analyzer = get_analyzer()
+        except Exception as error:
+            self.load_error = str(error)
+            return
+        self.ready.set()
+
+    def _analyze(self, texts: List[str]) -> List[Dict]:
+        """
+        Analyze a batch of texts with the loaded analyzer.
+        """
+        return self._analyzer.analyze(texts)
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes HTTP requests to the SentimentServer.
+    """
+    
+    server_version = "SentimentServer/0.1"
+
+    def do_GET(self) -> None:
+        server = self.server.sentiment_server
+        if self.path == "/health":
+            self._send_json(200, server.health())
+        elif self.path == "/ready":
+            ready = server.ready.is_set()
+            self._send_json(200 if ready else 503, {"ready": ready})
+        elif self.path == "/metrics":
+            data = get_metrics().to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        server = self.server.sentiment_server
+        if self.path != "/analyze":
+            self._send_json(404, {"error": "not found"})
+            return
+        if not server.ready.is_set():
+            self._send_json(503, {"error": "model is not loaded yet"})
+            return
+        
+        header = self.headers.get("Content-Length")
+        if header is None:
+            self._send_json(411, {"error": "Content-Length header is required"})
+            return
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(400, {"error": f"invalid Content-Length: {header!r}"})
+            return
+        if length > SERVER_MAX_BODY_BYTES:
+            self._send_json(413, {"error": f"request body exceeds {SERVER_MAX_BODY_BYTES} bytes"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"null")
+            texts, single = _parse_texts(payload)
+        except ValueError as error:
+            self._send_json(400, {"error": str(error)})
+            return
+        
+        if len(texts) > server.batcher.max_queue:
+            # Retrying cannot help, so this is not a 429
+            self._send_json(413, {"error": f"request has more than {server.batcher.max_queue} texts"})
+            return
+        try:
+            futures = server.batcher.submit(texts)
+        except QueueFullError as error:
+            self._send_json(429, {"error": str(error)}, {"Retry-After": "1"})
+            return
+        
+        _, not_done = wait(futures, timeout=server.request_timeout)
+        if not_done:
+            for future in futures:
+                future.cancel()
+            self._send_json(504, {"error": "request timed out"})
+            return
+        try:
+            results = [future.result() for future in futures]
+        except Exception as error:
+            self._send_json(500, {"error": str(error)})
+            return
+        self._send_json(200, {"result": results[0]} if single else {"results": results})
+
+    def log_message(self, format: str, *args) -> None:
+        # Keep request logging out of stderr; health checks are frequent
+        pass
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+def _parse_texts(payload) -> Tuple[List[str], bool]:
+    """
+    Extract the texts from a request payload.
+    
+    Args:
+        payload: The decoded JSON body
+        
+    Returns:
+        Tuple of (texts, whether the request was for a single text)
+        
+    Raises:
+        ValueError: If the payload is not a valid analyze request
+    """
+    if isinstance(payload, dict) and isinstance(payload.get("text"), str):
+        return [payload["text"]], True
+    if isinstance(payload, dict) and isinstance(payload.get("texts"), list):
+        texts = payload["texts"]
+        if all(isinstance(text, str) for text in texts):
+            return texts, False
+    raise ValueError('expected {"text": "..."} or {"texts": ["...", ...]}')
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the HTTP inference server.
+    
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv[1:]``)
+        
+    Returns:
+        int: Exit code (0 for success)
+    """
+    parser = argparse.ArgumentParser(description="Serve sentiment analysis over HTTP.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--max-queue", type=int, default=SERVER_MAX_QUEUE)
+    parser.add_argument("--max-batch-size", type=int, default=SERVER_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=SERVER_MAX_WAIT_MS)
+    parser.add_argument("--timeout", type=float, default=SERVER_REQUEST_TIMEOUT_S)
+    args = parser.parse_args(argv)
+    
+    server = SentimentServer(
+        args.host,
+        args.port,
+        max_queue=args.max_queue,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        request_timeout=args.timeout
+    )
+    host, port = server.address
+    print(f"Serving sentiment analysis on http://{host}:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Incremental, mergeable aggregation of sentiment results.
+
+This module provides the SentimentAggregator class, which builds summary
+statistics one result at a time. Only counters, sums and a fixed-bin
+confidence histogram are kept, so results can be summarized while they are
+streamed without holding them in memory. Aggregators from different threads,
+processes or nodes can be merged, and their state is a small JSON-serializable
+dictionary, so each shard of a large job only needs to report its state.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> aggregator = SentimentAggregator()
+    >>> for result in aggregator.track(analyze_stream(texts)):
+    ...     write(result)
+    >>> aggregator.summary()
+    {'total_texts': 3, 'positive_count': 1, 'negative_count': 1, ...}
+    
+    >>> # Combine the states reported by several shards
+    >>> total = SentimentAggregator.merge_all(
+    ...     SentimentAggregator.from_state(state) for state in shard_states
+    ... )
+"""
+
+import math
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from app.config.settings import AGGREGATOR_HISTOGRAM_BINS
+
+if TYPE_CHECKING:
+    from app.utils.result_batch import ResultBatch
+
+# Quantiles reported by summary(), as (key suffix, quantile)
+SUMMARY_QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+class SentimentAggregator:
+    """
+    A running, mergeable summary of sentiment analysis results.
+    
+    Confidences are counted in ``bins`` equal-width bins over [0, 1], so
+    quantiles are approximate to within one bin width.
+    
+    Attributes:
+        bins (int): Number of confidence histogram bins
+        total (int): Number of results seen
+        positive (int): Number of positive results
+        negative (int): Number of negative results
+        confident (int): Number of confident results
+        confidence_count (int): Number of results that carried a confidence
+        confidence_sum (float): Sum of the confidences seen
+        confidence_min (float): Smallest confidence seen
+        confidence_max (float): Largest confidence seen
+        histogram (List[int]): Number of confidences in each bin
+    """
+    
+    def __init__(self, bins: int = AGGREGATOR_HISTOGRAM_BINS):
+        """
+        Initialize an empty aggregator.
+        
+        Args:
+            bins: Number of confidence histogram bins
+        """
+        if bins < 1:
+            raise ValueError("bins must be a positive integer")
+        self.bins = bins
+        self.total = 0
+        self.positive = 0
+        self.negative = 0
+        self.confident = 0
+        self.confidence_count = 0
+        self.confidence_sum = 0.0
+        self.confidence_min = math.inf
+        self.confidence_max = -math.inf
+        self.histogram = [0] * bins
+
+    def update(self, result: Dict) -> None:
+        """
+        Add a single result to the running summary.
+        
+        Args:
+            result: A sentiment analysis result dictionary. The confidence
+                key is optional; results without it only update the counts.
+        """
+        self.total += 1
+        if result["sentiment"] == "POSITIVE":
+            self.positive += 1
+        elif result["sentiment"] == "NEGATIVE":
+            self.negative += 1
+        if result["is_confident"]:
+            self.confident += 1
+        confidence = result.get("confidence")
+        if confidence is not None:
+            self.confidence_count += 1
+            self.confidence_sum += confidence
+            self.confidence_min = min(self.confidence_min, confidence)
+            self.confidence_max = max(self.confidence_max, confidence)
+            self.histogram[self._bin(confidence)] += 1
+
+    def update_many(self, results: Iterable[Dict]) -> None:
+        """
+        Add every result of an iterable to the running summary.
+        
+        Args:
+            results: An iterable of sentiment analysis result dictionaries
+        """
+        for result in results:
+            self.update(result)
+
+    def update_batch(self, batch: "ResultBatch") -> None:
+        """
+        Add a columnar ResultBatch using vectorized counts.
+        
+        Args:
+            batch: The results to add
+        """
+        import numpy as np
+        
+        if len(batch) == 0:
+            return
+        label_counts = np.bincount(batch.label_ids, minlength=max(batch.labels) + 1)
+        self.total += len(batch)
+        self.positive += _label_count(batch, label_counts, "POSITIVE")
+        self.negative += _label_count(batch, label_counts, "NEGATIVE")
+        self.confident += int(np.count_nonzero(batch.is_confident))
+        
+        confidences = batch.confidences.astype(np.float64)
+        self.confidence_count += len(confidences)
+        self.confidence_sum += float(confidences.sum())
+        self.confidence_min = min(self.confidence_min, float(confidences.min()))
+        self.confidence_max = max(self.confidence_max, float(confidences.max()))
+        bins = np.clip((confidences * self.bins).astype(np.int64), 0, self.bins - 1)
+        for index, count in enumerate(np.bincount(bins, minlength=self.bins).tolist()):
+            self.histogram[index] += count
+
+    def track(self, results: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Pass results through unchanged while adding them to the summary.
+        
+        Args:
+            results: An iterable of sentiment analysis result dictionaries
+            
+        Yields:
+            Each result, after it has been counted
+        """
+        for result in results:
+            self.update(result)
+            yield result
+
+    def merge(self, other: "SentimentAggregator") -> "SentimentAggregator":
+        """
+        Add the state of another aggregator to this one.
+        
+        Args:
+            other: An aggregator with the same number of bins
+            
+        Returns:
+            This aggregator, for chaining
+        """
+        if other.bins != self.bins:
+            raise ValueError(
+                f"Cannot merge aggregators with {self.bins} and {other.bins} bins"
+            )
+        self.total += other.total
+        self.positive += other.positive
+        self.negative += other.negative
+        self.confident += other.confident
+        self.confidence_count += other.confidence_count
+        self.confidence_sum += other.confidence_sum
+        self.confidence_min = min(self.confidence_min, other.confidence_min)
+        self.confidence_max = max(self.confidence_max, other.confidence_max)
+        self.histogram = [mine + theirs for mine, theirs in zip(self.histogram, other.histogram)]
+        return self
+
+    @classmethod
+    def merge_all(
+        cls,
+        aggregators: Iterable["SentimentAggregator"],
+        bins: int = AGGREGATOR_HISTOGRAM_BINS
+    ) -> "SentimentAggregator":
+        """
+        Merge many aggregators into a new one.
+        
+        Args:
+            aggregators: The aggregators to combine
+            bins: Number of bins shared by all the aggregators
+            
+        Returns:
+            A new aggregator holding the combined state
+        """
+        merged = cls(bins)
+        for aggregator in aggregators:
+            merged.merge(aggregator)
+        return merged
+
+    def to_state(self) -> Dict:
+        """
+        Export the aggregator state as a JSON-serializable dictionary.
+        
+        Returns:
+            The state, which can be restored with ``from_state``
+        """
+        return {
+            "bins": self.bins,
+            "total": self.total,
+            "positive": self.positive,
+            "negative": self.negative,
+            "confident": self.confident,
+            "confidence_count": self.confidence_count,
+            "confidence_sum": self.confidence_sum,
+            "confidence_min": self.confidence_min if self.confidence_count else None,
+            "confidence_max": self.confidence_max if self.confidence_count else None,
+            "histogram": list(self.histogram)
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "SentimentAggregator":
+        """
+        Restore an aggregator from a state produced by ``to_state``.
+        
+        Args:
+            state: The exported state
+            
+        Returns:
+            A new aggregator with that state
+        """
+        aggregator = cls(state["bins"])
+        if len(state["histogram"]) != aggregator.bins:
+            raise ValueError("histogram length does not match the number of bins")
+        for key in ("total", "positive", "negative", "confident", "confidence_count"):
+            setattr(aggregator, key, int(state[key]))
+        aggregator.confidence_sum = float(state["confidence_sum"])
+        if state["confidence_min"] is not None:
+            aggregator.confidence_min = float(state["confidence_min"])
+            aggregator.confidence_max = float(state["confidence_max"])
+        aggregator.histogram = [int(count) for count in state["histogram"]]
+        return aggregator
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a confidence quantile from the histogram.
+        
+        The value is interpolated linearly inside the bin that contains the
+        requested rank and clamped to the observed minimum and maximum.
+        
+        Args:
+            q: The quantile to estimate, between 0 and 1
+            
+        Returns:
+            The estimated confidence, or None if no confidences were seen
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.confidence_count == 0:
+            return None
+        rank = q * self.confidence_count
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            if count and seen + count >= rank:
+                value = (index + (rank - seen) / count) / self.bins
+                return min(max(value, self.confidence_min), self.confidence_max)
+            seen += count
+        return self.confidence_max
+
+    def summary(self) -> Dict:
+        """
+        Get the summary statistics for the results seen so far.
+        
+        Returns:
+            A dictionary with the keys of ``get_sentiment_summary`` plus:
+                - mean_confidence: Mean confidence, or None if none were seen
+                - min_confidence: Smallest confidence, or None
+                - max_confidence: Largest confidence, or None
+                - confidence_p50, confidence_p90, confidence_p99: Approximate
+                  confidence quantiles, or None
+        """
+        total = self.total
+        summary = {
+            "total_texts": total,
+            "positive_count": self.positive,
+            "negative_count": self.negative,
+            "confident_predictions": self.confident,
+            "positive_percentage": (self.positive / total) * 100 if total > 0 else 0,
+            "negative_percentage": (self.negative / total) * 100 if total > 0 else 0,
+            "confidence_rate": (self.confident / total) * 100 if total > 0 else 0
+        }
+        has_confidences = self.confidence_count > 0
+        summary["mean_confidence"] = (
+            self.confidence_sum / self.confidence_count if has_confidences else None
+        )
+        summary["min_confidence"] = self.confidence_min if has_confidences else None
+        summary["max_confidence"] = self.confidence_max if has_confidences else None
+        for name, q in SUMMARY_QUANTILES:
+            summary[f"confidence_{name}"] = self.quantile(q)
+        return summary
+
+    def _bin(self, confidence: float) -> int:
+        """
+        Get the histogram bin of a confidence value.
+        """
+        return min(max(int(confidence * self.bins), 0), self.bins - 1)
+
+def _label_count(batch: "ResultBatch", label_counts: Sequence[int], sentiment: str) -> int:
+    """
+    Count the rows of a batch with a sentiment, or 0 if the model has no such label.
+    
+    Args:
+        batch: The results being added
+        label_counts: Number of rows per label id
+        sentiment: A sentiment name such as "POSITIVE"
+        
+    Returns:
+        The number of rows with that sentiment
+    """
+    try:
+        return int(label_counts[batch.label_id(sentiment)])
+    except ValueError:
+        return 0
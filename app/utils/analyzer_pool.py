@@ -0,0 +1,189 @@
+"""
+Bounded pool of analyzers for multi-threaded callers.
+
+This module provides the AnalyzerPool class for servers and
+``ThreadPoolExecutor`` callers that run inference from many threads in one
+process. Instead of letting every thread call into one SentimentAnalyzer,
+each of them competing for PyTorch's full intra-op thread pool, the pool
+offers a fixed number of inference slots. The slots share one ModelManager,
+so the weights are loaded once, and the thread budget is split between them
+so concurrent forward passes do not oversubscribe the cores. Callers check a
+slot out, blocking or with a timeout, and return it when done.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> pool = AnalyzerPool(slots=4)
+    >>> with ThreadPoolExecutor(max_workers=16) as executor:
+    ...     results = list(executor.map(pool.analyze, texts))
+    
+    >>> with pool.checkout(timeout=0.5) as analyzer:
+    ...     result = analyzer.analyze("Great!")
+"""
+
+import contextlib
+import os
+import queue
+import threading
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Union
+
+from app.config.settings import ANALYZER_POOL_SLOTS, ANALYZER_POOL_THREAD_BUDGET
+from app.utils.prediction_store import PredictionStore
+from app.utils.result_cache import ResultCache
+
+if TYPE_CHECKING:
+    from app.models.model_manager import ModelManager
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+class AnalyzerPool:
+    """
+    A fixed number of inference slots sharing one model.
+    
+    Attributes:
+        slots (int): Number of analyzers that may run at the same time
+        thread_budget (int): Total intra-op threads shared by the slots
+        threads_per_slot (int): Intra-op threads PyTorch uses per forward pass
+        checkouts (int): Number of successful checkouts
+        waits (int): Number of checkouts that had to wait for a free slot
+        timeouts (int): Number of checkouts that timed out
+    """
+    
+    def __init__(
+        self,
+        slots: int = ANALYZER_POOL_SLOTS,
+        thread_budget: Optional[int] = ANALYZER_POOL_THREAD_BUDGET,
+        batch_size: Optional[int] = None,
+        model_manager: Optional["ModelManager"] = None,
+        cache: Optional[ResultCache] = None,
+        store: Optional[PredictionStore] = None
+    ):
+        """
+        Initialize the pool. The model is loaded on first checkout.
+        
+        Args:
+            slots: Number of analyzers that may run at the same time
+            thread_budget: Total intra-op threads for all slots together
+                (defaults to the CPU count)
+            batch_size: Batch size of each slot's analyzer (defaults to the
+                autotune profile's batch size, or BATCH_SIZE)
+            model_manager: An existing ModelManager to share between the
+                slots. A default one is created on first checkout if omitted.
+            cache: Optional ResultCache shared by the slots
+            store: Optional PredictionStore shared by the slots
+        """
+        if slots < 1:
+            raise ValueError("slots must be a positive integer")
+        self.slots = slots
+        self.thread_budget = thread_budget or os.cpu_count() or 1
+        self.threads_per_slot = max(1, self.thread_budget // slots)
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self._batch_size = batch_size
+        self._model_manager = model_manager
+        self._cache = cache
+        self._store = store
+        self._available: "queue.LifoQueue[SentimentAnalyzer]" = queue.LifoQueue()
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._loaded = False
+
+    @contextlib.contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator["SentimentAnalyzer"]:
+        """
+        Borrow an analyzer for the duration of a ``with`` block.
+        
+        Args:
+            timeout: Seconds to wait for a free slot (None waits indefinitely)
+            
+        Yields:
+            SentimentAnalyzer: An analyzer no other thread is using
+            
+        Raises:
+            TimeoutError: If no slot became free within the timeout
+        """
+        self._ensure_loaded()
+        try:
+            analyzer = self._available.get_nowait()
+            waited = False
+        except queue.Empty:
+            waited = True
+            try:
+                analyzer = self._available.get(timeout=timeout)
+            except queue.Empty:
+                with self._stats_lock:
+                    self.waits += 1
+                    self.timeouts += 1
+                raise TimeoutError(f"no free analyzer slot within {timeout} seconds") from None
+        with self._stats_lock:
+            self.checkouts += 1
+            self.waits += waited
+        try:
+            yield analyzer
+        finally:
+            self._available.put(analyzer)
+
+    def analyze(
+        self,
+        text: Union[str, List[str]],
+        timeout: Optional[float] = None
+    ) -> Union[Dict, List[Dict]]:
+        """
+        Analyze text(s) on the next free slot.
+        
+        Args:
+            text: Either a single text string or a list of text strings to analyze
+            timeout: Seconds to wait for a free slot (None waits indefinitely)
+            
+        Returns:
+            The same result format as ``SentimentAnalyzer.analyze``
+            
+        Raises:
+            TimeoutError: If no slot became free within the timeout
+        """
+        with self.checkout(timeout) as analyzer:
+            return analyzer.analyze(text)
+
+    def stats(self) -> Dict:
+        """
+        Get pool statistics.
+        
+        Returns:
+            A dictionary containing slots, available (free slots right now),
+            threads_per_slot, checkouts, waits and timeouts
+        """
+        with self._stats_lock:
+            return {
+                "slots": self.slots,
+                "available": self._available.qsize() if self._loaded else self.slots,
+                "threads_per_slot": self.threads_per_slot,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts
+            }
+
+    def _ensure_loaded(self) -> None:
+        """
+        Load the shared model and create the slot analyzers exactly once.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            import torch
+            from app.models.model_manager import ModelManager
+            from app.utils.sentiment_analyzer import SentimentAnalyzer
+            
+            # The intra-op thread count is process-wide, so every concurrent
+            # forward pass gets an equal share of the budget
+            torch.set_num_threads(self.threads_per_slot)
+            model_manager = self._model_manager or ModelManager()
+            for _ in range(self.slots):
+                self._available.put(SentimentAnalyzer(
+                    batch_size=self._batch_size,
+                    cache=self._cache,
+                    store=self._store,
+                    model_manager=model_manager
+                ))
+            self._loaded = True
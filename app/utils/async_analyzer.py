@@ -0,0 +1,158 @@
+"""
+Asyncio front end for the sentiment analyzer.
+
+This module provides the AsyncSentimentAnalyzer class, which collects texts
+submitted by concurrent coroutines into micro-batches. A batch is flushed when
+it reaches the configured size or when the oldest queued text has waited for
+the configured deadline. Inference runs in a worker thread so the event loop
+stays responsive, and each caller receives its own result.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> async def handler(text):
+    ...     return await async_analyzer.analyze(text)
+    >>> async_analyzer = AsyncSentimentAnalyzer()
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from app.config.settings import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS
+
+if TYPE_CHECKING:
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+class AsyncSentimentAnalyzer:
+    """
+    A micro-batching wrapper that serves concurrent async callers.
+    
+    Texts passed to ``analyze`` are queued until either ``max_batch_size``
+    texts are waiting or ``max_wait_ms`` milliseconds have passed since the
+    first of them arrived. The whole batch is then analyzed in one call to
+    ``SentimentAnalyzer._analyze_batch`` on the executor.
+    
+    Attributes:
+        max_batch_size (int): Number of queued texts that triggers a flush
+        max_wait (float): Maximum time in seconds a text waits before a flush
+        batches_run (int): Number of micro-batches sent to the model so far
+    """
+    
+    def __init__(
+        self,
+        analyzer: Optional["SentimentAnalyzer"] = None,
+        max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+        max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize the async analyzer.
+        
+        Args:
+            analyzer: The analyzer used for inference. Defaults to the shared
+                instance returned by ``get_analyzer()``, created on first use.
+            max_batch_size: Number of queued texts that triggers a flush
+            max_wait_ms: Maximum time in milliseconds a text waits in the queue
+            executor: Executor that runs inference. Defaults to a single
+                worker thread so batches never compete for the model.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches_run = 0
+        self._analyzer = analyzer
+        self._executor = executor or ThreadPoolExecutor(max_workers=1)
+        self._owns_executor = executor is None
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def analyze(self, text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
+        """
+        Analyze the sentiment of the input text(s).
+        
+        Args:
+            text: Either a single text string or a list of text strings
+            
+        Returns:
+            The same result format as ``SentimentAnalyzer.analyze``
+        """
+        if isinstance(text, str):
+            return await self._submit(text)
+        return list(await asyncio.gather(*(self._submit(item) for item in text)))
+
+    async def flush(self) -> None:
+        """
+        Send any queued texts to the model immediately and wait for them.
+        """
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """
+        Flush queued texts and shut down the executor if it is owned.
+        """
+        await self.flush()
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    def _submit(self, text: str) -> asyncio.Future:
+        """
+        Queue a text and return the future that will hold its result.
+        """
+        if not isinstance(text, str):
+            raise TypeError("text must be a string")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        """
+        Start inference for everything currently queued.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """
+        Analyze one micro-batch on the executor and resolve its futures.
+        """
+        texts = [text for text, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, self._analyze, texts)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.batches_run += 1
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _analyze(self, texts: List[str]) -> List[Dict]:
+        """
+        Run batch inference, creating the analyzer on first use.
+        """
+        if self._analyzer is None:
+            from app.utils.sentiment_utils import get_analyzer
+            self._analyzer = get_analyzer()
+        return self._analyzer._analyze_batch(texts)
@@ -0,0 +1,305 @@
+"""
+Hardware-aware autotuning of batch size, threads, precision and backend.
+
+This module runs a short calibration on the current host and picks the
+fastest inference configuration for a model. It searches the batch size, the
+PyTorch intra-op thread count and, optionally, reduced-precision and compiled
+backend choices. Candidates other than fp32 eager must agree with fp32 on at
+least PRECISION_MIN_AGREEMENT of the calibration labels to be eligible. The
+winner is saved as a JSON profile at AUTOTUNE_PROFILE_PATH, keyed by model
+name, and a SentimentAnalyzer created afterwards on the same host applies the
+profile for its model at startup.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> profile = autotune(precisions=("fp32", "int8"))
+    >>> save_profile(profile)
+    >>> SentimentAnalyzer().batch_size  # picked up from the profile
+    64
+    
+    $ python -m app.utils.autotune --precisions fp32,int8
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from app.config.settings import AUTOTUNE_PROFILE_PATH, MODEL_NAME, PRECISION_MIN_AGREEMENT
+
+if TYPE_CHECKING:
+    from app.models.model_manager import ModelManager
+
+# Version of the profile file format
+PROFILE_VERSION = 2
+
+def host_fingerprint() -> Dict:
+    """
+    Describe the hardware and software a profile was tuned on.
+    
+    Returns:
+        A dictionary of machine, processor, CPU count, platform and Python
+        version. Profiles are only applied when it matches the current host.
+    """
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "system": platform.system(),
+        "python": platform.python_version()
+    }
+
+def _read_profiles(path: str) -> Dict[str, Dict]:
+    """
+    Read the profiles in a profile file by model name, or {} if there are none.
+    """
+    try:
+        with open(os.path.expanduser(path), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != PROFILE_VERSION:
+        return {}
+    profiles = data.get("profiles")
+    return profiles if isinstance(profiles, dict) else {}
+
+def load_profile(
+    path: Optional[str] = AUTOTUNE_PROFILE_PATH,
+    model_name: str = MODEL_NAME
+) -> Optional[Dict]:
+    """
+    Load the autotune profile if one was saved for this model and host.
+    
+    Args:
+        path: Profile file (defaults to AUTOTUNE_PROFILE_PATH; None disables
+            profiles)
+        model_name: The model the profile was tuned for (defaults to MODEL_NAME)
+    
+    Returns:
+        The profile dictionary, or None if there is no readable profile for
+        the model on the current host
+    """
+    if not path:
+        return None
+    profile = _read_profiles(path).get(model_name)
+    if not isinstance(profile, dict) or profile.get("host") != host_fingerprint():
+        return None
+    return profile
+
+def save_profile(profile: Dict, path: str = AUTOTUNE_PROFILE_PATH) -> str:
+    """
+    Write a profile to a file, creating its directory.
+    
+    Profiles saved earlier for other models are kept; one saved for the same
+    model is replaced.
+    
+    Args:
+        profile: A profile returned by ``autotune``
+        path: Target file (defaults to AUTOTUNE_PROFILE_PATH)
+    
+    Returns:
+        The expanded path the profile was written to
+    """
+    path = os.path.expanduser(path)
+    profiles = _read_profiles(path)
+    profiles[profile["model_name"]] = profile
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({"version": PROFILE_VERSION, "profiles": profiles}, f, indent=2)
+    os.replace(temporary, path)
+    return path
+
+def apply_threads(profile: Dict) -> None:
+    """
+    Set PyTorch's thread counts from a profile.
+    
+    The inter-op thread count can only be changed before PyTorch starts any
+    inter-op work, so it is left alone if that has already happened.
+    
+    Args:
+        profile: A profile returned by ``autotune`` or ``load_profile``
+    """
+    import torch
+    
+    torch.set_num_threads(profile["intra_op_threads"])
+    if torch.get_num_interop_threads() != profile["inter_op_threads"]:
+        try:
+            torch.set_num_interop_threads(profile["inter_op_threads"])
+        except RuntimeError:
+            pass
+
+def autotune(
+    texts: Optional[Sequence[str]] = None,
+    batch_sizes: Sequence[int] = (8, 16, 32, 64),
+    thread_counts: Optional[Sequence[int]] = None,
+    precisions: Sequence[str] = ("fp32",),
+    backends: Sequence[str] = ("eager",),
+    model_manager: Optional["ModelManager"] = None,
+    min_agreement: float = PRECISION_MIN_AGREEMENT,
+    num_texts: int = 128,
+    repeats: int = 2
+) -> Dict:
+    """
+    Find the fastest inference configuration on this host.
+    
+    Every precision and backend pair is loaded once, and the fp32 eager
+    reference is always included. For each pair, every thread count and batch
+    size is timed on the calibration texts after one warm-up pass, keeping
+    the best of ``repeats`` runs.
+    
+    Args:
+        texts: Calibration texts. Synthetic review-like texts with mixed
+            lengths are generated if omitted; real traffic is better.
+        batch_sizes: Batch sizes to try
+        thread_counts: Intra-op thread counts to try (defaults to 1, half the
+            cores and all cores)
+        precisions: Precisions to try (see ModelManager)
+        backends: Backends to try (see ModelManager)
+        model_manager: The loaded fp32 eager ModelManager to use as the
+            reference. A default one is created if omitted.
+        min_agreement: Minimum label agreement with fp32 eager for another
+            precision or backend to be eligible
+        num_texts: Number of synthetic texts when ``texts`` is omitted
+        repeats: Timed runs per configuration
+    
+    Returns:
+        A profile dictionary containing version, model_name, host, created
+        (UNIX time), batch_size, intra_op_threads, inter_op_threads, precision, backend,
+        texts_per_sec and trials (every measured configuration, including
+        its label agreement and whether it was eligible)
+    """
+    import torch
+    from app.models.model_manager import ModelManager
+    from app.utils.benchmark import make_texts
+    from app.utils.parity import compare_analyzers
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+    
+    texts = list(texts) if texts is not None else make_texts(num_texts, "mixed")
+    cores = os.cpu_count() or 1
+    thread_counts = sorted(set(thread_counts or (1, max(1, cores // 2), cores)))
+    reference_manager = model_manager or ModelManager(precision="fp32", backend="eager")
+    reference = SentimentAnalyzer(batch_size=max(batch_sizes), model_manager=reference_manager)
+    
+    original_threads = torch.get_num_threads()
+    trials = []
+    try:
+        # The reference is always measured, so there is an eligible choice
+        configurations = [(reference_manager.precision, reference_manager.backend)]
+        for precision in precisions:
+            for backend in backends:
+                if (precision, backend) not in configurations:
+                    configurations.append((precision, backend))
+        for precision, backend in configurations:
+            if (precision, backend) == configurations[0]:
+                candidate = reference
+                agreement, eligible = 1.0, True
+            else:
+                candidate = SentimentAnalyzer(
+                    batch_size=max(batch_sizes),
+                    model_manager=ModelManager(
+                        model_name=reference_manager.model_name,
+                        precision=precision,
+                        backend=backend,
+                        tokenizer=reference_manager.tokenizer,
+                        labels=reference_manager.labels
+                    )
+                )
+                report = compare_analyzers(texts, reference, candidate, min_agreement)
+                agreement, eligible = report["label_agreement"], report["passed"]
+            manager = candidate.model_manager
+            for num_threads in thread_counts:
+                torch.set_num_threads(num_threads)
+                for batch_size in batch_sizes:
+                    candidate.batch_size = batch_size
+                    candidate._infer_chunked(texts[:batch_size])
+                    seconds = min(_time_run(candidate, texts) for _ in range(repeats))
+                    trials.append({
+                        # Record what actually ran, after any fallback
+                        "precision": manager.precision,
+                        "backend": manager.backend,
+                        "intra_op_threads": num_threads,
+                        "batch_size": batch_size,
+                        "texts_per_sec": len(texts) / seconds if seconds > 0 else 0.0,
+                        "label_agreement": agreement,
+                        "eligible": eligible
+                    })
+    finally:
+        torch.set_num_threads(original_threads)
+    
+    best = max((trial for trial in trials if trial["eligible"]), key=lambda trial: trial["texts_per_sec"])
+    return {
+        "version": PROFILE_VERSION,
+        "model_name": reference_manager.model_name,
+        "host": host_fingerprint(),
+        "created": time.time(),
+        "batch_size": best["batch_size"],
+        "intra_op_threads": best["intra_op_threads"],
+        "inter_op_threads": torch.get_num_interop_threads(),
+        "precision": best["precision"],
+        "backend": best["backend"],
+        "texts_per_sec": best["texts_per_sec"],
+        "trials": trials
+    }
+
+def _time_run(analyzer, texts: List[str]) -> float:
+    """
+    Time one inference pass over the texts, bypassing cache and store.
+    """
+    start = time.perf_counter()
+    analyzer._infer_chunked(texts)
+    return time.perf_counter() - start
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+def _str_list(value: str) -> List[str]:
+    return [item for item in value.split(",") if item]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line interface for autotuning.
+    
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv[1:]``)
+    
+    Returns:
+        int: Exit code (0 for success)
+    """
+    parser = argparse.ArgumentParser(description="Tune inference settings for this host.")
+    parser.add_argument("--model", default=MODEL_NAME, help="model to tune (defaults to MODEL_NAME)")
+    parser.add_argument("--texts", help="file with one calibration text per line")
+    parser.add_argument("--batch-sizes", type=_int_list, default=[8, 16, 32, 64])
+    parser.add_argument("--threads", type=_int_list, help="intra-op thread counts to try")
+    parser.add_argument("--precisions", type=_str_list, default=["fp32"])
+    parser.add_argument("--backends", type=_str_list, default=["eager"])
+    parser.add_argument("--output", default=AUTOTUNE_PROFILE_PATH, help="profile file to write")
+    args = parser.parse_args(argv)
+    
+    from app.models.model_manager import ModelManager
+    
+    texts = None
+    if args.texts:
+        with open(args.texts, encoding="utf-8") as f:
+            texts = [line.rstrip("\n") for line in f if line.strip()]
+    profile = autotune(
+        texts,
+        batch_sizes=args.batch_sizes,
+        thread_counts=args.threads,
+        precisions=args.precisions,
+        backends=args.backends,
+        model_manager=ModelManager(model_name=args.model, precision="fp32", backend="eager")
+    )
+    path = save_profile(profile, args.output)
+    print(f"Best: batch_size={profile['batch_size']} threads={profile['intra_op_threads']} "
+          f"precision={profile['precision']} backend={profile['backend']} "
+          f"({profile['texts_per_sec']:.1f} texts/sec)")
+    print(f"Saved profile to {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
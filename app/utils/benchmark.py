@@ -0,0 +1,369 @@
+"""
+Offline benchmark suite for the sentiment analyzer.
+
+This module measures throughput and tail latency of SentimentAnalyzer without
+network access. It builds a small, randomly initialized DistilBERT model and
+WordPiece tokenizer in a local directory, then sweeps batch size, text length
+distribution, PyTorch thread count and the single vs batch code path. Each
+case reports texts/sec, p50/p95/p99 latency and peak RSS, and the whole run is
+written as JSON. A saved report can be used as a baseline: ``compare`` flags
+cases whose throughput dropped or whose tail latency grew beyond a tolerance.
+
+The random model gives meaningless labels, but it runs the same tokenizer,
+padding, forward and post-processing code as the real one, so relative
+changes in speed carry over.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    $ python -m app.utils.benchmark run --output baseline.json
+    $ python -m app.utils.benchmark run --output current.json --baseline baseline.json
+    $ python -m app.utils.benchmark compare baseline.json current.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import string
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Word counts (min, max) per text for each length distribution
+LENGTH_DISTRIBUTIONS = {
+    "short": (4, 16),
+    "mixed": (4, 200),
+    "long": (150, 400)
+}
+
+# Benchmark code paths: one analyze call per text, or per batch of texts
+MODES = ("single", "batch")
+
+# Words used to build the tiny vocabulary and the synthetic texts
+_WORDS = (
+    "the a this that it is was be not very really so too quite and but or "
+    "i you we they love like hate enjoy dislike product service movie food "
+    "staff experience price quality delivery support app update phone book "
+    "great good fine okay bad terrible amazing awful excellent poor slow fast "
+    "friendly rude cheap expensive broken perfect worst best ever never again "
+    "today yesterday always sometimes would will could recommend return buy"
+).split()
+
+def build_tiny_model(directory: str, seed: int = 0) -> str:
+    """
+    Save a small random DistilBERT classifier and its tokenizer to a directory.
+    
+    Args:
+        directory: Directory to write the model and tokenizer files to
+        seed: Seed for the random weights
+    
+    Returns:
+        The directory, which can be passed to ``ModelManager(model_name=...)``
+    """
+    import torch
+    from transformers import (
+        DistilBertConfig,
+        DistilBertForSequenceClassification,
+        DistilBertTokenizerFast
+    )
+    from app.config.settings import MAX_LENGTH, SENTIMENT_LABELS
+    
+    os.makedirs(directory, exist_ok=True)
+    characters = string.ascii_lowercase + string.digits + string.punctuation
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab += list(characters)
+    vocab += ["##" + character for character in string.ascii_lowercase + string.digits]
+    vocab += sorted(set(_WORDS) - set(characters))
+    vocab_file = os.path.join(directory, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab) + "\n")
+    
+    tokenizer = DistilBertTokenizerFast(vocab_file, do_lower_case=True)
+    config = DistilBertConfig(
+        vocab_size=len(vocab),
+        dim=64,
+        n_layers=2,
+        n_heads=2,
+        hidden_dim=256,
+        max_position_embeddings=MAX_LENGTH,
+        id2label=dict(SENTIMENT_LABELS),
+        label2id={label: index for index, label in SENTIMENT_LABELS.items()}
+    )
+    torch.manual_seed(seed)
+    model = DistilBertForSequenceClassification(config)
+    model.save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+    return directory
+
+def make_texts(count: int, distribution: str = "mixed", seed: int = 0) -> List[str]:
+    """
+    Generate synthetic review-like texts with a given length distribution.
+    
+    Args:
+        count: Number of texts
+        distribution: One of LENGTH_DISTRIBUTIONS
+        seed: Seed for the random generator
+    
+    Returns:
+        A list of texts, reproducible for the same arguments
+    """
+    if distribution not in LENGTH_DISTRIBUTIONS:
+        raise ValueError(
+            f"distribution must be one of {tuple(LENGTH_DISTRIBUTIONS)}, got {distribution!r}"
+        )
+    low, high = LENGTH_DISTRIBUTIONS[distribution]
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(_WORDS) for _ in range(rng.randint(low, high))) + "."
+        for _ in range(count)
+    ]
+
+def peak_rss_mb() -> float:
+    """
+    Get the peak resident set size of this process so far, in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_case(analyzer, texts: Sequence[str], mode: str, batch_size: int) -> Dict:
+    """
+    Time one benchmark case.
+    
+    In "single" mode every text is a separate ``analyze`` call; in "batch" mode
+    texts are passed ``batch_size`` at a time. Latency is measured per call.
+    One untimed call runs first so lazy initialization is not counted.
+    
+    Args:
+        analyzer: The SentimentAnalyzer to measure
+        texts: The texts to analyze
+        mode: One of MODES
+        batch_size: Texts per call in "batch" mode
+    
+    Returns:
+        A dictionary containing texts, calls, seconds, texts_per_sec,
+        p50_ms, p95_ms, p99_ms and peak_rss_mb
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    texts = list(texts)
+    if mode == "single":
+        calls = texts
+    else:
+        calls = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    
+    analyzer.analyze(calls[0])
+    latencies = []
+    start = time.perf_counter()
+    for call in calls:
+        call_start = time.perf_counter()
+        analyzer.analyze(call)
+        latencies.append(time.perf_counter() - call_start)
+    seconds = time.perf_counter() - start
+    
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "texts": len(texts),
+        "calls": len(calls),
+        "seconds": seconds,
+        "texts_per_sec": len(texts) / seconds if seconds > 0 else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+def run_suite(
+    batch_sizes: Sequence[int] = (1, 8, 32),
+    distributions: Sequence[str] = ("short", "mixed", "long"),
+    threads: Sequence[int] = (1,),
+    modes: Sequence[str] = MODES,
+    num_texts: int = 256,
+    model_dir: Optional[str] = None,
+    seed: int = 0
+) -> Dict:
+    """
+    Run the benchmark sweep.
+    
+    Single mode ignores the batch size, so it runs once per distribution and
+    thread count. Peak RSS is a process-wide high-water mark, so it never
+    decreases from one case to the next.
+    
+    Args:
+        batch_sizes: Batch sizes for "batch" mode
+        distributions: Text length distributions (see LENGTH_DISTRIBUTIONS)
+        threads: PyTorch intra-op thread counts
+        modes: Code paths to measure (see MODES)
+        num_texts: Texts per case
+        model_dir: Local model directory. A tiny random model is built in a
+            temporary directory if omitted.
+        seed: Seed for the model weights and the texts
+    
+    Returns:
+        A report dictionary with "environment", "config" and "cases" keys.
+        Every case has a unique "name" used by ``compare_reports``.
+    """
+    import torch
+    from app.models.model_manager import ModelManager
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager = ModelManager(model_name=model_dir or build_tiny_model(temp_dir, seed))
+    analyzer = SentimentAnalyzer(model_manager=manager)
+    
+    original_threads = torch.get_num_threads()
+    cases = []
+    try:
+        for num_threads in threads:
+            torch.set_num_threads(num_threads)
+            for distribution in distributions:
+                texts = make_texts(num_texts, distribution, seed)
+                for mode in modes:
+                    for batch_size in (batch_sizes if mode == "batch" else [1]):
+                        name = f"{mode}/{distribution}/bs{batch_size}/t{num_threads}"
+                        case = {
+                            "name": name,
+                            "mode": mode,
+                            "distribution": distribution,
+                            "batch_size": batch_size,
+                            "threads": num_threads
+                        }
+                        case.update(run_case(analyzer, texts, mode, batch_size))
+                        cases.append(case)
+    finally:
+        torch.set_num_threads(original_threads)
+    
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "config": {
+            "model": model_dir or "tiny-random-distilbert",
+            "num_texts": num_texts,
+            "seed": seed
+        },
+        "cases": cases
+    }
+
+def compare_reports(baseline: Dict, current: Dict, tolerance: float = 0.1) -> Dict:
+    """
+    Compare a benchmark report against a baseline report.
+    
+    A case regresses if its texts/sec fell by more than ``tolerance`` or its
+    p95 or p99 latency rose by more than ``tolerance`` (relative).
+    
+    Args:
+        baseline: A report from ``run_suite``
+        current: A report from ``run_suite``
+        tolerance: Allowed relative change (0.1 = 10%)
+    
+    Returns:
+        A dictionary containing:
+            - regressions: One entry per regressed metric with name, metric,
+              baseline, current and change (relative)
+            - compared: Number of cases present in both reports
+            - missing: Names of baseline cases absent from the current report
+            - passed: True if there are no regressions
+    """
+    current_cases = {case["name"]: case for case in current["cases"]}
+    regressions = []
+    missing = []
+    compared = 0
+    for old in baseline["cases"]:
+        new = current_cases.get(old["name"])
+        if new is None:
+            missing.append(old["name"])
+            continue
+        compared += 1
+        for metric, higher_is_better in (("texts_per_sec", True), ("p95_ms", False), ("p99_ms", False)):
+            before, after = old[metric], new[metric]
+            if before <= 0:
+                continue
+            change = (after - before) / before
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append({
+                    "name": old["name"],
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change": change
+                })
+    return {
+        "regressions": regressions,
+        "compared": compared,
+        "missing": missing,
+        "passed": not regressions
+    }
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+def _str_list(value: str) -> List[str]:
+    return [item for item in value.split(",") if item]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmark command line interface.
+    
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv[1:]``)
+    
+    Returns:
+        int: Exit code (0 for success, 1 if a comparison found regressions)
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the sentiment analyzer offline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run = commands.add_parser("run", help="run the benchmark sweep")
+    run.add_argument("--output", help="write the JSON report to this file")
+    run.add_argument("--baseline", help="compare against this saved report")
+    run.add_argument("--batch-sizes", type=_int_list, default=[1, 8, 32])
+    run.add_argument("--distributions", type=_str_list, default=list(LENGTH_DISTRIBUTIONS))
+    run.add_argument("--threads", type=_int_list, default=[1])
+    run.add_argument("--modes", type=_str_list, default=list(MODES))
+    run.add_argument("--num-texts", type=int, default=256)
+    run.add_argument("--model", help="local model directory (default: tiny random DistilBERT)")
+    run.add_argument("--tolerance", type=float, default=0.1)
+    
+    compare = commands.add_parser("compare", help="compare two saved reports")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    
+    if args.command == "run":
+        report = run_suite(
+            args.batch_sizes, args.distributions, args.threads, args.modes,
+            args.num_texts, args.model
+        )
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        if not args.baseline:
+            return 0
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            report = json.load(f)
+    
+    comparison = compare_reports(baseline, report, args.tolerance)
+    print(json.dumps(comparison, indent=2), file=sys.stderr if args.command == "run" else sys.stdout)
+    return 0 if comparison["passed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""
+Resumable, shardable bulk scoring of large text files.
+
+This module scores every record of a JSONL, CSV or plain-text file and writes
+one JSON line per record. The input is memory-mapped and indexed by line
+offsets, so a job jumps straight to any line without reading what comes
+before it. That makes two things cheap:
+
+- Sharding: ``--shard i/N`` scores only the i-th of N contiguous line ranges,
+  so N machines can split one file without coordinating.
+- Resuming: after every batch the job flushes its output and atomically
+  records the next line and the output size in a checkpoint file. A killed
+  job started again with the same arguments truncates any partial output and
+  continues from the checkpoint.
+
+Records must fit on one line; CSV fields with embedded newlines are not
+supported. Progress (texts/sec and ETA) is printed to stderr.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    $ python -m app.utils.bulk_job reviews.jsonl scores.jsonl --text-field body
+    $ python -m app.utils.bulk_job reviews.csv scores-0.jsonl --shard 0/4
+"""
+
+import argparse
+import csv
+import json
+import mmap
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from app.config.settings import BULK_BATCH_SIZE, BULK_PROGRESS_INTERVAL_S
+
+if TYPE_CHECKING:
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+# Supported input formats, detected from the file extension by default
+FORMATS = ("jsonl", "csv", "txt")
+
+# Bytes scanned at a time while indexing line offsets
+_INDEX_CHUNK_BYTES = 64 * 1024 * 1024
+
+def build_line_index(data: mmap.mmap) -> np.ndarray:
+    """
+    Find the start offset of every line in a memory-mapped file.
+    
+    Args:
+        data: The memory-mapped file
+    
+    Returns:
+        An int64 array of line start offsets followed by the file size, so
+        line i spans ``offsets[i]:offsets[i + 1]``. A final line without a
+        trailing newline is included; an empty file has no lines.
+    """
+    size = len(data)
+    starts = [np.zeros(1, dtype=np.int64)]
+    for chunk_start in range(0, size, _INDEX_CHUNK_BYTES):
+        count = min(_INDEX_CHUNK_BYTES, size - chunk_start)
+        chunk = np.frombuffer(data, dtype=np.uint8, count=count, offset=chunk_start)
+        starts.append(np.flatnonzero(chunk == ord("\n")) + chunk_start + 1)
+    offsets = np.concatenate(starts).astype(np.int64)
+    if offsets[-1] != size:
+        offsets = np.append(offsets, size)
+    return offsets
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a shard specification of the form "i/N".
+    
+    Args:
+        value: Zero-based shard index and shard count, e.g. "0/4"
+    
+    Returns:
+        Tuple of (index, count)
+    
+    Raises:
+        ValueError: If the specification is malformed or out of range
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, got {value!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"shard index must be in [0, {count}), got {value!r}")
+    return index, count
+
+def shard_range(first: int, end: int, index: int, count: int) -> Tuple[int, int]:
+    """
+    Get the line range of one shard.
+    
+    Args:
+        first: First data line of the file
+        end: One past the last line of the file
+        index: Zero-based shard index
+        count: Number of shards
+    
+    Returns:
+        Tuple of (start line, end line) for the shard. The shards of a file
+        are contiguous, disjoint and cover every data line.
+    """
+    total = end - first
+    return first + total * index // count, first + total * (index + 1) // count
+
+def detect_format(path: str) -> str:
+    """
+    Guess the input format from a file extension ("txt" if unknown).
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    return extension if extension in FORMATS else "txt"
+
+def run_job(
+    input_path: str,
+    output_path: str,
+    input_format: Optional[str] = None,
+    text_field: str = "text",
+    shard: Tuple[int, int] = (0, 1),
+    batch_size: int = BULK_BATCH_SIZE,
+    analyzer: Optional["SentimentAnalyzer"] = None,
+    restart: bool = False,
+    progress: Optional[TextIO] = sys.stderr,
+    progress_interval: float = BULK_PROGRESS_INTERVAL_S
+) -> Dict:
+    """
+    Score one shard of a file, resuming from its checkpoint if there is one.
+    
+    Each output line holds the input line number (0-based, counting a CSV
+    header), the record's "id" field if it has one, and the usual result
+    keys. Records that cannot be decoded as UTF-8 or parsed produce a line
+    with an "error" key instead; blank lines are skipped.
+    
+    Args:
+        input_path: JSONL, CSV or plain-text input file
+        output_path: JSONL output file. The checkpoint is stored next to it
+            as ``<output_path>.checkpoint``.
+        input_format: One of FORMATS (detected from the extension if omitted)
+        text_field: JSON key or CSV column holding the text
+        shard: Zero-based (index, count) of the shard to score
+        batch_size: Records analyzed and checkpointed together
+        analyzer: Analyzer to use (defaults to ``get_analyzer()``)
+        restart: Ignore an existing checkpoint and start the shard over
+        progress: Stream for progress lines (None disables them)
+        progress_interval: Seconds between progress lines
+    
+    Returns:
+        A dictionary containing start_line, end_line, resumed_from (None for
+        a fresh start), records (written by this run), errors and seconds
+    
+    Raises:
+        ValueError: If the checkpoint belongs to a different job, the first
+            line is not valid UTF-8 or a CSV header lacks ``text_field``
+    """
+    input_format = input_format or detect_format(input_path)
+    if input_format not in FORMATS:
+        raise ValueError(f"input_format must be one of {FORMATS}, got {input_format!r}")
+    if analyzer is None:
+        from app.utils.sentiment_utils import get_analyzer
+        analyzer = get_analyzer()
+    
+    with open(input_path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(input_path) else b""
+    try:
+        offsets = build_line_index(data)
+
+        def line(number: int) -> str:
+            return bytes(data[offsets[number]:offsets[number + 1]]).decode("utf-8").rstrip("\r\n")
+        
+        total_lines = len(offsets) - 1
+        try:
+            header_line = line(0) if total_lines else ""
+        except UnicodeDecodeError as error:
+            raise ValueError(f"first line of {input_path} is not valid UTF-8: {error}") from None
+        parse, first_line = _make_parser(input_format, text_field, header_line)
+        start_line, end_line = shard_range(first_line, max(total_lines, first_line), *shard)
+        
+        checkpoint_path = output_path + ".checkpoint"
+        job = {
+            "input": os.path.abspath(input_path),
+            "format": input_format,
+            "text_field": text_field,
+            "shard": list(shard),
+            "end_line": end_line
+        }
+        next_line, output_bytes = start_line, 0
+        resumed_from = None
+        if not restart and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            if checkpoint["job"] != job:
+                raise ValueError(f"{checkpoint_path} belongs to a different job; use restart")
+            if os.path.exists(output_path):
+                next_line, output_bytes = checkpoint["next_line"], checkpoint["output_bytes"]
+                resumed_from = next_line
+        
+        mode = "wb" if resumed_from is None else "r+b"
+        records = errors = 0
+        started = last_report = time.monotonic()
+        with open(output_path, mode) as out:
+            out.truncate(output_bytes)
+            out.seek(output_bytes)
+            while next_line < end_line:
+                batch_end = min(next_line + batch_size, end_line)
+                rows: List[Dict] = []
+                texts: List[str] = []
+                for number in range(next_line, batch_end):
+                    try:
+                        raw = line(number)
+                        if not raw.strip():
+                            continue
+                        text, record_id = parse(raw)
+                    except (UnicodeDecodeError, ValueError, KeyError, TypeError) as error:
+                        rows.append({"line": number, "error": str(error)})
+                        errors += 1
+                        continue
+                    row = {"line": number}
+                    if record_id is not None:
+                        row["id"] = record_id
+                    rows.append(row)
+                    texts.append(text)
+                
+                results = iter(analyzer.analyze(texts, bucket_by_length=True) if texts else [])
+                for row in rows:
+                    if "error" not in row:
+                        row.update(next(results))
+                    out.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+                records += len(rows)
+                out.flush()
+                os.fsync(out.fileno())
+                next_line = batch_end
+                _write_checkpoint(checkpoint_path, job, next_line, out.tell())
+                
+                now = time.monotonic()
+                if progress is not None and (now - last_report >= progress_interval or next_line == end_line):
+                    last_report = now
+                    _report_progress(progress, next_line - start_line, end_line - start_line,
+                                     next_line - (resumed_from or start_line), now - started)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+    
+    return {
+        "start_line": start_line,
+        "end_line": end_line,
+        "resumed_from": resumed_from,
+        "records": records,
+        "errors": errors,
+        "seconds": time.monotonic() - started
+    }
+
+def _make_parser(
+    input_format: str,
+    text_field: str,
+    header_line: str
+) -> Tuple[Callable[[str], Tuple[str, Optional[str]]], int]:
+    """
+    Build the record parser for a format.
+    
+    Args:
+        input_format: One of FORMATS
+        text_field: JSON key or CSV column holding the text
+        header_line: The file's first line (the header for CSV)
+    
+    Returns:
+        Tuple of (parser mapping a line to (text, id or None), first data line)
+    """
+    if input_format == "txt":
+        return (lambda raw: (raw, None)), 0
+    if input_format == "jsonl":
+        def parse_json(raw: str) -> Tuple[str, Optional[str]]:
+            record = json.loads(raw)
+            text = record[text_field]
+            if not isinstance(text, str):
+                raise TypeError(f"field {text_field!r} is not a string")
+            return text, record.get("id")
+        return parse_json, 0
+    
+    header = next(csv.reader([header_line]), [])
+    if text_field not in header:
+        raise ValueError(f"CSV header has no {text_field!r} column: {header}")
+    text_column = header.index(text_field)
+    id_column = header.index("id") if "id" in header else None
+
+    def parse_csv(raw: str) -> Tuple[str, Optional[str]]:
+        fields = next(csv.reader([raw]))
+        if len(fields) < len(header):
+            raise ValueError(f"expected {len(header)} CSV fields, got {len(fields)}")
+        return fields[text_column], fields[id_column] if id_column is not None else None
+    return parse_csv, 1
+
+def _write_checkpoint(path: str, job: Dict, next_line: int, output_bytes: int) -> None:
+    """
+    Atomically replace the checkpoint file.
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({"job": job, "next_line": next_line, "output_bytes": output_bytes}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+def _report_progress(stream: TextIO, done: int, total: int, this_run: int, seconds: float) -> None:
+    """
+    Print lines done, throughput and estimated time remaining.
+    """
+    rate = this_run / seconds if seconds > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 else float("inf")
+    print(f"{done}/{total} lines  {rate:.1f} texts/sec  ETA {eta:.0f}s", file=stream, flush=True)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line interface for bulk scoring.
+    
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv[1:]``)
+    
+    Returns:
+        int: Exit code (0 for success)
+    """
+    parser = argparse.ArgumentParser(description="Score a large text file, resumably.")
+    parser.add_argument("input", help="JSONL, CSV or plain-text file, one record per line")
+    parser.add_argument("output", help="JSONL file to write results to")
+    parser.add_argument("--format", choices=FORMATS, help="input format (default: from extension)")
+    parser.add_argument("--text-field", default="text", help="JSON key or CSV column with the text")
+    parser.add_argument("--shard", default="0/1", help="zero-based shard i/N of the input lines")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as error:
+        parser.error(str(error))
+    
+    try:
+        stats = run_job(
+            args.input,
+            args.output,
+            input_format=args.format,
+            text_field=args.text_field,
+            shard=shard,
+            batch_size=args.batch_size,
+            restart=args.restart
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
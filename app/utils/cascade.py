@@ -0,0 +1,397 @@
+"""
+Confidence-gated cascade with a cheap first-stage classifier.
+
+This module provides a two-stage analyzer. A hashed n-gram linear model,
+trained offline on the transformer's own predictions, answers the texts it is
+confident about in microseconds; only the texts it is unsure of are sent
+through DistilBERT. The first stage needs nothing but NumPy, so it runs
+before torch is even imported. Every result carries a "stage" key saying
+which model answered, and ``report`` measures how much traffic the first
+stage takes and how often it agrees with the full model.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> # Offline: learn from the transformer's labels on unlabeled traffic
+    >>> classifier = distill(sample_of_traffic)
+    >>> classifier.save("first_stage.npz")
+    
+    >>> cascade = CascadeAnalyzer(HashedNgramClassifier.load("first_stage.npz"))
+    >>> cascade.analyze("I love it!")
+    {'text': 'I love it!', 'sentiment': 'POSITIVE', 'confidence': 0.97, 'is_confident': True, 'stage': 'fast'}
+    >>> cascade.report(held_out_texts)
+    {'total_texts': 1000, 'fast_share': 0.71, 'fast_agreement': 0.985, ...}
+"""
+
+import re
+import zlib
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.config.settings import (
+    CASCADE_NGRAM_RANGE,
+    CASCADE_NUM_FEATURES,
+    CASCADE_THRESHOLD,
+    CONFIDENCE_THRESHOLD,
+    SENTIMENT_LABELS
+)
+
+if TYPE_CHECKING:
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+# Names of the cascade stages reported in each result's "stage" key
+FAST_STAGE = "fast"
+TRANSFORMER_STAGE = "transformer"
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+class HashedNgramClassifier:
+    """
+    A multinomial logistic regression over hashed word n-grams.
+    
+    Texts are lowercased and split into word and punctuation tokens. Every
+    n-gram is hashed with CRC32 into ``num_features`` buckets, so the model
+    needs no vocabulary and produces the same features in every process.
+    
+    Attributes:
+        num_features (int): Number of hash buckets
+        ngram_range (Tuple[int, int]): Smallest and largest n-gram length
+        labels (Dict[int, str]): Mapping from label id to sentiment name
+        weights (np.ndarray): Weights of shape (num_features, number of labels)
+        bias (np.ndarray): Bias of shape (number of labels,)
+    """
+
+    def __init__(
+        self,
+        num_features: int = CASCADE_NUM_FEATURES,
+        ngram_range: Tuple[int, int] = CASCADE_NGRAM_RANGE,
+        labels: Mapping[int, str] = SENTIMENT_LABELS
+    ):
+        """
+        Initialize an untrained classifier.
+        
+        Args:
+            num_features: Number of hash buckets
+            ngram_range: Smallest and largest n-gram length
+            labels: Mapping from label id to sentiment name. Label ids must be
+                0 to len(labels) - 1.
+        """
+        self.num_features = num_features
+        self.ngram_range = tuple(ngram_range)
+        self.labels = {int(index): name for index, name in labels.items()}
+        self.weights = np.zeros((num_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+    
+    def featurize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Turn texts into L2-normalized sparse rows of hashed n-gram counts.
+        
+        Args:
+            texts: The texts to featurize
+        
+        Returns:
+            Tuple of (indices, values, row_ids): for every non-zero entry, its
+            feature index, its value and the row it belongs to
+        """
+        low, high = self.ngram_range
+        indices: List[int] = []
+        values: List[float] = []
+        row_ids: List[int] = []
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_PATTERN.findall(text.lower())
+            counts: Dict[int, int] = {}
+            for n in range(low, high + 1):
+                for start in range(len(tokens) - n + 1):
+                    ngram = " ".join(tokens[start:start + n])
+                    index = zlib.crc32(ngram.encode("utf-8")) % self.num_features
+                    counts[index] = counts.get(index, 0) + 1
+            if not counts:
+                continue
+            norm = sum(count * count for count in counts.values()) ** 0.5
+            indices.extend(counts)
+            values.extend(count / norm for count in counts.values())
+            row_ids.extend([row] * len(counts))
+        return (
+            np.array(indices, dtype=np.int64),
+            np.array(values, dtype=np.float32),
+            np.array(row_ids, dtype=np.int64)
+        )
+    
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Get class probabilities for texts.
+        
+        Args:
+            texts: The texts to score
+        
+        Returns:
+            Probabilities of shape (number of texts, number of labels)
+        """
+        return _softmax(self._scores(self.featurize(texts), len(texts)))
+    
+    def predict(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get label ids and confidences for texts.
+        
+        Args:
+            texts: The texts to score
+        
+        Returns:
+            Tuple of (label ids, confidences) as NumPy arrays
+        """
+        probabilities = self.predict_proba(texts)
+        return probabilities.argmax(axis=1), probabilities.max(axis=1)
+    
+    def fit(
+        self,
+        texts: Sequence[str],
+        label_ids: Sequence[int],
+        epochs: int = 10,
+        learning_rate: float = 1.0,
+        batch_size: int = 256,
+        l2: float = 1e-6,
+        seed: int = 0
+    ) -> "HashedNgramClassifier":
+        """
+        Train with mini-batch gradient descent on the softmax cross-entropy.
+        
+        Args:
+            texts: Training texts
+            label_ids: Label id of each text, e.g. the transformer's predictions
+            epochs: Passes over the training data
+            learning_rate: Step size
+            batch_size: Texts per gradient step
+            l2: L2 penalty on the weights
+            seed: Seed for shuffling
+        
+        Returns:
+            The classifier itself
+        """
+        texts = list(texts)
+        targets = np.asarray(label_ids, dtype=np.int64)
+        if len(texts) != len(targets):
+            raise ValueError("texts and label_ids must have the same length")
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                indices, values, row_ids = features = self.featurize([texts[i] for i in rows])
+                probabilities = _softmax(self._scores(features, len(rows)))
+                probabilities[np.arange(len(rows)), targets[rows]] -= 1
+                delta = probabilities / len(rows)
+                gradient = values[:, None] * delta[row_ids]
+                self.weights *= 1 - learning_rate * l2
+                np.subtract.at(self.weights, indices, learning_rate * gradient)
+                self.bias -= learning_rate * delta.sum(axis=0)
+        return self
+    
+    def save(self, path: str) -> None:
+        """
+        Save the classifier to a ``.npz`` file.
+        
+        Args:
+            path: Target file path
+        """
+        label_ids = sorted(self.labels)
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            ngram_range=np.array(self.ngram_range),
+            label_ids=np.array(label_ids),
+            label_names=np.array([self.labels[index] for index in label_ids])
+        )
+    
+    @classmethod
+    def load(cls, path: str) -> "HashedNgramClassifier":
+        """
+        Load a classifier saved with ``save``.
+        
+        Args:
+            path: Path of the ``.npz`` file
+        
+        Returns:
+            The loaded classifier
+        """
+        with np.load(path) as data:
+            labels = dict(zip(data["label_ids"].tolist(), data["label_names"].tolist()))
+            classifier = cls(data["weights"].shape[0], tuple(data["ngram_range"].tolist()), labels)
+            classifier.weights = data["weights"]
+            classifier.bias = data["bias"]
+        return classifier
+    
+    def _scores(self, features: Tuple[np.ndarray, np.ndarray, np.ndarray], rows: int) -> np.ndarray:
+        """
+        Compute raw class scores for featurized rows.
+        """
+        indices, values, row_ids = features
+        scores = np.tile(self.bias, (rows, 1))
+        np.add.at(scores, row_ids, values[:, None] * self.weights[indices])
+        return scores
+
+class CascadeAnalyzer:
+    """
+    Answers confident texts with a fast classifier and the rest with the transformer.
+    
+    Attributes:
+        first_stage (HashedNgramClassifier): The fast classifier
+        threshold (float): Minimum first-stage confidence to skip the transformer
+        fast_count (int): Texts answered by the first stage so far
+        transformer_count (int): Texts sent to the transformer so far
+    """
+
+    def __init__(
+        self,
+        first_stage: HashedNgramClassifier,
+        analyzer: Optional["SentimentAnalyzer"] = None,
+        threshold: float = CASCADE_THRESHOLD
+    ):
+        """
+        Initialize the cascade.
+        
+        Args:
+            first_stage: A trained HashedNgramClassifier
+            analyzer: The transformer analyzer for uncertain texts. Defaults to
+                the singleton from ``get_analyzer()``, loaded on first use.
+            threshold: Minimum first-stage confidence to answer a text without
+                the transformer
+        """
+        self.first_stage = first_stage
+        self.threshold = threshold
+        self.fast_count = 0
+        self.transformer_count = 0
+        self._analyzer = analyzer
+    
+    def analyze(self, text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
+        """
+        Analyze the sentiment of the input text(s) through the cascade.
+        
+        Args:
+            text: Either a single text string or a list of text strings to analyze
+        
+        Returns:
+            The same result format as ``SentimentAnalyzer.analyze``, plus a
+            "stage" key that is "fast" or "transformer"
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        label_ids, confidences = self.first_stage.predict(texts)
+        uncertain = [i for i, confidence in enumerate(confidences) if confidence < self.threshold]
+        
+        results = [
+            {
+                "text": item,
+                "sentiment": self.first_stage.labels[int(label_id)],
+                "confidence": float(confidence),
+                "is_confident": bool(confidence >= CONFIDENCE_THRESHOLD),
+                "stage": FAST_STAGE
+            }
+            for item, label_id, confidence in zip(texts, label_ids, confidences)
+        ]
+        if uncertain:
+            transformer_results = self._get_analyzer().analyze([texts[i] for i in uncertain])
+            for index, result in zip(uncertain, transformer_results):
+                results[index] = dict(result, stage=TRANSFORMER_STAGE)
+        
+        self.transformer_count += len(uncertain)
+        self.fast_count += len(texts) - len(uncertain)
+        return results[0] if isinstance(text, str) else results
+    
+    def report(self, texts: Sequence[str]) -> Dict:
+        """
+        Measure routing and agreement with the full model on a set of texts.
+        
+        Every text is scored by both stages, so this costs a full transformer
+        pass and is meant for offline evaluation.
+        
+        Args:
+            texts: Evaluation texts, ideally a sample of real traffic
+        
+        Returns:
+            A dictionary containing:
+                - total_texts: Number of texts evaluated
+                - threshold: The routing threshold
+                - fast_count: Texts the first stage would answer
+                - fast_share: fast_count as a share of all texts (0-1)
+                - fast_agreement: Label agreement with the transformer on the
+                  texts the first stage answers (None if there are none)
+                - first_stage_agreement: Agreement of the first stage alone on
+                  all texts
+                - cascade_agreement: Agreement of the cascade's output with
+                  the transformer on all texts
+        """
+        texts = list(texts)
+        fast_labels, confidences = self.first_stage.predict(texts)
+        full_labels = np.asarray(self._get_analyzer()._infer(texts)[0], dtype=np.int64)
+        routed = confidences >= self.threshold
+        agrees = fast_labels == full_labels
+        
+        total = len(texts)
+        fast_count = int(routed.sum())
+        return {
+            "total_texts": total,
+            "threshold": self.threshold,
+            "fast_count": fast_count,
+            "fast_share": fast_count / total if total else 0.0,
+            "fast_agreement": float(agrees[routed].mean()) if fast_count else None,
+            "first_stage_agreement": float(agrees.mean()) if total else None,
+            "cascade_agreement": float((agrees | ~routed).mean()) if total else None
+        }
+    
+    def stats(self) -> Dict:
+        """
+        Get routing counts for the texts analyzed so far.
+        
+        Returns:
+            A dictionary containing fast_count, transformer_count and fast_share
+        """
+        total = self.fast_count + self.transformer_count
+        return {
+            "fast_count": self.fast_count,
+            "transformer_count": self.transformer_count,
+            "fast_share": self.fast_count / total if total else 0.0
+        }
+    
+    def _get_analyzer(self) -> "SentimentAnalyzer":
+        """
+        Get the transformer analyzer, loading the singleton if none was given.
+        """
+        if self._analyzer is None:
+            from app.utils.sentiment_utils import get_analyzer
+            self._analyzer = get_analyzer()
+        return self._analyzer
+
+def distill(
+    texts: Sequence[str],
+    analyzer: Optional["SentimentAnalyzer"] = None,
+    **fit_options
+) -> HashedNgramClassifier:
+    """
+    Train a first-stage classifier on the transformer's predictions.
+    
+    No human labels are needed: the transformer labels the texts and the
+    classifier learns to imitate it.
+    
+    Args:
+        texts: Unlabeled training texts, ideally a sample of real traffic
+        analyzer: The transformer analyzer (defaults to ``get_analyzer()``)
+        **fit_options: Passed to ``HashedNgramClassifier.fit``
+    
+    Returns:
+        The trained classifier, using the analyzer's label map
+    """
+    if analyzer is None:
+        from app.utils.sentiment_utils import get_analyzer
+        analyzer = get_analyzer()
+    texts = list(texts)
+    label_ids, _ = analyzer._infer(texts)
+    classifier = HashedNgramClassifier(labels=analyzer.model_manager.labels)
+    return classifier.fit(texts, label_ids, **fit_options)
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    """
+    Row-wise softmax.
+    """
+    exponents = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return exponents / exponents.sum(axis=1, keepdims=True)
@@ -0,0 +1,681 @@
+"""
+Coordinator/worker fan-out of scoring jobs across several machines.
+
+This module spreads inference over workers on other hosts, each running its
+own ModelManager. Workers connect to a coordinator over TCP and exchange
+newline-delimited JSON messages:
+
+    worker -> coordinator   {"type": "hello", "name", "token", "labels"}
+                            {"type": "heartbeat"}
+                            {"type": "result", "batch", "predictions", "confidences"}
+                            {"type": "error", "batch", "error"}
+    coordinator -> worker   {"type": "batch", "batch", "texts"}
+                            {"type": "shutdown"}
+
+The coordinator splits each job into batches and keeps up to
+DISTRIBUTED_MAX_IN_FLIGHT of them on every worker. A worker is considered
+lost when its connection closes or no message arrives from it for
+DISTRIBUTED_HEARTBEAT_TIMEOUT_S; its unfinished batches are queued again for
+the remaining workers. Results are collected per batch and returned in input
+order. The protocol has no encryption, and the token only keeps stray
+workers out, so run it on a trusted network.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    $ sentiment-cluster worker --coordinator 10.0.0.1:8765     # on each node
+    $ sentiment-cluster score reviews.txt scores.jsonl --host 0.0.0.0 --workers 4
+    
+    >>> with Coordinator(port=0) as coordinator:
+    ...     workers = start_local_workers(coordinator.address, 2)
+    ...     coordinator.wait_for_workers(2)
+    ...     results = coordinator.analyze(texts)
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple, Union
+
+from app.config.settings import (
+    DISTRIBUTED_BATCH_SIZE,
+    DISTRIBUTED_HEARTBEAT_INTERVAL_S,
+    DISTRIBUTED_HEARTBEAT_TIMEOUT_S,
+    DISTRIBUTED_HOST,
+    DISTRIBUTED_MAX_ATTEMPTS,
+    DISTRIBUTED_MAX_IN_FLIGHT,
+    DISTRIBUTED_PORT,
+    DISTRIBUTED_TOKEN
+)
+
+if TYPE_CHECKING:
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+logger = logging.getLogger(__name__)
+
+def _send(sock: socket.socket, lock: threading.Lock, message: Dict) -> None:
+    """
+    Write one JSON line to a socket shared between threads.
+    """
+    data = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+    with lock:
+        sock.sendall(data)
+
+class _Job:
+    """
+    One ``submit`` call and the batch results collected for it so far.
+    """
+
+    def __init__(self, num_batches: int, single: bool):
+        self.num_batches = num_batches
+        self.single = single
+        self.outputs: Dict[int, List[Dict]] = {}
+        self.future: Future = Future()
+
+class _Batch:
+    """
+    A slice of a job's texts sent to one worker at a time.
+    """
+    
+    __slots__ = ("id", "job", "index", "texts", "attempts")
+
+    def __init__(self, batch_id: int, job: _Job, index: int, texts: List[str]):
+        self.id = batch_id
+        self.job = job
+        self.index = index
+        self.texts = texts
+        self.attempts = 0
+
+class _Worker:
+    """
+    The coordinator's view of one connected worker.
+    """
+
+    def __init__(self, sock: socket.socket, name: str, labels: Dict[int, str]):
+        self.sock = sock
+        self.name = name
+        self.labels = labels
+        self.in_flight: Dict[int, _Batch] = {}
+        self.completed = 0
+        self.last_seen = time.monotonic()
+        self.alive = True
+        self.send_lock = threading.Lock()
+
+class Coordinator:
+    """
+    A TCP server that fans scoring jobs out to connected workers.
+    
+    Attributes:
+        address (Tuple[str, int]): Host and port the coordinator listens on
+        batch_size (int): Number of texts per batch sent to a worker
+        max_in_flight (int): Batches sent to a worker before it returns any
+        heartbeat_timeout (float): Seconds of silence after which a worker is lost
+        max_attempts (int): Workers a batch may be lost on before its job fails
+        lost_workers (int): Number of workers lost so far
+        requeued_batches (int): Number of batches queued again after a loss
+    """
+
+    def __init__(
+        self,
+        host: str = DISTRIBUTED_HOST,
+        port: int = DISTRIBUTED_PORT,
+        batch_size: int = DISTRIBUTED_BATCH_SIZE,
+        max_in_flight: int = DISTRIBUTED_MAX_IN_FLIGHT,
+        heartbeat_timeout: float = DISTRIBUTED_HEARTBEAT_TIMEOUT_S,
+        max_attempts: int = DISTRIBUTED_MAX_ATTEMPTS,
+        token: Optional[str] = DISTRIBUTED_TOKEN
+    ):
+        """
+        Bind the listening socket and start accepting workers.
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            batch_size: Number of texts per batch sent to a worker
+            max_in_flight: Batches sent to a worker before it returns any.
+                Two keeps a worker busy while its next batch is on the wire.
+            heartbeat_timeout: Seconds without any message after which a
+                worker is treated as lost
+            max_attempts: Workers a batch may be lost on before its job fails
+            token: Shared secret workers must send in their hello (None
+                accepts any worker)
+        """
+        from app.utils.sentiment_analyzer import SentimentAnalyzer
+        
+        if batch_size < 1 or max_in_flight < 1 or max_attempts < 1:
+            raise ValueError("batch_size, max_in_flight and max_attempts must be positive integers")
+        # Imported up front: a first import under the lock would stall heartbeats
+        self._format_results = SentimentAnalyzer._format_results
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.token = token
+        self.lost_workers = 0
+        self.requeued_batches = 0
+        self._workers: List[_Worker] = []
+        self._pending: Deque[_Batch] = deque()
+        self._batch_ids = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._server = socket.create_server((host, port))
+        self.address: Tuple[str, int] = self._server.getsockname()[:2]
+        threading.Thread(target=self._accept, name="coordinator-accept", daemon=True).start()
+        self._monitor = threading.Thread(target=self._run, name="coordinator-dispatch", daemon=True)
+        self._monitor.start()
+    
+    def submit(self, text: Union[str, List[str]]) -> Future:
+        """
+        Queue a scoring job.
+        
+        Args:
+            text: Either a single text string or a list of text strings
+        
+        Returns:
+            A future resolved with the same result format as
+            ``SentimentAnalyzer.analyze``, in input order. It fails with
+            RuntimeError if a worker reports an error or a batch is lost on
+            ``max_attempts`` workers.
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        starts = range(0, len(texts), self.batch_size)
+        job = _Job(len(starts), isinstance(text, str))
+        if not texts:
+            job.future.set_result([])
+            return job.future
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("coordinator is closed")
+            for index, start in enumerate(starts):
+                batch_texts = texts[start:start + self.batch_size]
+                self._pending.append(_Batch(next(self._batch_ids), job, index, batch_texts))
+            self._condition.notify_all()
+        return job.future
+    
+    def analyze(
+        self,
+        text: Union[str, List[str]],
+        timeout: Optional[float] = None
+    ) -> Union[Dict, List[Dict]]:
+        """
+        Score texts on the workers and wait for the results.
+        
+        Args:
+            text: Either a single text string or a list of text strings
+            timeout: Seconds to wait for the results (None waits indefinitely,
+                including while no worker is connected)
+        
+        Returns:
+            The same result format as ``SentimentAnalyzer.analyze``
+        
+        Raises:
+            RuntimeError: If a worker reports an error or a batch keeps being lost
+            concurrent.futures.TimeoutError: If the timeout expires
+        """
+        return self.submit(text).result(timeout)
+    
+    def workers(self) -> List[str]:
+        """
+        Get the names of the connected workers.
+        """
+        with self._condition:
+            return [worker.name for worker in self._workers]
+    
+    def wait_for_workers(self, count: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until at least ``count`` workers are connected.
+        
+        Returns:
+            True if enough workers connected before the timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._workers) >= count, timeout)
+    
+    def stats(self) -> Dict:
+        """
+        Get coordinator statistics.
+        
+        Returns:
+            A dictionary containing:
+                - workers: Per-worker in_flight and completed batch counts, by name
+                - pending_batches: Batches waiting for a worker
+                - lost_workers: Workers lost so far
+                - requeued_batches: Batches queued again after a loss
+        """
+        with self._condition:
+            return {
+                "workers": {
+                    worker.name: {"in_flight": len(worker.in_flight), "completed": worker.completed}
+                    for worker in self._workers
+                },
+                "pending_batches": len(self._pending),
+                "lost_workers": self.lost_workers,
+                "requeued_batches": self.requeued_batches
+            }
+    
+    def close(self) -> None:
+        """
+        Tell the workers to shut down, disconnect them and fail unfinished jobs.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+            jobs = {id(batch.job): batch.job for batch in self._pending}
+            for worker in workers:
+                jobs.update((id(batch.job), batch.job) for batch in worker.in_flight.values())
+            self._pending.clear()
+            self._condition.notify_all()
+        self._server.close()
+        for worker in workers:
+            try:
+                _send(worker.sock, worker.send_lock, {"type": "shutdown"})
+            except OSError:
+                pass
+            with self._condition:
+                self._drop_worker(worker)
+        self._monitor.join()
+        for job in jobs.values():
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("coordinator is closed"))
+    
+    def __enter__(self) -> "Coordinator":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def _accept(self) -> None:
+        """
+        Accept worker connections until the coordinator is closed.
+        """
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=self._serve_worker, args=(sock,), name="coordinator-worker", daemon=True
+            ).start()
+    
+    def _serve_worker(self, sock: socket.socket) -> None:
+        """
+        Register a worker after its hello and handle its messages until it is lost.
+        """
+        worker = None
+        reader = sock.makefile("rb")
+        try:
+            sock.settimeout(self.heartbeat_timeout)
+            hello = json.loads(reader.readline() or "null")
+            if not isinstance(hello, dict) or hello.get("type") != "hello":
+                return
+            if self.token is not None and hello.get("token") != self.token:
+                return
+            sock.settimeout(None)
+            labels = {int(key): value for key, value in hello.get("labels", {}).items()}
+            worker = _Worker(sock, str(hello.get("name")), labels)
+            with self._condition:
+                if self._closed:
+                    return
+                self._workers.append(worker)
+                self._condition.notify_all()
+            
+            for line in reader:
+                message = json.loads(line)
+                with self._condition:
+                    worker.last_seen = time.monotonic()
+                    if not isinstance(message, dict):
+                        continue
+                    if message.get("type") in ("result", "error"):
+                        self._finish_batch(worker, message)
+        except (OSError, ValueError, AttributeError):
+            pass
+        finally:
+            reader.close()
+            if worker is None:
+                sock.close()
+            else:
+                with self._condition:
+                    self._drop_worker(worker)
+    
+    def _parse_result(
+        self, batch: _Batch, message: Dict, labels: Dict[int, str]
+    ) -> List[Dict]:
+        """
+        Build a batch's results from a worker's result message.
+        
+        Raises:
+            ValueError: If the predictions or confidences do not match the batch
+            KeyError, TypeError: If they contain unknown labels or non-numbers
+        """
+        predictions = message.get("predictions")
+        confidences = message.get("confidences")
+        if not (
+            isinstance(predictions, list)
+            and isinstance(confidences, list)
+            and len(predictions) == len(confidences) == len(batch.texts)
+        ):
+            raise ValueError("predictions and confidences do not match the batch")
+        return self._format_results(batch.texts, predictions, confidences, labels)
+    
+    def _finish_batch(self, worker: _Worker, message: Dict) -> None:
+        """
+        Record a worker's reply to a batch. The caller holds the condition.
+        """
+        batch_id = message.get("batch")
+        if not isinstance(batch_id, int):
+            return
+        batch = worker.in_flight.pop(batch_id, None)
+        if batch is None:
+            return
+        self._condition.notify_all()
+        worker.completed += 1
+        job = batch.job
+        if job.future.done():
+            return
+        error = None
+        if message["type"] == "error":
+            error = str(message.get("error"))
+        else:
+            try:
+                job.outputs[batch.index] = self._parse_result(batch, message, worker.labels)
+            except (KeyError, TypeError, ValueError) as exception:
+                error = f"malformed result: {exception!r}"
+        if error is not None:
+            job.future.set_exception(RuntimeError(
+                f"worker {worker.name} failed on batch {batch.index}: {error}"
+            ))
+            return
+        if len(job.outputs) == job.num_batches:
+            results = [result for index in range(job.num_batches) for result in job.outputs[index]]
+            job.future.set_result(results[0] if job.single else results)
+    
+    def _drop_worker(self, worker: _Worker) -> None:
+        """
+        Disconnect a worker and queue its unfinished batches again. The caller
+        holds the condition.
+        """
+        if not worker.alive:
+            return
+        worker.alive = False
+        self._workers.remove(worker)
+        try:
+            worker.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        worker.sock.close()
+        if self._closed:
+            return
+        self.lost_workers += 1
+        # Requeue at the front, in order, so the oldest work goes out first
+        for batch in sorted(worker.in_flight.values(), key=lambda batch: batch.id, reverse=True):
+            batch.attempts += 1
+            if batch.attempts >= self.max_attempts:
+                if not batch.job.future.done():
+                    batch.job.future.set_exception(RuntimeError(
+                        f"batch {batch.index} was lost on {batch.attempts} workers"
+                    ))
+                continue
+            self._pending.appendleft(batch)
+            self.requeued_batches += 1
+        worker.in_flight.clear()
+        self._condition.notify_all()
+    
+    def _assign(self) -> List[Tuple[_Worker, _Batch]]:
+        """
+        Hand pending batches to workers with free capacity, one per worker per
+        round. The caller holds the condition.
+        """
+        assignments = []
+        while self._pending:
+            ready = [
+                worker for worker in self._workers if len(worker.in_flight) < self.max_in_flight
+            ]
+            if not ready:
+                break
+            for worker in sorted(ready, key=lambda worker: len(worker.in_flight)):
+                while self._pending and self._pending[0].job.future.done():
+                    self._pending.popleft()
+                if not self._pending:
+                    break
+                batch = self._pending.popleft()
+                worker.in_flight[batch.id] = batch
+                assignments.append((worker, batch))
+        return assignments
+    
+    def _run(self) -> None:
+        """
+        Dispatch batches and check heartbeats until the coordinator is closed.
+        """
+        def has_work() -> bool:
+            return self._closed or (bool(self._pending) and any(
+                len(worker.in_flight) < self.max_in_flight for worker in self._workers
+            ))
+        
+        while True:
+            with self._condition:
+                self._condition.wait_for(has_work, timeout=self.heartbeat_timeout / 4)
+                if self._closed:
+                    return
+                now = time.monotonic()
+                silent = [
+                    worker for worker in self._workers
+                    if now - worker.last_seen > self.heartbeat_timeout
+                ]
+                for worker in silent:
+                    self._drop_worker(worker)
+                assignments = self._assign()
+            for worker, batch in assignments:
+                try:
+                    _send(worker.sock, worker.send_lock,
+                          {"type": "batch", "batch": batch.id, "texts": batch.texts})
+                except OSError:
+                    with self._condition:
+                        self._drop_worker(worker)
+
+def run_worker(
+    host: str,
+    port: int,
+    analyzer: Optional["SentimentAnalyzer"] = None,
+    name: Optional[str] = None,
+    token: Optional[str] = DISTRIBUTED_TOKEN,
+    heartbeat_interval: float = DISTRIBUTED_HEARTBEAT_INTERVAL_S,
+    connect_timeout: float = 30.0
+) -> int:
+    """
+    Connect to a coordinator and score batches until it disconnects.
+    
+    A background thread sends heartbeats while batches are being scored, so a
+    slow batch is not mistaken for a lost worker.
+    
+    Args:
+        host: Coordinator host
+        port: Coordinator port
+        analyzer: Analyzer to score with (defaults to ``get_analyzer()``)
+        name: Name reported to the coordinator (defaults to host name and PID)
+        token: Shared secret expected by the coordinator
+        heartbeat_interval: Seconds between heartbeats
+        connect_timeout: Seconds to keep retrying while the coordinator is
+            not reachable yet
+    
+    Returns:
+        The number of batches scored
+    
+    Raises:
+        OSError: If the coordinator cannot be reached within connect_timeout
+    """
+    if analyzer is None:
+        from app.utils.sentiment_utils import get_analyzer
+        analyzer = get_analyzer()
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            sock = socket.create_connection((host, port), timeout=connect_timeout)
+            break
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)
+    sock.settimeout(None)
+    # Notice a coordinator host that vanished without closing the connection
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    
+    send_lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send_heartbeats() -> None:
+        while not stopped.wait(heartbeat_interval):
+            try:
+                _send(sock, send_lock, {"type": "heartbeat"})
+            except OSError:
+                return
+    
+    scored = 0
+    reader = sock.makefile("rb")
+    try:
+        labels = {str(key): value for key, value in analyzer.model_manager.labels.items()}
+        _send(sock, send_lock, {"type": "hello", "name": name, "token": token, "labels": labels})
+        threading.Thread(target=send_heartbeats, name="worker-heartbeat", daemon=True).start()
+        for line in reader:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping malformed message from coordinator: %r", line[:200])
+                continue
+            message_type = message.get("type") if isinstance(message, dict) else None
+            if message_type == "shutdown":
+                break
+            if message_type != "batch" or "batch" not in message or not isinstance(
+                message.get("texts"), list
+            ):
+                logger.warning("Skipping unexpected message from coordinator: %r", line[:200])
+                continue
+            try:
+                predictions, confidences = analyzer._infer_chunked(message["texts"])
+                reply = {
+                    "type": "result",
+                    "batch": message["batch"],
+                    "predictions": predictions,
+                    "confidences": confidences
+                }
+            except Exception as error:
+                reply = {"type": "error", "batch": message["batch"], "error": repr(error)}
+            _send(sock, send_lock, reply)
+            scored += 1
+    except OSError:
+        pass
+    finally:
+        stopped.set()
+        reader.close()
+        sock.close()
+    return scored
+
+def start_local_workers(
+    address: Tuple[str, int],
+    count: int,
+    threads_per_worker: Optional[int] = None,
+    token: Optional[str] = DISTRIBUTED_TOKEN
+) -> List[subprocess.Popen]:
+    """
+    Start worker processes on this machine, e.g. to stand in for nodes in tests.
+    
+    Args:
+        address: Coordinator host and port
+        count: Number of worker processes (none are started if less than 1)
+        threads_per_worker: PyTorch threads per worker (defaults to an even
+            split of the CPU cores)
+        token: Shared secret expected by the coordinator
+    
+    Returns:
+        The worker processes. They exit when the coordinator closes.
+    """
+    if count < 1:
+        return []
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // count)
+    command = [
+        sys.executable, "-m", "app.utils.distributed", "worker",
+        "--coordinator", f"{address[0]}:{address[1]}", "--threads", str(threads)
+    ]
+    environment = dict(os.environ)
+    if token is not None:
+        environment["DISTRIBUTED_TOKEN"] = token
+    return [subprocess.Popen(command, env=environment) for _ in range(count)]
+
+def _address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host or DISTRIBUTED_HOST, int(port)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line interface for distributed workers and scoring.
+    
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv[1:]``)
+    
+    Returns:
+        int: Exit code (0 for success)
+    """
+    parser = argparse.ArgumentParser(description="Fan sentiment scoring out to worker nodes.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    worker_parser = subparsers.add_parser("worker", help="score batches for a coordinator")
+    worker_parser.add_argument("--coordinator", type=_address, required=True, help="host:port")
+    worker_parser.add_argument("--name", help="worker name (default: host:pid)")
+    worker_parser.add_argument("--threads", type=int, help="PyTorch intra-op threads")
+    
+    score_parser = subparsers.add_parser("score", help="coordinate scoring of a text file")
+    score_parser.add_argument("input", help="file with one text per line")
+    score_parser.add_argument("output", help="JSONL file to write results to")
+    score_parser.add_argument("--host", default=DISTRIBUTED_HOST)
+    score_parser.add_argument("--port", type=int, default=DISTRIBUTED_PORT)
+    score_parser.add_argument("--workers", type=int, default=1, help="workers to wait for")
+    score_parser.add_argument("--local-workers", type=int, default=0,
+                              help="worker processes to start on this machine")
+    score_parser.add_argument("--batch-size", type=int, default=DISTRIBUTED_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    token = os.environ.get("DISTRIBUTED_TOKEN", DISTRIBUTED_TOKEN)
+    
+    if args.command == "worker":
+        import torch
+        from app.utils.sentiment_utils import get_analyzer, warmup
+        
+        if args.threads:
+            torch.set_num_threads(args.threads)
+        # Load and warm up before connecting, so the first batch is not slow
+        warmup()
+        if args.threads:
+            # Set again, since the analyzer may have applied an autotune profile
+            torch.set_num_threads(args.threads)
+        run_worker(*args.coordinator, analyzer=get_analyzer(), name=args.name, token=token)
+        return 0
+    
+    with open(args.input, encoding="utf-8") as f:
+        texts = [line.rstrip("\n") for line in f if line.strip()]
+    with Coordinator(args.host, args.port, batch_size=args.batch_size, token=token) as coordinator:
+        local = start_local_workers(coordinator.address, args.local_workers, token=token)
+        host, port = coordinator.address
+        print(f"Waiting for {args.workers} workers on {host}:{port}", file=sys.stderr)
+        coordinator.wait_for_workers(args.workers)
+        results = coordinator.analyze(texts)
+    for process in local:
+        process.wait()
+    with open(args.output, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    print(json.dumps(coordinator.stats()), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
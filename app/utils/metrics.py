@@ -0,0 +1,358 @@
+"""
+Inference metrics for the sentiment analyzer.
+
+This module provides a small metrics registry used by SentimentAnalyzer and
+ModelManager to record how long each inference stage takes (tokenization,
+device transfer, forward pass and post-processing), how large the model
+batches are and how many of their tokens are padding. Components with their
+own counters, such as the result cache or the HTTP server queue, register
+collectors that are read when metrics are exported.
+
+Instrumentation is off by default (see METRICS_ENABLED). While disabled,
+``time`` returns a shared no-op context manager and nothing else is recorded,
+so the hot path only pays for an attribute check.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> metrics = get_metrics()
+    >>> metrics.enable()
+    >>> analyze_sentiment(["Great!", "Terrible!"])
+    >>> metrics.stage_timings()["forward"]
+    {'count': 1, 'total_seconds': 0.012, 'mean_seconds': 0.012}
+    >>> print(metrics.to_prometheus())
+    # TYPE sentiment_stage_seconds histogram
+    sentiment_stage_seconds_bucket{stage="tokenize",le="0.0005"} 0
+    ...
+"""
+
+import bisect
+import contextlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config.settings import METRICS_ENABLED
+
+# Histogram bucket upper bounds for stage durations, in seconds
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Histogram bucket upper bounds for model batch sizes
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# Help text for the metrics recorded by the analyzer
+_HELP = {
+    "sentiment_stage_seconds": "Time spent in each inference stage",
+    "sentiment_batch_size": "Number of texts per model batch",
+    "sentiment_tokens_total": "Tokens sent through the model, including padding",
+    "sentiment_padding_tokens_total": "Padding tokens sent through the model"
+}
+
+# A metric series: (metric name, ((label name, label value), ...))
+Series = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+class Histogram:
+    """
+    A fixed-bucket histogram in the Prometheus style.
+
+    Attributes:
+        buckets (Tuple[float, ...]): Bucket upper bounds, ascending
+        counts (List[int]): Observations per bucket; the last entry counts
+            values above every bound
+        count (int): Number of observations
+        sum (float): Sum of all observed values
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one value.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        Get the cumulative count for every bucket, ending with "+Inf".
+        """
+        bounds = [_format_number(bound) for bound in self.buckets] + ["+Inf"]
+        total = 0
+        cumulative = []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+class MetricsRegistry:
+    """
+    A thread-safe registry of histograms, counters and collectors.
+
+    Attributes:
+        enabled (bool): Whether instrumented code records anything
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        """
+        Initialize an empty registry.
+
+        Args:
+            enabled: Whether to start recording immediately
+                (defaults to METRICS_ENABLED)
+        """
+        self.enabled = enabled
+        self._histograms: Dict[Series, Histogram] = {}
+        self._counters: Dict[Series, float] = {}
+        self._collectors: Dict[str, Callable[[], Dict]] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """
+        Start recording metrics.
+        """
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stop recording metrics. Values recorded so far are kept.
+        """
+        self.enabled = False
+
+    def time(self, stage: str):
+        """
+        Time a block of code as an inference stage.
+
+        Args:
+            stage: The stage name, e.g. "tokenize" or "forward"
+
+        Returns:
+            A context manager recording the block's duration in
+            ``sentiment_stage_seconds``, or a no-op context if disabled
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _StageTimer(self, stage)
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[Dict[str, str]] = None,
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        """
+        Record a value in a histogram, creating it on first use.
+
+        Args:
+            name: The metric name
+            value: The observed value
+            labels: Optional label names and values identifying the series
+            buckets: Bucket upper bounds used if the histogram is new
+        """
+        series = _series(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(series)
+            if histogram is None:
+                histogram = self._histograms[series] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None) -> None:
+        """
+        Increase a counter, creating it on first use.
+
+        Args:
+            name: The metric name
+            value: The amount to add
+            labels: Optional label names and values identifying the series
+        """
+        series = _series(name, labels)
+        with self._lock:
+            self._counters[series] = self._counters.get(series, 0) + value
+
+    def register_collector(self, name: str, collect: Callable[[], Dict]) -> None:
+        """
+        Register a function whose numeric results are exported as gauges.
+
+        Collectors are called on every ``snapshot`` and ``to_prometheus``,
+        whether or not recording is enabled, so existing stats such as
+        ``ResultCache.stats`` are always visible.
+
+        Args:
+            name: Prefix for the exported gauges, e.g. "cache" exports
+                ``sentiment_cache_hits``. Registering the same name again
+                replaces the previous collector.
+            collect: A function returning a dictionary of stats
+        """
+        with self._lock:
+            self._collectors[name] = collect
+
+    def unregister_collector(self, name: str) -> None:
+        """
+        Remove a collector if it is registered.
+        """
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    def reset(self) -> None:
+        """
+        Clear all recorded histograms and counters. Collectors are kept.
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def stage_timings(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the count and duration of each timed stage.
+
+        Returns:
+            A dictionary mapping each stage name to its count,
+            total_seconds and mean_seconds
+        """
+        with self._lock:
+            stages = [
+                (dict(labels)["stage"], histogram.count, histogram.sum)
+                for (name, labels), histogram in self._histograms.items()
+                if name == "sentiment_stage_seconds"
+            ]
+        return {
+            stage: {
+                "count": count,
+                "total_seconds": total,
+                "mean_seconds": total / count if count else 0.0
+            }
+            for stage, count, total in stages
+        }
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Get every recorded metric.
+
+        Returns:
+            A dictionary containing:
+                - histograms: Series name mapped to count, sum and cumulative
+                  bucket counts
+                - counters: Series name mapped to value
+                - gauges: Collector values, named ``sentiment_<collector>_<key>``
+            Series names use the Prometheus form, e.g.
+            ``sentiment_stage_seconds{stage="forward"}``.
+        """
+        with self._lock:
+            histograms = {
+                _format_series(series): {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(histogram.cumulative())
+                }
+                for series, histogram in self._histograms.items()
+            }
+            counters = {_format_series(series): value for series, value in self._counters.items()}
+        return {"histograms": histograms, "counters": counters, "gauges": self._collect()}
+
+    def to_prometheus(self) -> str:
+        """
+        Export all metrics in the Prometheus text exposition format.
+
+        Returns:
+            The metrics as text, ending with a newline
+        """
+        with self._lock:
+            histograms = sorted(
+                (series, histogram.cumulative(), histogram.count, histogram.sum)
+                for series, histogram in self._histograms.items()
+            )
+            counters = sorted(self._counters.items())
+
+        lines = []
+        described = set()
+
+        def describe(name: str, kind: str) -> None:
+            if name in described:
+                return
+            described.add(name)
+            if name in _HELP:
+                lines.append(f"# HELP {name} {_HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), cumulative, count, total in histograms:
+            describe(name, "histogram")
+            for bound, bucket_count in cumulative:
+                series = (name + "_bucket", labels + (("le", bound),))
+                lines.append(f"{_format_series(series)} {bucket_count}")
+            lines.append(f"{_format_series((name + '_sum', labels))} {_format_number(total)}")
+            lines.append(f"{_format_series((name + '_count', labels))} {count}")
+        for series, value in counters:
+            describe(series[0], "counter")
+            lines.append(f"{_format_series(series)} {_format_number(value)}")
+        for name, value in sorted(self._collect().items()):
+            describe(name, "gauge")
+            lines.append(f"{name} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _collect(self) -> Dict[str, float]:
+        """
+        Call every collector and flatten its numeric results into gauges.
+        """
+        with self._lock:
+            collectors = list(self._collectors.items())
+        gauges = {}
+        for prefix, collect in collectors:
+            for key, value in collect().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f"sentiment_{prefix}_{key}"] = value
+        return gauges
+
+class _StageTimer:
+    """
+    Context manager recording the duration of one stage.
+    """
+
+    __slots__ = ("registry", "stage", "start")
+
+    def __init__(self, registry: MetricsRegistry, stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.registry.observe(
+            "sentiment_stage_seconds",
+            time.perf_counter() - self.start,
+            {"stage": self.stage}
+        )
+
+def _series(name: str, labels: Optional[Dict[str, str]]) -> Series:
+    return name, tuple(sorted((labels or {}).items()))
+
+def _format_series(series: Series) -> str:
+    name, labels = series
+    if not labels:
+        return name
+    pairs = ",".join(f'{key}="{value}"' for key, value in labels)
+    return f"{name}{{{pairs}}}"
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# The registry used by the analyzer, model manager and server
+_metrics = MetricsRegistry()
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get the process-wide metrics registry.
+
+    Returns:
+        MetricsRegistry: The registry the analyzer and model manager record to
+    """
+    return _metrics
@@ -0,0 +1,125 @@
+"""
+Parity checks for reduced-precision inference.
+
+This module compares a reduced-precision configuration of the model against
+the fp32 reference on a set of texts. It reports how often the predicted
+labels disagree and how far the confidence scores drift, so a faster mode can
+be adopted only when its agreement stays above PRECISION_MIN_AGREEMENT.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> report = check_precision_parity(reference_texts, "int8")
+    >>> report["label_agreement"], report["passed"]
+    (0.996, True)
+
+    $ python -m app.utils.parity int8 reference_texts.txt
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from app.config.settings import PRECISION_MIN_AGREEMENT
+from app.models.model_manager import ModelManager
+from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+def compare_analyzers(
+    texts: Sequence[str],
+    reference: SentimentAnalyzer,
+    candidate: SentimentAnalyzer,
+    min_agreement: float = PRECISION_MIN_AGREEMENT
+) -> Dict:
+    """
+    Compare the predictions of two analyzers on the same texts.
+    
+    Args:
+        texts: The reference texts
+        reference: The analyzer treated as ground truth
+        candidate: The analyzer being evaluated
+        min_agreement: Minimum label agreement (0-1) for the check to pass
+        
+    Returns:
+        A dictionary containing:
+            - total_texts: Number of texts compared
+            - disagreements: Number of texts with different labels
+            - label_agreement: Share of texts with the same label (0-1)
+            - mean_confidence_drift: Mean absolute confidence difference
+            - max_confidence_drift: Largest absolute confidence difference
+            - min_agreement: The threshold used
+            - passed: Whether label_agreement >= min_agreement
+    """
+    texts = list(texts)
+    reference_labels, reference_confidences = reference._infer_chunked(texts)
+    candidate_labels, candidate_confidences = candidate._infer_chunked(texts)
+    
+    total = len(texts)
+    disagreements = sum(
+        1 for expected, actual in zip(reference_labels, candidate_labels) if expected != actual
+    )
+    drifts = [
+        abs(expected - actual)
+        for expected, actual in zip(reference_confidences, candidate_confidences)
+    ]
+    agreement = (total - disagreements) / total if total > 0 else 1.0
+    return {
+        "total_texts": total,
+        "disagreements": disagreements,
+        "label_agreement": agreement,
+        "mean_confidence_drift": sum(drifts) / total if total > 0 else 0.0,
+        "max_confidence_drift": max(drifts, default=0.0),
+        "min_agreement": min_agreement,
+        "passed": agreement >= min_agreement
+    }
+
+def check_precision_parity(
+    texts: Sequence[str],
+    precision: str,
+    min_agreement: float = PRECISION_MIN_AGREEMENT,
+    reference: Optional[SentimentAnalyzer] = None
+) -> Dict:
+    """
+    Compare a reduced-precision mode against fp32 on a reference set.
+    
+    Args:
+        texts: The reference texts
+        precision: The precision to evaluate ("int8" or "bf16")
+        min_agreement: Minimum label agreement (0-1) for the check to pass
+        reference: An existing fp32 analyzer to compare against. A new one is
+            created if omitted.
+        
+    Returns:
+        The report from ``compare_analyzers`` with an added ``precision`` key
+        holding the precision that was actually used
+    """
+    reference = reference or SentimentAnalyzer(model_manager=ModelManager(precision="fp32"))
+    candidate = SentimentAnalyzer(model_manager=ModelManager(precision=precision))
+    report = compare_analyzers(texts, reference, candidate, min_agreement)
+    report["precision"] = candidate.model_manager.precision
+    return report
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line interface for precision parity checks.
+    
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv[1:]``)
+        
+    Returns:
+        int: 0 if the parity check passed, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Compare a precision mode against fp32.")
+    parser.add_argument("precision", choices=["int8", "bf16"])
+    parser.add_argument("texts", help="File with one reference text per line")
+    parser.add_argument("--min-agreement", type=float, default=PRECISION_MIN_AGREEMENT)
+    args = parser.parse_args(argv)
+    
+    with open(args.texts, encoding="utf-8") as handle:
+        texts = [line.rstrip("\n") for line in handle if line.strip()]
+    report = check_precision_parity(texts, args.precision, args.min_agreement)
+    print(json.dumps(report, indent=2))
+    return 0 if report["passed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Pipelined execution of batched inference.
+
+This module provides the PipelinedExecutor class, which runs the three stages
+of batched inference concurrently: a producer thread prepares batch N+1 (for
+the analyzer: tokenization and device transfer) while batch N is in the model
+on the calling thread, and a consumer thread post-processes finished batches.
+The fast tokenizer and PyTorch both release the GIL while they work, so the
+stages genuinely overlap. At most ``depth`` batches are in flight per stage,
+which keeps memory flat regardless of input size.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> executor = PipelinedExecutor(tokenize, forward, postprocess, depth=2)
+    >>> outputs = list(executor.run(chunks))
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Generic, Iterable, Iterator, Optional, TypeVar
+
+from app.config.settings import PIPELINE_DEPTH
+
+# Marks the end of the input items
+_END = object()
+
+Item = TypeVar("Item")
+Output = TypeVar("Output")
+
+class PipelinedExecutor(Generic[Item, Output]):
+    """
+    A three-stage pipeline with bounded look-ahead.
+    
+    Attributes:
+        prepare (Callable): Producer stage, run on a background thread
+        execute (Callable): Main stage, run on the calling thread
+        finish (Callable): Consumer stage, run on a background thread
+        depth (int): Maximum number of batches in flight per background stage
+    """
+    
+    def __init__(
+        self,
+        prepare: Callable[[Item], Any],
+        execute: Callable[[Any], Any],
+        finish: Callable[[Any], Output],
+        depth: int = PIPELINE_DEPTH
+    ):
+        """
+        Initialize the pipeline. Threads are started on first use.
+        
+        Args:
+            prepare: Turns an input item into model input
+            execute: Runs the model on prepared input
+            finish: Turns model output into the final output
+            depth: Maximum number of batches in flight per background stage
+        """
+        if depth < 1:
+            raise ValueError("depth must be a positive integer")
+        self.prepare = prepare
+        self.execute = execute
+        self.finish = finish
+        self.depth = depth
+        self._producer: Optional[ThreadPoolExecutor] = None
+        self._consumer: Optional[ThreadPoolExecutor] = None
+
+    def run(self, items: Iterable[Item]) -> Iterator[Output]:
+        """
+        Push items through the pipeline.
+        
+        Args:
+            items: The input items, e.g. chunks of texts
+            
+        Yields:
+            The output for each item, in input order. An exception raised by
+            any stage is re-raised here.
+        """
+        if self._producer is None:
+            self._producer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-prepare")
+            self._consumer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-finish")
+        
+        iterator = iter(items)
+        prepared: Deque[Future] = deque()
+        finished: Deque[Future] = deque()
+        
+        def submit_next() -> None:
+            item = next(iterator, _END)
+            if item is not _END:
+                prepared.append(self._producer.submit(self.prepare, item))
+        
+        try:
+            for _ in range(self.depth):
+                submit_next()
+            while prepared:
+                model_input = prepared.popleft().result()
+                submit_next()
+                finished.append(self._consumer.submit(self.finish, self.execute(model_input)))
+                while len(finished) > self.depth:
+                    yield finished.popleft().result()
+            while finished:
+                yield finished.popleft().result()
+        finally:
+            for future in [*prepared, *finished]:
+                future.cancel()
+
+    def close(self) -> None:
+        """
+        Stop the background threads.
+        """
+        for pool in (self._producer, self._consumer):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._producer = None
+        self._consumer = None
@@ -0,0 +1,251 @@
+"""
+Persistent prediction store for sentiment results.
+
+This module provides a SQLite-backed store of predictions keyed by a hash of
+the normalized text and a fingerprint of the model configuration. Re-scoring
+jobs look texts up in bulk before inference and insert the new predictions
+afterwards, so an incremental re-run only pays for texts it has not seen.
+Rows written under a different model fingerprint are ignored by lookups and
+removed by ``compact``.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> store = PredictionStore("predictions.db")
+    >>> store.insert(["Great!"], [(1, 0.99)])
+    >>> store.lookup(["Great!", "Terrible!"])
+    [(1, 0.99), None]
+
+    $ python -m app.utils.prediction_store compact predictions.db
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.config.settings import MAX_LENGTH, MODEL_NAME, MODEL_PRECISION, PREDICTION_STORE_PATH
+from app.utils.result_cache import normalize_text
+
+# A stored prediction: (label id, confidence)
+Prediction = Tuple[int, float]
+
+# Stay well below SQLite's limit on bound parameters per statement
+_LOOKUP_CHUNK_SIZE = 500
+
+def model_fingerprint(
+    model_name: str = MODEL_NAME,
+    max_length: int = MAX_LENGTH,
+    precision: str = MODEL_PRECISION
+) -> str:
+    """
+    Compute the fingerprint of a model configuration.
+    
+    Args:
+        model_name: The HuggingFace model name or local path
+        max_length: The maximum sequence length used for tokenization
+        precision: The precision the model runs in
+        
+    Returns:
+        A short hex digest identifying the configuration
+    """
+    data = f"{model_name}\0{max_length}\0{precision}".encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def text_hash(text: str) -> str:
+    """
+    Hash a text for use as a store key.
+    
+    Args:
+        text: The raw input text
+        
+    Returns:
+        The hex SHA-256 digest of the normalized text
+    """
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+class PredictionStore:
+    """
+    A SQLite-backed, content-addressed store of predictions.
+    
+    The store can be shared between threads; access to the connection is
+    serialized with a lock.
+    
+    Attributes:
+        path (str): Location of the SQLite database file
+        fingerprint (str): Model fingerprint used for lookups and inserts
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = PREDICTION_STORE_PATH,
+        fingerprint: Optional[str] = None
+    ):
+        """
+        Open or create a prediction store.
+        
+        Args:
+            path: Location of the SQLite database file
+            fingerprint: Model fingerprint to read and write under. Defaults to
+                the fingerprint of the configured MODEL_NAME, MAX_LENGTH and
+                MODEL_PRECISION.
+        """
+        if not path:
+            raise ValueError("A database path is required for the prediction store")
+        self.path = path
+        self.fingerprint = fingerprint or model_fingerprint()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "fingerprint TEXT NOT NULL, "
+                "text_hash TEXT NOT NULL, "
+                "label INTEGER NOT NULL, "
+                "confidence REAL NOT NULL, "
+                "PRIMARY KEY (fingerprint, text_hash)"
+                ") WITHOUT ROWID"
+            )
+
+    def lookup(self, texts: Sequence[str]) -> List[Optional[Prediction]]:
+        """
+        Look up stored predictions for many texts at once.
+        
+        Args:
+            texts: The texts to look up
+            
+        Returns:
+            A list aligned with ``texts`` holding the stored (label id,
+            confidence) pair, or None where no prediction is stored
+        """
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, Prediction] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_CHUNK_SIZE):
+                chunk = unique[start:start + _LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    "SELECT text_hash, label, confidence FROM predictions "
+                    f"WHERE fingerprint = ? AND text_hash IN ({placeholders})",
+                    [self.fingerprint, *chunk]
+                )
+                for key, label, confidence in rows:
+                    found[key] = (label, confidence)
+        return [found.get(key) for key in hashes]
+
+    def insert(self, texts: Sequence[str], predictions: Sequence[Prediction]) -> None:
+        """
+        Store predictions for many texts in a single transaction.
+        
+        Args:
+            texts: The analyzed texts
+            predictions: The (label id, confidence) pair for each text
+        """
+        rows = [
+            (self.fingerprint, text_hash(text), int(label), float(confidence))
+            for text, (label, confidence) in zip(texts, predictions)
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO predictions "
+                "(fingerprint, text_hash, label, confidence) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def invalidate(self) -> int:
+        """
+        Delete every prediction stored under the current fingerprint.
+        
+        Returns:
+            The number of deleted rows
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM predictions WHERE fingerprint = ?", (self.fingerprint,)
+            )
+            return cursor.rowcount
+
+    def compact(self) -> int:
+        """
+        Delete predictions from other model fingerprints and reclaim disk space.
+        
+        Returns:
+            The number of deleted rows
+        """
+        with self._lock:
+            with self._connection:
+                cursor = self._connection.execute(
+                    "DELETE FROM predictions WHERE fingerprint != ?", (self.fingerprint,)
+                )
+            self._connection.execute("VACUUM")
+            return cursor.rowcount
+
+    def stats(self) -> Dict:
+        """
+        Get store statistics.
+        
+        Returns:
+            A dictionary containing:
+                - current_rows: Predictions stored under the current fingerprint
+                - stale_rows: Predictions stored under other fingerprints
+                - file_bytes: Size of the database file on disk
+        """
+        with self._lock:
+            current, total = self._connection.execute(
+                "SELECT SUM(fingerprint = ?), COUNT(*) FROM predictions",
+                (self.fingerprint,)
+            ).fetchone()
+        current = current or 0
+        return {
+            "current_rows": current,
+            "stale_rows": total - current,
+            "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        }
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line interface for maintaining a prediction store.
+    
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv[1:]``)
+        
+    Returns:
+        int: Exit code (0 for success)
+    """
+    parser = argparse.ArgumentParser(description="Maintain a sentiment prediction store.")
+    parser.add_argument("command", choices=["compact", "invalidate", "stats"])
+    parser.add_argument("path", nargs="?", default=PREDICTION_STORE_PATH,
+                        help="SQLite database file (defaults to PREDICTION_STORE_PATH)")
+    parser.add_argument("--model", default=MODEL_NAME, help="model whose rows are current")
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH,
+                        help="maximum sequence length of the current model")
+    parser.add_argument("--precision", default=MODEL_PRECISION,
+                        help="precision the current model runs in, e.g. from an autotune profile")
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error("no store path given and PREDICTION_STORE_PATH is not set")
+    
+    store = PredictionStore(args.path, model_fingerprint(args.model, args.max_length, args.precision))
+    if args.command == "compact":
+        print(f"Removed {store.compact()} stale predictions")
+    elif args.command == "invalidate":
+        print(f"Removed {store.invalidate()} predictions for the current model")
+    stats = store.stats()
+    print(f"Current: {stats['current_rows']}  Stale: {stats['stale_rows']}  "
+          f"Size: {stats['file_bytes']} bytes")
+    store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
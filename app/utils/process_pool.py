@@ -0,0 +1,218 @@
+"""
+Multi-process sentiment analysis for many-core CPU hosts.
+
+This module provides the ProcessPoolAnalyzer class, which shards batch
+inference across worker processes. Each worker loads its own ModelManager and
+limits PyTorch to its share of the CPU cores, which scales better than a
+single process with one large intra-op thread pool when batches are small.
+Chunks are distributed across the workers and results are merged back in
+input order. If a worker dies, the pool is restarted and every unfinished
+chunk is queued again.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> with ProcessPoolAnalyzer(num_workers=8) as pool:
+    ...     results = pool.analyze(texts)
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from app.config.settings import (
+    BATCH_SIZE,
+    POOL_MAX_RESTARTS,
+    POOL_NUM_WORKERS,
+    POOL_THREADS_PER_WORKER
+)
+
+# Analyzer owned by the current worker process
+_worker_analyzer = None
+
+def _init_worker(num_threads: int, batch_size: int) -> None:
+    """
+    Load the model in a worker process and pin its thread count.
+    
+    Args:
+        num_threads: Number of intra-op threads PyTorch may use in this worker
+        batch_size: Batch size of the worker's analyzer
+    """
+    global _worker_analyzer
+    import torch
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+    
+    torch.set_num_threads(num_threads)
+    _worker_analyzer = SentimentAnalyzer(batch_size=batch_size)
+    # An autotune profile sets threads for a single process; keep this worker's share
+    torch.set_num_threads(num_threads)
+
+def _worker_infer(texts: List[str]) -> Tuple[List[int], List[float]]:
+    """
+    Run inference on a chunk of texts in a worker process.
+    
+    Args:
+        texts: The chunk of texts to analyze
+        
+    Returns:
+        Label ids and confidences in input order
+    """
+    return _worker_analyzer._infer_chunked(texts)
+
+class ProcessPoolAnalyzer:
+    """
+    A sentiment analyzer that shards batches across worker processes.
+    
+    Workers are started with the ``spawn`` method so none of them inherit
+    the parent's PyTorch thread pools, and each one calls
+    ``torch.set_num_threads(threads_per_worker)`` before loading the model.
+    
+    Attributes:
+        num_workers (int): Number of worker processes
+        threads_per_worker (int): Intra-op PyTorch threads in each worker
+        chunk_size (int): Number of texts sent to a worker at a time
+        max_restarts (int): Pool restarts allowed per ``analyze`` call
+        restarts (int): Total number of pool restarts after worker crashes
+    """
+    
+    def __init__(
+        self,
+        num_workers: Optional[int] = POOL_NUM_WORKERS,
+        threads_per_worker: Optional[int] = POOL_THREADS_PER_WORKER,
+        chunk_size: int = BATCH_SIZE,
+        max_restarts: int = POOL_MAX_RESTARTS
+    ):
+        """
+        Initialize the pool. Worker processes are started on first use.
+        
+        Args:
+            num_workers: Number of worker processes (defaults to the CPU count)
+            threads_per_worker: PyTorch threads per worker (defaults to an
+                even split of the CPU cores across the workers)
+            chunk_size: Number of texts per task; also the workers' batch size
+            max_restarts: Pool restarts allowed per ``analyze`` call before
+                giving up
+        
+        Raises:
+            ValueError: If num_workers, threads_per_worker or chunk_size is
+                below 1
+        """
+        if num_workers is not None and num_workers < 1:
+            raise ValueError(f"num_workers must be at least 1, got {num_workers}")
+        if threads_per_worker is not None and threads_per_worker < 1:
+            raise ValueError(
+                f"threads_per_worker must be at least 1, got {threads_per_worker}"
+            )
+        cpu_count = os.cpu_count() or 1
+        self.num_workers = num_workers if num_workers is not None else cpu_count
+        self.threads_per_worker = (
+            threads_per_worker if threads_per_worker is not None
+            else max(1, cpu_count // self.num_workers)
+        )
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        self.chunk_size = chunk_size
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self._task: Callable[[List[str]], Tuple[List[int], List[float]]] = _worker_infer
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def analyze(self, text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
+        """
+        Analyze the sentiment of the input text(s) across the worker processes.
+        
+        Args:
+            text: Either a single text string or a list of text strings to analyze
+            
+        Returns:
+            The same result format as ``SentimentAnalyzer.analyze``
+        """
+        from app.utils.sentiment_analyzer import SentimentAnalyzer
+        
+        texts = [text] if isinstance(text, str) else list(text)
+        chunks = {
+            index: texts[start:start + self.chunk_size]
+            for index, start in enumerate(range(0, len(texts), self.chunk_size))
+        }
+        outputs = self._run_chunks(chunks)
+        
+        results: List[Dict] = []
+        for index in range(len(chunks)):
+            predictions, confidences = outputs[index]
+            results.extend(
+                SentimentAnalyzer._format_results(chunks[index], predictions, confidences)
+            )
+        return results[0] if isinstance(text, str) else results
+
+    def _run_chunks(
+        self,
+        chunks: Dict[int, List[str]]
+    ) -> Dict[int, Tuple[List[int], List[float]]]:
+        """
+        Run every chunk on the pool, re-queuing unfinished chunks after a crash.
+        
+        Args:
+            chunks: Chunks of texts keyed by their position
+            
+        Returns:
+            The label ids and confidences of each chunk, keyed by position
+        """
+        pending = dict(chunks)
+        outputs: Dict[int, Tuple[List[int], List[float]]] = {}
+        restarts = 0
+        while pending:
+            executor = self._get_executor()
+            futures = {executor.submit(self._task, chunk): index for index, chunk in pending.items()}
+            crashed = False
+            for future in as_completed(futures):
+                try:
+                    outputs[futures[future]] = future.result()
+                except BrokenProcessPool:
+                    crashed = True
+                    continue
+                del pending[futures[future]]
+            if crashed:
+                restarts += 1
+                self.restarts += 1
+                self._shutdown()
+                if restarts > self.max_restarts:
+                    raise RuntimeError(
+                        f"Worker processes crashed {restarts} times; "
+                        f"{len(pending)} chunks were not analyzed"
+                    )
+        return outputs
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Start the worker processes if they are not running.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.threads_per_worker, self.chunk_size)
+            )
+        return self._executor
+
+    def _shutdown(self) -> None:
+        """
+        Stop the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def close(self) -> None:
+        """
+        Stop the worker processes and release their models.
+        """
+        self._shutdown()
+
+    def __enter__(self) -> "ProcessPoolAnalyzer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,256 @@
+"""
+Columnar container for sentiment analysis results.
+
+This module provides the ResultBatch class, which stores the results for many
+texts as NumPy arrays (label ids, confidences and confidence flags) plus an
+array of references to the original texts, instead of one dictionary per
+text. Summaries and filters are vectorized, slicing returns views without
+copying, and batches can be saved to and loaded from ``.npy`` files.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> batch = analyzer.analyze_columnar(texts)
+    >>> batch.summary()
+    {'total_texts': 3, 'positive_count': 1, 'negative_count': 2, ...}
+    >>> confident_negatives = batch.filter(sentiment="NEGATIVE", confident=True)
+    >>> batch.save("results/")
+    >>> batch = ResultBatch.load("results/")
+"""
+
+import os
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from app.config.settings import CONFIDENCE_THRESHOLD, SENTIMENT_LABELS
+
+class ResultBatch:
+    """
+    Sentiment analysis results for many texts, stored by column.
+    
+    Attributes:
+        texts (np.ndarray): Object array referencing the analyzed texts
+        label_ids (np.ndarray): Predicted label id for each text (int64)
+        confidences (np.ndarray): Confidence score for each text (float32)
+        is_confident (np.ndarray): Whether each confidence meets the threshold (bool)
+        labels (Mapping[int, str]): Mapping from label id to sentiment name
+    """
+    
+    def __init__(
+        self,
+        texts: Union[Sequence[str], np.ndarray],
+        label_ids: Union[Sequence[int], np.ndarray],
+        confidences: Union[Sequence[float], np.ndarray],
+        is_confident: Optional[Union[Sequence[bool], np.ndarray]] = None,
+        labels: Mapping[int, str] = SENTIMENT_LABELS
+    ):
+        """
+        Initialize a result batch.
+        
+        Args:
+            texts: The analyzed texts. Only references are stored.
+            label_ids: Predicted label id for each text
+            confidences: Confidence score for each text
+            is_confident: Confidence flag for each text. Computed from
+                CONFIDENCE_THRESHOLD if omitted.
+            labels: Mapping from label id to sentiment name
+        """
+        if isinstance(texts, np.ndarray):
+            self.texts = texts
+        else:
+            self.texts = np.empty(len(texts), dtype=object)
+            self.texts[:] = texts
+        self.label_ids = np.asarray(label_ids, dtype=np.int64)
+        self.confidences = np.asarray(confidences, dtype=np.float32)
+        if is_confident is None:
+            self.is_confident = self.confidences >= CONFIDENCE_THRESHOLD
+        else:
+            self.is_confident = np.asarray(is_confident, dtype=bool)
+        self.labels = labels
+        if not (
+            len(self.texts) == len(self.label_ids) == len(self.confidences) == len(self.is_confident)
+        ):
+            raise ValueError("All result columns must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.label_ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, "ResultBatch"]:
+        """
+        Get one result as a dictionary, or a slice as a ResultBatch view.
+        
+        Args:
+            index: An integer position or a slice
+            
+        Returns:
+            A result dictionary for an integer, or a ResultBatch whose columns
+            are views into this batch for a slice
+        """
+        if isinstance(index, slice):
+            return self._take(index)
+        return {
+            "text": self.texts[index],
+            "sentiment": self.labels[int(self.label_ids[index])],
+            "confidence": float(self.confidences[index]),
+            "is_confident": bool(self.is_confident[index])
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def label_id(self, sentiment: str) -> int:
+        """
+        Get the label id of a sentiment name.
+        
+        Args:
+            sentiment: A sentiment name such as "POSITIVE"
+            
+        Returns:
+            The matching label id
+        """
+        for label_id, name in self.labels.items():
+            if name == sentiment:
+                return label_id
+        raise ValueError(f"Unknown sentiment label: {sentiment!r}")
+
+    def filter(
+        self,
+        mask: Optional[np.ndarray] = None,
+        sentiment: Optional[str] = None,
+        confident: Optional[bool] = None,
+        min_confidence: Optional[float] = None
+    ) -> "ResultBatch":
+        """
+        Select results matching all of the given conditions.
+        
+        Args:
+            mask: Optional boolean array selecting results
+            sentiment: Keep only results with this sentiment
+            confident: Keep only results whose confidence flag equals this value
+            min_confidence: Keep only results with at least this confidence
+            
+        Returns:
+            A new ResultBatch with the selected results
+        """
+        selected = np.ones(len(self), dtype=bool) if mask is None else np.array(mask, dtype=bool)
+        if sentiment is not None:
+            selected &= self.label_ids == self.label_id(sentiment)
+        if confident is not None:
+            selected &= self.is_confident == confident
+        if min_confidence is not None:
+            selected &= self.confidences >= min_confidence
+        return self._take(selected)
+
+    def summary(self) -> Dict:
+        """
+        Compute the summary statistics with vectorized operations.
+        
+        Returns:
+            The same dictionary as ``SentimentAggregator.summary``
+        """
+        from app.utils.aggregator import SentimentAggregator
+        
+        aggregator = SentimentAggregator()
+        aggregator.update_batch(self)
+        return aggregator.summary()
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        Convert to the list-of-dictionaries format returned by ``analyze``.
+        
+        Returns:
+            A list of result dictionaries
+        """
+        return list(self)
+
+    def save(self, directory: str) -> None:
+        """
+        Save the batch as ``.npy`` files in a directory.
+        
+        Texts are stored as concatenated UTF-8 bytes plus offsets, so no file
+        needs pickle to load.
+        
+        Args:
+            directory: Target directory, created if it does not exist
+        """
+        os.makedirs(directory, exist_ok=True)
+        encoded = [text.encode("utf-8") for text in self.texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        np.save(os.path.join(directory, "label_ids.npy"), self.label_ids)
+        np.save(os.path.join(directory, "confidences.npy"), self.confidences)
+        np.save(os.path.join(directory, "is_confident.npy"), self.is_confident)
+        np.save(os.path.join(directory, "text_offsets.npy"), offsets)
+        np.save(
+            os.path.join(directory, "text_data.npy"),
+            np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        )
+
+    @classmethod
+    def load(
+        cls,
+        directory: str,
+        mmap_mode: Optional[str] = None,
+        labels: Mapping[int, str] = SENTIMENT_LABELS
+    ) -> "ResultBatch":
+        """
+        Load a batch saved with ``save``.
+        
+        Args:
+            directory: Directory containing the ``.npy`` files
+            mmap_mode: Passed to ``np.load`` to memory-map the numeric columns
+            labels: Mapping from label id to sentiment name
+            
+        Returns:
+            The loaded ResultBatch
+        """
+        def load_column(name: str) -> np.ndarray:
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+        
+        offsets = load_column("text_offsets")
+        data = load_column("text_data").tobytes()
+        texts = [
+            data[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+        return cls(
+            texts,
+            load_column("label_ids"),
+            load_column("confidences"),
+            load_column("is_confident"),
+            labels
+        )
+
+    @classmethod
+    def concatenate(cls, batches: Sequence["ResultBatch"]) -> "ResultBatch":
+        """
+        Join several batches into one.
+        
+        Args:
+            batches: The batches to join, in order
+            
+        Returns:
+            A new ResultBatch containing every result
+        """
+        if not batches:
+            return cls([], [], [])
+        return cls(
+            np.concatenate([batch.texts for batch in batches]),
+            np.concatenate([batch.label_ids for batch in batches]),
+            np.concatenate([batch.confidences for batch in batches]),
+            np.concatenate([batch.is_confident for batch in batches]),
+            batches[0].labels
+        )
+
+    def _take(self, index: Union[slice, np.ndarray]) -> "ResultBatch":
+        """
+        Build a batch from the rows selected by a slice or mask.
+        """
+        return ResultBatch(
+            self.texts[index],
+            self.label_ids[index],
+            self.confidences[index],
+            self.is_confident[index],
+            self.labels
+        )
@@ -0,0 +1,194 @@
+"""
+In-memory result cache for sentiment predictions.
+
+This module provides a bounded LRU cache that maps texts to their predicted
+label id and confidence. Keys are hashes of the normalized text combined with
+the model name, precision and maximum sequence length, so cached predictions
+are never reused across models, precisions or tokenization settings.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> cache = ResultCache(max_entries=1000)
+    >>> key = cache.make_key("Great!")
+    >>> cache.put(key, (1, 0.99))
+    >>> cache.get(key)
+    (1, 0.99)
+"""
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config.settings import (
+    CACHE_MAX_BYTES,
+    CACHE_MAX_ENTRIES,
+    MAX_LENGTH,
+    MODEL_NAME,
+    MODEL_PRECISION
+)
+
+# A cached prediction: (label id, confidence)
+Prediction = Tuple[int, float]
+
+# Approximate memory held by one entry: the hex digest key, the tuple, its
+# int and float, plus the OrderedDict's per-item bookkeeping.
+_ENTRY_BYTES = (
+    sys.getsizeof("0" * 64)
+    + sys.getsizeof((0, 0.0))
+    + sys.getsizeof(0)
+    + sys.getsizeof(0.0)
+    + 100
+)
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a text for cache lookups.
+    
+    Leading and trailing whitespace is removed and internal whitespace runs
+    are collapsed to a single space. The tokenizer splits on whitespace, so
+    this never changes the model input.
+    
+    Args:
+        text: The raw input text
+        
+    Returns:
+        The normalized text
+    """
+    return " ".join(text.split())
+
+class ResultCache:
+    """
+    A thread-safe, bounded LRU cache of sentiment predictions.
+    
+    Entries are evicted in least-recently-used order when either the entry
+    limit or the approximate memory limit is exceeded.
+    
+    Attributes:
+        max_entries (int): Maximum number of cached predictions
+        max_bytes (int): Approximate memory limit for the cache in bytes
+        namespace (str): Model-specific prefix mixed into every key
+        hits (int): Number of successful lookups
+        misses (int): Number of failed lookups
+        evictions (int): Number of entries dropped to respect the limits
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        model_name: str = MODEL_NAME,
+        max_length: int = MAX_LENGTH,
+        precision: str = MODEL_PRECISION
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of cached predictions
+            max_bytes: Approximate memory limit in bytes
+            model_name: Model name mixed into every key
+            max_length: Maximum sequence length mixed into every key
+            precision: Model precision mixed into every key
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+        if max_bytes < _ENTRY_BYTES:
+            raise ValueError(f"max_bytes must be at least {_ENTRY_BYTES}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.namespace = f"{model_name}\0{max_length}\0{precision}\0"
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Prediction]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, text: str) -> str:
+        """
+        Build the cache key for a text.
+        
+        Args:
+            text: The raw input text
+            
+        Returns:
+            A hex digest of the namespace and normalized text
+        """
+        data = (self.namespace + normalize_text(text)).encode("utf-8")
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, key: str) -> Optional[Prediction]:
+        """
+        Look up a prediction and mark it as recently used.
+        
+        Args:
+            key: A key returned by ``make_key``
+            
+        Returns:
+            The cached (label id, confidence) pair, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Prediction) -> None:
+        """
+        Store a prediction, evicting old entries if a limit is exceeded.
+        
+        Args:
+            key: A key returned by ``make_key``
+            value: The (label id, confidence) pair to cache
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while (
+                len(self._entries) > self.max_entries
+                or len(self._entries) * _ENTRY_BYTES > self.max_bytes
+            ):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """
+        Get cache counters.
+        
+        Returns:
+            A dictionary containing:
+                - entries: Number of cached predictions
+                - approx_bytes: Approximate memory used by the entries
+                - hits: Number of successful lookups
+                - misses: Number of failed lookups
+                - evictions: Number of entries evicted
+                - hit_rate: Percentage of lookups that were hits
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "approx_bytes": len(self._entries) * _ENTRY_BYTES,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) * 100 if lookups > 0 else 0
+            }
@@ -0,0 +1,403 @@
+"""
+Priority scheduling of analyzer requests with deadlines.
+
+This module puts a scheduler in front of a SentimentAnalyzer so interactive
+lookups and large backfill calls can share one model. Requests are queued in
+priority lanes and served by a single worker thread, one chunk of at most
+``chunk_size`` texts at a time. Before every chunk the worker picks the
+highest-priority lane with work, so a large request in a low lane is
+preempted at the next chunk boundary when a high-priority request arrives.
+Consecutive small requests in a lane share a chunk. Requests whose deadline
+has passed, or that were cancelled, are dropped before their next chunk runs.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+
+Example:
+    >>> scheduler = PriorityScheduler(analyzer)
+    >>> backfill = scheduler.submit(reviews, lane="batch")
+    >>> scheduler.analyze("Where is my order?", lane="interactive", deadline=0.5)
+    {'text': 'Where is my order?', 'sentiment': 'NEGATIVE', ...}
+    >>> scheduler.stats()["interactive"]["latency_p95_ms"]
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import (
+    TYPE_CHECKING,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union
+)
+
+import numpy as np
+
+from app.config.settings import (
+    SCHEDULER_CHUNK_SIZE,
+    SCHEDULER_LANES,
+    SCHEDULER_LATENCY_WINDOW
+)
+from app.utils.metrics import get_metrics
+
+if TYPE_CHECKING:
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+# Per-lane request counters reported by PriorityScheduler.stats
+_COUNTERS = ("submitted", "completed", "expired", "cancelled", "failed", "chunks")
+
+# Names of open schedulers, which prefix their metrics collectors
+_open_names: Set[str] = set()
+_open_names_lock = threading.Lock()
+
+class DeadlineExceededError(Exception):
+    """Raised for a request dropped because its deadline passed before it finished."""
+
+class _Request:
+    """
+    One submitted call and its progress through the queue.
+    """
+    
+    __slots__ = (
+        "texts", "single", "deadline", "submitted", "future", "results", "next_index"
+    )
+
+    def __init__(self, texts: List[str], single: bool, deadline: Optional[float]):
+        self.texts = texts
+        self.single = single
+        self.deadline = deadline
+        self.submitted = time.monotonic()
+        self.future: Future = Future()
+        self.results: List[Dict] = []
+        self.next_index = 0
+
+class PriorityScheduler:
+    """
+    A multi-lane request queue served in preemptible chunks by a background thread.
+    
+    Attributes:
+        analyzer (SentimentAnalyzer): The analyzer requests run on
+        name (str): Prefix of the scheduler's metrics collectors
+        lanes (Tuple[str, ...]): Lane names from highest to lowest priority
+        chunk_size (int): Maximum number of texts analyzed between scheduling
+            decisions
+    """
+
+    def __init__(
+        self,
+        analyzer: Optional["SentimentAnalyzer"] = None,
+        lanes: Sequence[str] = SCHEDULER_LANES,
+        chunk_size: int = SCHEDULER_CHUNK_SIZE,
+        latency_window: int = SCHEDULER_LATENCY_WINDOW,
+        name: str = "scheduler"
+    ):
+        """
+        Initialize the scheduler and start its worker thread.
+        
+        Args:
+            analyzer: Analyzer to run requests on (defaults to ``get_analyzer()``)
+            lanes: Lane names from highest to lowest priority
+            chunk_size: Maximum number of texts per chunk. Smaller chunks let
+                high-priority work in sooner at some cost in throughput.
+            latency_window: Completed requests per lane kept for latency stats
+            name: Prefix of the exported per-lane metrics, e.g. "scheduler"
+                exports ``sentiment_scheduler_<lane>_*``. Open schedulers
+                must have distinct names.
+        
+        Raises:
+            ValueError: If there are no lanes, duplicate lanes, chunk_size < 1
+                or another open scheduler has the same name
+        """
+        if not lanes or len(set(lanes)) != len(lanes):
+            raise ValueError(f"lanes must be non-empty and unique, got {lanes!r}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+        if analyzer is None:
+            from app.utils.sentiment_utils import get_analyzer
+            analyzer = get_analyzer()
+        with _open_names_lock:
+            if name in _open_names:
+                raise ValueError(f"a scheduler named {name!r} is already open")
+            _open_names.add(name)
+        self.analyzer = analyzer
+        self.name = name
+        self.lanes = tuple(lanes)
+        self.chunk_size = chunk_size
+        self._queues: Dict[str, Deque[_Request]] = {
+            lane: deque() for lane in self.lanes
+        }
+        self._counters = {
+            lane: dict.fromkeys(_COUNTERS, 0) for lane in self.lanes
+        }
+        self._latencies: Dict[str, Deque[float]] = {
+            lane: deque(maxlen=latency_window) for lane in self.lanes
+        }
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"priority-{name}", daemon=True
+        )
+        self._thread.start()
+        for lane in self.lanes:
+            get_metrics().register_collector(
+                f"{name}_{lane}", self._lane_stats_collector(lane)
+            )
+    
+    def submit(
+        self,
+        texts: Union[str, List[str]],
+        lane: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> Future:
+        """
+        Queue a request.
+        
+        The returned future can be cancelled until the request's first chunk
+        starts; after that the request runs to completion or to its deadline.
+        
+        Args:
+            texts: A single text or a list of texts
+            lane: Lane to queue in (defaults to the highest-priority lane)
+            deadline: Seconds from now after which the request is dropped
+                (None waits indefinitely)
+        
+        Returns:
+            A future resolved with the result dictionary, or the list of
+            results in input order. It fails with DeadlineExceededError if
+            the deadline passes first.
+        
+        Raises:
+            ValueError: If the lane does not exist
+            RuntimeError: If the scheduler is closed
+        """
+        lane = lane or self.lanes[0]
+        if lane not in self._queues:
+            raise ValueError(f"lane must be one of {self.lanes}, got {lane!r}")
+        single = isinstance(texts, str)
+        request = _Request(
+            [texts] if single else list(texts),
+            single,
+            None if deadline is None else time.monotonic() + deadline
+        )
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("scheduler is closed")
+            self._counters[lane]["submitted"] += 1
+            if not request.texts:
+                request.future.set_result([])
+                self._counters[lane]["completed"] += 1
+                return request.future
+            self._queues[lane].append(request)
+            self._condition.notify()
+        return request.future
+    
+    def analyze(
+        self,
+        texts: Union[str, List[str]],
+        lane: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> Union[Dict, List[Dict]]:
+        """
+        Queue a request and wait for its results.
+        
+        Args:
+            texts: A single text or a list of texts
+            lane: Lane to queue in (defaults to the highest-priority lane)
+            deadline: Seconds from now after which the request is dropped
+        
+        Returns:
+            The result dictionary, or the list of results in input order
+        
+        Raises:
+            DeadlineExceededError: If the deadline passed before the request finished
+        """
+        return self.submit(texts, lane, deadline).result()
+    
+    def queue_depth(self, lane: Optional[str] = None) -> int:
+        """
+        Get the number of texts still to be analyzed in one lane or in all lanes.
+        """
+        with self._condition:
+            lanes = [lane] if lane is not None else self.lanes
+            return sum(
+                len(request.texts) - request.next_index
+                for name in lanes
+                for request in self._queues[name]
+            )
+    
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Get queue and latency statistics for every lane.
+        
+        Returns:
+            A dictionary by lane, each containing:
+                - queued_requests: Requests waiting or in progress
+                - queued_texts: Texts still to be analyzed
+                - submitted, completed, expired, cancelled, failed: Request counts
+                - chunks: Chunks run for the lane
+                - latency_p50_ms, latency_p95_ms, latency_p99_ms, latency_max_ms:
+                  Submit-to-result latency of recently completed requests
+                  (0.0 before any completes)
+        """
+        with self._condition:
+            return {lane: self._lane_stats(lane) for lane in self.lanes}
+    
+    def close(self) -> None:
+        """
+        Stop the worker thread after the current chunk and fail queued requests.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        with self._condition:
+            for queue in self._queues.values():
+                while queue:
+                    request = queue.popleft()
+                    if not request.future.done():
+                        request.future.set_exception(
+                            RuntimeError("scheduler is closed")
+                        )
+        for lane in self.lanes:
+            get_metrics().unregister_collector(f"{self.name}_{lane}")
+        with _open_names_lock:
+            _open_names.discard(self.name)
+    
+    def _lane_stats(self, lane: str) -> Dict:
+        """
+        Build one lane's statistics. The caller holds the condition.
+        """
+        queue = self._queues[lane]
+        stats = {
+            "queued_requests": len(queue),
+            "queued_texts": sum(
+                len(request.texts) - request.next_index for request in queue
+            ),
+            **self._counters[lane]
+        }
+        latencies = np.asarray(self._latencies[lane], dtype=np.float64) * 1000
+        for name, value in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100)):
+            stats[f"latency_{name}_ms"] = (
+                float(np.percentile(latencies, value)) if len(latencies) else 0.0
+            )
+        return stats
+    
+    def _lane_stats_collector(self, lane: str):
+        """
+        Get a metrics collector for one lane.
+        """
+        def collect() -> Dict:
+            with self._condition:
+                return self._lane_stats(lane)
+        return collect
+    
+    def _drop_unrunnable(self, now: float) -> None:
+        """
+        Remove cancelled and expired requests from every lane. The caller holds
+        the condition.
+        """
+        for lane, queue in self._queues.items():
+            dropped = [
+                request for request in queue
+                if request.future.cancelled()
+                or (request.deadline is not None and request.deadline < now)
+            ]
+            for request in dropped:
+                queue.remove(request)
+                if request.future.cancelled():
+                    self._counters[lane]["cancelled"] += 1
+                else:
+                    self._counters[lane]["expired"] += 1
+                    remaining = len(request.texts) - request.next_index
+                    request.future.set_exception(DeadlineExceededError(
+                        f"deadline passed with {remaining} "
+                        f"of {len(request.texts)} texts not analyzed"
+                    ))
+    
+    def _next_chunk(self) -> Optional[Tuple[str, List[Tuple[_Request, int, int]]]]:
+        """
+        Wait for work and take the next chunk from the highest-priority lane.
+        
+        Returns:
+            Tuple of (lane, list of (request, start index, end index)), or
+            None once the scheduler is closed
+        """
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                self._drop_unrunnable(time.monotonic())
+                lane = next((name for name in self.lanes if self._queues[name]), None)
+                if lane is not None:
+                    break
+                self._condition.wait()
+            
+            pieces = []
+            space = self.chunk_size
+            for request in self._queues[lane]:
+                if space == 0:
+                    break
+                # A request that lost the race against cancel() is dropped next round
+                if (
+                    request.next_index == 0
+                    and not request.future.set_running_or_notify_cancel()
+                ):
+                    continue
+                start = request.next_index
+                end = min(len(request.texts), start + space)
+                request.next_index = end
+                pieces.append((request, start, end))
+                space -= end - start
+            return lane, pieces
+    
+    def _run(self) -> None:
+        """
+        Serve chunks until the scheduler is closed.
+        """
+        while True:
+            work = self._next_chunk()
+            if work is None:
+                return
+            lane, pieces = work
+            if not pieces:
+                continue
+            texts = [
+                text
+                for request, start, end in pieces
+                for text in request.texts[start:end]
+            ]
+            try:
+                results = self.analyzer.analyze(texts)
+            except Exception as error:
+                with self._condition:
+                    for request, _, _ in pieces:
+                        self._queues[lane].remove(request)
+                        self._counters[lane]["failed"] += 1
+                for request, _, _ in pieces:
+                    request.future.set_exception(error)
+                continue
+            
+            finished = []
+            offset = 0
+            with self._condition:
+                self._counters[lane]["chunks"] += 1
+                now = time.monotonic()
+                for request, start, end in pieces:
+                    request.results.extend(results[offset:offset + end - start])
+                    offset += end - start
+                    if end == len(request.texts):
+                        self._queues[lane].remove(request)
+                        self._counters[lane]["completed"] += 1
+                        self._latencies[lane].append(now - request.submitted)
+                        finished.append(request)
+            for request in finished:
+                request.future.set_result(
+                    request.results[0] if request.single else request.results
+                )
@@ -8,15 +8,40 @@ the ModelManager for model access and device management.
 Author: Ofelia Webb <ofelia.b.webb@gmail.com>
 """
 
+import numpy as np
 import torch
-from typing import Dict, List, Union
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 from app.config.settings import (
+    AUTOTUNE_PROFILE_PATH,
+    BATCH_SIZE,
+    EMBEDDING_POOLING,
+    LONG_DOC_AGGREGATION,
+    LONG_DOC_STRIDE,
     MAX_LENGTH,
+    MODEL_NAME,
+    PIPELINE_DEPTH,
+    PIPELINE_ENABLED,
     SENTIMENT_LABELS,
     CONFIDENCE_THRESHOLD
 )
 from app.models.model_manager import ModelManager
+from app.utils.autotune import apply_threads, load_profile
+from app.utils.metrics import BATCH_SIZE_BUCKETS, get_metrics
+from app.utils.pipeline import PipelinedExecutor
+from app.utils.prediction_store import PredictionStore
+from app.utils.result_batch import ResultBatch
+from app.utils.result_cache import ResultCache, normalize_text
+
+# Label ids and confidences for a list of texts, in input order
+Predictions = Tuple[List[int], List[float]]
+
+# Where exported arrays go: None (a new in-memory array), a .npy path (a new
+# memory-mapped file) or an existing array of the right shape (e.g. np.memmap)
+ArrayTarget = Union[None, str, np.ndarray]
+
+# Ways of combining window logits into one document prediction
+AGGREGATIONS = ("mean", "weighted", "max_confidence")
 
 class SentimentAnalyzer:
     """
@@ -28,18 +53,87 @@ class SentimentAnalyzer:
     
     Attributes:
         model_manager (ModelManager): The manager for model and device handling
+        batch_size (int): Maximum number of texts sent through the model at once
+        cache (ResultCache): Optional cache consulted before running the model
+        store (PredictionStore): Optional on-disk store consulted after the cache
+        pipeline (PipelinedExecutor): Optional executor that overlaps tokenization
+            and post-processing with the forward pass
+        last_padding_stats (Dict): Padding token counts from the most recent
+            length-bucketed batch (see ``analyze(..., bucket_by_length=True)``)
+        profile (Dict): The autotune profile applied at startup, or None
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+        store: Optional[PredictionStore] = None,
+        model_manager: Optional[ModelManager] = None,
+        pipelined: bool = PIPELINE_ENABLED
+    ):
         """
         Initialize the sentiment analyzer.
         
         This method creates a new instance of the ModelManager to handle
-        model loading and device management.
+        model loading and device management, unless one is passed in.
+        
+        If an autotune profile was saved for this model on this host (see
+        ``app.utils.autotune``), it supplies the defaults: its batch size is
+        used when ``batch_size`` is omitted, and when no ``model_manager`` is
+        passed in, its thread counts are applied and the model is loaded with
+        its precision and backend. The profile is read from
+        AUTOTUNE_PROFILE_PATH on every construction. Its thread counts are set
+        with ``torch.set_num_threads``, which affects every model in the
+        process, not just this analyzer; pass a ``model_manager`` to leave
+        them alone.
+        
+        Args:
+            batch_size: Maximum number of texts tokenized and run through the
+                model in a single forward pass (defaults to the autotune
+                profile's batch size, or BATCH_SIZE)
+            cache: Optional ResultCache. When set, texts are deduplicated and
+                looked up in the cache before inference, and new predictions
+                are added to it.
+            store: Optional PredictionStore. Texts missing from the cache are
+                looked up in the store in bulk, and new predictions are
+                written back to it.
+            model_manager: An existing ModelManager to use, e.g. one created
+                with a reduced precision. A default one is created if omitted.
+            pipelined: Tokenize the next chunk and post-process the previous
+                one on background threads while the model runs the current
+                chunk (defaults to PIPELINE_ENABLED)
         """
-        self.model_manager = ModelManager()
+        self.profile = (
+            load_profile(
+                AUTOTUNE_PROFILE_PATH,
+                model_name=model_manager.model_name if model_manager else MODEL_NAME
+            )
+            if batch_size is None or model_manager is None else None
+        )
+        if batch_size is None:
+            batch_size = self.profile["batch_size"] if self.profile else BATCH_SIZE
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        if model_manager is None and self.profile:
+            apply_threads(self.profile)
+            model_manager = ModelManager(
+                precision=self.profile["precision"], backend=self.profile["backend"]
+            )
+        self.model_manager = model_manager or ModelManager()
+        self.batch_size = batch_size
+        self.cache = cache
+        self.store = store
+        self.pipeline = (
+            PipelinedExecutor(self._encode, self._logits, self._postprocess, PIPELINE_DEPTH)
+            if pipelined else None
+        )
+        self.last_padding_stats: Dict[str, int] = {}
 
-    def analyze(self, text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
+    def analyze(
+        self,
+        text: Union[str, List[str]],
+        bucket_by_length: bool = False
+    ) -> Union[Dict, List[Dict]]:
         """
         Analyze the sentiment of the input text(s).
         
@@ -49,6 +143,10 @@ class SentimentAnalyzer:
         
         Args:
             text: Either a single text string or a list of text strings to analyze
+            bucket_by_length: For batch input, group texts of similar tokenized
+                length into the same model batch to reduce padding. The output
+                order is unchanged and the padding savings are recorded in
+                ``last_padding_stats``.
             
         Returns:
             For single text: A dictionary containing:
@@ -64,10 +162,12 @@ class SentimentAnalyzer:
             >>> result = analyzer.analyze("Great product!")
             >>> # Batch processing
             >>> results = analyzer.analyze(["Great!", "Terrible!", "Okay"])
+            >>> # Batch processing with length bucketing
+            >>> results = analyzer.analyze(texts, bucket_by_length=True)
         """
         if isinstance(text, str):
             return self._analyze_single(text)
-        return self._analyze_batch(text)
+        return self._analyze_batch(text, bucket_by_length=bucket_by_length)
 
     def _analyze_single(self, text: str) -> Dict:
         """
@@ -86,42 +186,516 @@ class SentimentAnalyzer:
                 - confidence: The confidence score (0-1)
                 - is_confident: Boolean indicating if confidence exceeds threshold
         """
-        model, tokenizer = self.model_manager.get_model_and_tokenizer()
-        device = self.model_manager.get_device()
-        
-        inputs = tokenizer(
-            text,
-            max_length=MAX_LENGTH,
-            padding=True,
-            truncation=True,
-            return_tensors="pt"
-        ).to(device)
-
-        with torch.no_grad():
-            outputs = model(**inputs)
-            scores = torch.softmax(outputs.logits, dim=1)
-            prediction = torch.argmax(scores, dim=1).item()
-            confidence = scores[0][prediction].item()
-
-        return {
-            "text": text,
-            "sentiment": SENTIMENT_LABELS[prediction],
-            "confidence": confidence,
-            "is_confident": confidence >= CONFIDENCE_THRESHOLD
-        }
+        return self._analyze_batch([text])[0]
 
-    def _analyze_batch(self, texts: List[str]) -> List[Dict]:
+    def _analyze_batch(self, texts: List[str], bucket_by_length: bool = False) -> List[Dict]:
         """
         Analyze sentiment for a batch of texts.
         
-        This internal method processes multiple texts by calling _analyze_single
-        for each text in the input list.
+        This internal method splits the input into chunks of at most
+        ``batch_size`` texts. Each chunk is tokenized with padding and run
+        through the model in a single forward pass, so the number of tokenizer
+        calls and forward passes grows with the number of chunks rather than
+        the number of texts. When a cache or store is configured, only texts
+        missing from both are sent to the model.
         
         Args:
             texts: A list of text strings to analyze
+            bucket_by_length: Group texts of similar tokenized length into
+                the same model batch (see ``_infer_bucketed``)
             
         Returns:
             A list of dictionaries, where each dictionary contains the analysis
-            results for the corresponding input text
+            results for the corresponding input text, in input order
+        """
+        predictions, confidences = self._infer(texts, bucket_by_length)
+        return self._format_results(texts, predictions, confidences, self.model_manager.labels)
+
+    def analyze_columnar(self, texts: List[str], bucket_by_length: bool = False) -> ResultBatch:
+        """
+        Analyze a batch of texts and return columnar results.
+        
+        This runs the same inference path as ``analyze`` but skips building a
+        dictionary per text. The returned ResultBatch holds NumPy arrays of
+        label ids, confidences and confidence flags plus references to the
+        input texts.
+        
+        Args:
+            texts: A list of text strings to analyze
+            bucket_by_length: Group texts of similar tokenized length into
+                the same model batch
+            
+        Returns:
+            A ResultBatch in input order
+            
+        Example:
+            >>> batch = analyzer.analyze_columnar(texts)
+            >>> batch.summary()["positive_percentage"]
+        """
+        predictions, confidences = self._infer(texts, bucket_by_length)
+        return ResultBatch(texts, predictions, confidences, labels=self.model_manager.labels)
+    
+    def analyze_with_embeddings(
+        self,
+        texts: List[str],
+        logits_out: ArrayTarget = None,
+        embeddings_out: ArrayTarget = None,
+        pooling: str = EMBEDDING_POOLING
+    ) -> Tuple[ResultBatch, np.ndarray, np.ndarray]:
+        """
+        Analyze texts and export raw logits and pooled embeddings from the same pass.
+        
+        Both outputs are float32 arrays covering the whole input, allocated
+        once up front; each model batch is written into its slice directly,
+        so there is no per-row copy or final concatenation. Passing a path
+        writes a .npy file through ``np.lib.format.open_memmap``, so outputs
+        larger than memory can be exported and later opened with
+        ``np.load(path, mmap_mode="r")``. The cache and store are bypassed,
+        since they do not hold logits or embeddings.
+        
+        Args:
+            texts: A list of text strings to analyze
+            logits_out: Target for the logits, of shape (len(texts), number
+                of labels)
+            embeddings_out: Target for the embeddings, of shape (len(texts),
+                hidden size)
+            pooling: "cls" or "mean" (see ModelManager.forward_with_embeddings)
+        
+        Returns:
+            Tuple containing:
+                - A ResultBatch in input order
+                - The logits array
+                - The embeddings array
+        
+        Raises:
+            ValueError: If a target array has the wrong shape or dtype
+        
+        Example:
+            >>> batch, logits, embeddings = analyzer.analyze_with_embeddings(
+            ...     texts, embeddings_out="embeddings.npy")
+        """
+        model, _ = self.model_manager.get_model_and_tokenizer()
+        count = len(texts)
+        logits = _output_array(logits_out, (count, model.config.num_labels))
+        embeddings = _output_array(embeddings_out, (count, model.config.hidden_size))
+        predictions: List[int] = []
+        confidences: List[float] = []
+        
+        for start in range(0, count, self.batch_size):
+            end = min(start + self.batch_size, count)
+            inputs = self._encode(texts[start:end])
+            chunk_logits, pooled = self.model_manager.forward_with_embeddings(
+                inputs["input_ids"], inputs["attention_mask"], pooling
+            )
+            chunk_logits = chunk_logits.float()
+            logits[start:end] = chunk_logits.cpu().numpy()
+            embeddings[start:end] = pooled.float().cpu().numpy()
+            chunk_predictions, chunk_confidences = self._postprocess(chunk_logits)
+            predictions.extend(chunk_predictions)
+            confidences.extend(chunk_confidences)
+        
+        for array in (logits, embeddings):
+            if isinstance(array, np.memmap):
+                array.flush()
+        results = ResultBatch(texts, predictions, confidences, labels=self.model_manager.labels)
+        return results, logits, embeddings
+
+    def _infer(self, texts: List[str], bucket_by_length: bool = False) -> Predictions:
+        """
+        Get label ids and confidences, going through the cache and store if set.
+        
+        Args:
+            texts: The texts to analyze
+            bucket_by_length: Group texts by tokenized length before inference
+            
+        Returns:
+            Label ids and confidences in input order
+        """
+        infer = self._infer_bucketed if bucket_by_length else self._infer_chunked
+        if self.cache is None and self.store is None:
+            return infer(texts)
+        return self._infer_cached(texts, infer)
+
+    def _infer_cached(
+        self,
+        texts: List[str],
+        infer: Callable[[List[str]], Predictions]
+    ) -> Predictions:
+        """
+        Resolve predictions through the cache and store, running the model on misses.
+        
+        Identical texts (after normalization) are resolved once per batch.
+        Each distinct text is looked up in the cache first, then in the store,
+        and only texts found in neither are inferred. New predictions are added
+        to both.
+        
+        Args:
+            texts: The texts to analyze
+            infer: The inference function used for misses
+            
+        Returns:
+            Label ids and confidences in input order
+        """
+        keys = [normalize_text(text) for text in texts]
+        unique: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, text)
+        
+        resolved: Dict[str, Tuple[int, float]] = {}
+        cache_keys: Dict[str, str] = {}
+        if self.cache is not None:
+            for key in unique:
+                cache_keys[key] = self.cache.make_key(key)
+                cached = self.cache.get(cache_keys[key])
+                if cached is not None:
+                    resolved[key] = cached
+        
+        missing = [key for key in unique if key not in resolved]
+        if self.store is not None and missing:
+            stored = self.store.lookup(missing)
+            for key, prediction in zip(missing, stored):
+                if prediction is not None:
+                    resolved[key] = prediction
+                    if self.cache is not None:
+                        self.cache.put(cache_keys[key], prediction)
+            missing = [key for key in missing if key not in resolved]
+        
+        if missing:
+            predictions, confidences = infer([unique[key] for key in missing])
+            inferred = list(zip(predictions, confidences))
+            for key, prediction in zip(missing, inferred):
+                resolved[key] = prediction
+                if self.cache is not None:
+                    self.cache.put(cache_keys[key], prediction)
+            if self.store is not None:
+                self.store.insert(missing, inferred)
+        
+        return (
+            [resolved[key][0] for key in keys],
+            [resolved[key][1] for key in keys]
+        )
+
+    def _infer_chunked(self, texts: List[str]) -> Predictions:
+        """
+        Run the model over consecutive chunks of ``batch_size`` texts.
+        
+        Args:
+            texts: The texts to analyze
+            
+        Returns:
+            Label ids and confidences in input order
         """
-        return [self._analyze_single(text) for text in texts] 
\ No newline at end of file
+        chunks = [
+            texts[start:start + self.batch_size]
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        if self.pipeline is not None:
+            outputs = self.pipeline.run(chunks)
+        else:
+            outputs = (self._predict(self._encode(chunk)) for chunk in chunks)
+        
+        predictions: List[int] = []
+        confidences: List[float] = []
+        for chunk_predictions, chunk_confidences in outputs:
+            predictions.extend(chunk_predictions)
+            confidences.extend(chunk_confidences)
+        return predictions, confidences
+
+    def _infer_bucketed(self, texts: List[str]) -> Predictions:
+        """
+        Run the model over batches of texts grouped by tokenized length.
+        
+        Every text is tokenized once without padding. Texts are then sorted by
+        token count and split into chunks of ``batch_size``, so each chunk is
+        padded only up to the longest text among similarly sized neighbours.
+        Predictions are written back to their original positions.
+        
+        Args:
+            texts: The texts to analyze
+            
+        Returns:
+            Label ids and confidences in input order
+        """
+        if not texts:
+            return [], []
+        _, tokenizer = self.model_manager.get_model_and_tokenizer()
+        with get_metrics().time("tokenize"):
+            encodings = tokenizer(
+                texts,
+                max_length=MAX_LENGTH,
+                truncation=True
+            )
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+        order = sorted(range(len(texts)), key=lambda index: lengths[index])
+        
+        predictions = [0] * len(texts)
+        confidences = [0.0] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            with get_metrics().time("tokenize"):
+                inputs = tokenizer.pad(
+                    {
+                        "input_ids": [encodings["input_ids"][i] for i in indices],
+                        "attention_mask": [encodings["attention_mask"][i] for i in indices]
+                    },
+                    return_tensors="pt"
+                )
+            chunk_predictions, chunk_confidences = self._predict(inputs)
+            for index, prediction, confidence in zip(
+                indices, chunk_predictions, chunk_confidences
+            ):
+                predictions[index] = prediction
+                confidences[index] = confidence
+        
+        unbucketed = _count_padding(lengths, self.batch_size)
+        bucketed = _count_padding([lengths[i] for i in order], self.batch_size)
+        self.last_padding_stats = {
+            "total_tokens": sum(lengths),
+            "padding_tokens": bucketed,
+            "unbucketed_padding_tokens": unbucketed,
+            "padding_tokens_avoided": unbucketed - bucketed
+        }
+        return predictions, confidences
+
+    def analyze_long(
+        self,
+        texts: Union[str, List[str]],
+        stride: int = LONG_DOC_STRIDE,
+        aggregation: str = LONG_DOC_AGGREGATION
+    ) -> Union[Dict, List[Dict]]:
+        """
+        Analyze documents longer than MAX_LENGTH tokens with sliding windows.
+        
+        Each document is tokenized once and split into windows of at most
+        MAX_LENGTH tokens (including special tokens) that overlap by
+        ``stride`` tokens. Windows from all documents are sorted by length and
+        packed into shared batches of ``batch_size``, and the window logits of
+        each document are combined into a single prediction. Documents that
+        fit in one window get the same result as ``analyze``.
+        
+        Args:
+            texts: Either a single document or a list of documents
+            stride: Number of tokens shared by consecutive windows
+            aggregation: How window logits are combined:
+                - "mean": Average of the window logits
+                - "weighted": Average weighted by each window's token count
+                - "max_confidence": Logits of the most confident window
+            
+        Returns:
+            The same result format as ``analyze``, with an extra ``windows``
+            key holding the number of windows scored for each document
+            
+        Example:
+            >>> analyzer.analyze_long(long_review, stride=64, aggregation="weighted")
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"aggregation must be one of {AGGREGATIONS}, got {aggregation!r}")
+        _, tokenizer = self.model_manager.get_model_and_tokenizer()
+        window_length = MAX_LENGTH - tokenizer.num_special_tokens_to_add()
+        if not 0 <= stride < window_length:
+            raise ValueError(f"stride must be between 0 and {window_length - 1}")
+        
+        documents = [texts] if isinstance(texts, str) else list(texts)
+        if not documents:
+            return []
+        token_ids = tokenizer(documents, add_special_tokens=False, verbose=False)["input_ids"]
+        
+        windows: List[Tuple[int, List[int]]] = []
+        step = window_length - stride
+        for document, ids in enumerate(token_ids):
+            start = 0
+            while True:
+                windows.append((
+                    document,
+                    tokenizer.build_inputs_with_special_tokens(ids[start:start + window_length])
+                ))
+                if start + window_length >= len(ids):
+                    break
+                start += step
+        windows.sort(key=lambda window: len(window[1]))
+        
+        window_logits: List[List[torch.Tensor]] = [[] for _ in documents]
+        window_sizes: List[List[int]] = [[] for _ in documents]
+        for start in range(0, len(windows), self.batch_size):
+            chunk = windows[start:start + self.batch_size]
+            inputs = tokenizer.pad(
+                {"input_ids": [ids for _, ids in chunk]}, return_tensors="pt"
+            )
+            for (document, ids), logits in zip(chunk, self._logits(inputs)):
+                window_logits[document].append(logits)
+                window_sizes[document].append(len(ids))
+        
+        predictions: List[int] = []
+        confidences: List[float] = []
+        for logits, sizes in zip(window_logits, window_sizes):
+            stacked = torch.stack(logits)
+            if aggregation == "mean":
+                combined = stacked.mean(dim=0)
+            elif aggregation == "weighted":
+                weights = torch.tensor(sizes, dtype=stacked.dtype, device=stacked.device)
+                combined = (stacked * weights[:, None]).sum(dim=0) / weights.sum()
+            else:
+                combined = stacked[torch.softmax(stacked, dim=1).max(dim=1).values.argmax()]
+            confidence, prediction = torch.max(torch.softmax(combined, dim=0), dim=0)
+            predictions.append(int(prediction))
+            confidences.append(float(confidence))
+        
+        results = self._format_results(
+            documents, predictions, confidences, self.model_manager.labels
+        )
+        for result, logits in zip(results, window_logits):
+            result["windows"] = len(logits)
+        return results[0] if isinstance(texts, str) else results
+
+    def _predict(self, inputs) -> Predictions:
+        """
+        Run the model on a tokenized batch.
+        
+        Args:
+            inputs: Padded tokenizer output holding PyTorch tensors
+            
+        Returns:
+            Tuple containing:
+                - The predicted label id for each row
+                - The softmax confidence of each prediction
+        """
+        return self._postprocess(self._logits(inputs))
+
+    def _encode(self, texts: List[str]):
+        """
+        Tokenize a chunk of texts and move it to the model's device.
+        
+        Args:
+            texts: The texts making up one model batch
+            
+        Returns:
+            Padded tokenizer output holding PyTorch tensors
+        """
+        _, tokenizer = self.model_manager.get_model_and_tokenizer()
+        metrics = get_metrics()
+        with metrics.time("tokenize"):
+            inputs = tokenizer(
+                texts,
+                max_length=MAX_LENGTH,
+                padding=True,
+                truncation=True,
+                return_tensors="pt"
+            )
+        with metrics.time("transfer"):
+            return inputs.to(self.model_manager.get_device())
+
+    @staticmethod
+    def _postprocess(logits: torch.Tensor) -> Predictions:
+        """
+        Turn logits into label ids and confidences.
+        
+        Args:
+            logits: Logits of shape (batch size, number of labels)
+            
+        Returns:
+            Tuple containing:
+                - The predicted label id for each row
+                - The softmax confidence of each prediction
+        """
+        with get_metrics().time("postprocess"):
+            scores = torch.softmax(logits, dim=1)
+            confidences, predictions = torch.max(scores, dim=1)
+            return predictions.tolist(), confidences.tolist()
+
+    def _logits(self, inputs) -> torch.Tensor:
+        """
+        Run the model on a tokenized batch and return float32 logits.
+        
+        Args:
+            inputs: Padded tokenizer output holding PyTorch tensors
+            
+        Returns:
+            Logits of shape (batch size, number of labels)
+        """
+        metrics = get_metrics()
+        device = self.model_manager.get_device()
+        if inputs["input_ids"].device != device:
+            with metrics.time("transfer"):
+                inputs = inputs.to(device)
+        if metrics.enabled:
+            attention_mask = inputs["attention_mask"]
+            metrics.observe("sentiment_batch_size", attention_mask.shape[0], buckets=BATCH_SIZE_BUCKETS)
+            metrics.inc("sentiment_tokens_total", attention_mask.numel())
+            metrics.inc(
+                "sentiment_padding_tokens_total",
+                attention_mask.numel() - int(attention_mask.sum())
+            )
+        logits = self.model_manager.forward(inputs["input_ids"], inputs["attention_mask"])
+        return logits.float()
+
+    @staticmethod
+    def _format_results(
+        texts: Sequence[str],
+        predictions: Sequence[int],
+        confidences: Sequence[float],
+        labels: Mapping[int, str] = SENTIMENT_LABELS
+    ) -> List[Dict]:
+        """
+        Build result dictionaries from per-row predictions.
+        
+        Args:
+            texts: The analyzed texts
+            predictions: The predicted label id for each text
+            confidences: The confidence score for each text
+            labels: Mapping from label id to sentiment name
+            
+        Returns:
+            A list of result dictionaries in the same order as ``texts``
+        """
+        return [
+            {
+                "text": text,
+                "sentiment": labels[prediction],
+                "confidence": confidence,
+                "is_confident": confidence >= CONFIDENCE_THRESHOLD
+            }
+            for text, prediction, confidence in zip(texts, predictions, confidences)
+        ]
+
+
+def _output_array(target: ArrayTarget, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Get the float32 array an export writes into.
+    
+    Args:
+        target: None, a .npy path or an existing array
+        shape: The required shape
+    
+    Returns:
+        A new array, a new memory-mapped .npy file or ``target`` itself
+    
+    Raises:
+        ValueError: If an existing array has the wrong shape or dtype
+    """
+    if target is None:
+        return np.empty(shape, dtype=np.float32)
+    if isinstance(target, str):
+        return np.lib.format.open_memmap(target, mode="w+", dtype=np.float32, shape=shape)
+    if target.shape != shape or target.dtype != np.float32:
+        raise ValueError(
+            f"output array must be float32 with shape {shape}, "
+            f"got {target.dtype} with shape {target.shape}"
+        )
+    return target
+
+def _count_padding(lengths: Sequence[int], batch_size: int) -> int:
+    """
+    Count the padding tokens needed to batch sequences in the given order.
+    
+    Args:
+        lengths: Token counts of the sequences, in batching order
+        batch_size: Number of sequences per batch
+        
+    Returns:
+        The total number of padding tokens across all batches
+    """
+    padding = 0
+    for start in range(0, len(lengths), batch_size):
+        chunk = lengths[start:start + batch_size]
+        padding += max(chunk) * len(chunk) - sum(chunk)
+    return padding
@@ -18,30 +18,213 @@ Example:
     >>> summary = get_sentiment_summary(results)
     >>> print(summary)
     {'total_texts': 3, 'positive_count': 1, 'negative_count': 1, ...}
+    
+    >>> # Stream a large corpus with bounded memory
+    >>> for result in analyze_stream(open("reviews.txt")):
+    ...     print(result["sentiment"])
 """
 
-from typing import Dict, List, Union
-from app.utils.sentiment_analyzer import SentimentAnalyzer
+import threading
+import time
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from app.config.settings import (
+    BATCH_SIZE,
+    CACHE_MAX_ENTRIES,
+    DEFAULT_MODEL,
+    PREDICTION_STORE_PATH
+)
+from app.utils.aggregator import SentimentAggregator
+from app.utils.analyzer_pool import AnalyzerPool
+from app.utils.metrics import get_metrics
+from app.utils.prediction_store import PredictionStore, model_fingerprint
+from app.utils.result_cache import ResultCache
+
+if TYPE_CHECKING:
+    # Importing the analyzer pulls in torch and transformers, so it is
+    # deferred until the first call that needs the model.
+    from app.models.model_registry import ModelRegistry
+    from app.utils.result_batch import ResultBatch
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
 
 # Initialize the sentiment analyzer as a singleton
 _analyzer = None
 
-def get_analyzer() -> SentimentAnalyzer:
+# Registry for models other than the default one, created on first use
+_registry = None
+
+# Pool of inference slots sharing the singleton's model, created on first use
+_pool = None
+
+# Guards creation of the singletons above when called from several threads
+_init_lock = threading.RLock()
+
+# Timings collected while the singleton analyzer starts up
+_startup_report: Dict[str, float] = {}
+
+def get_analyzer() -> "SentimentAnalyzer":
     """
     Get or create the sentiment analyzer instance.
     
     This function implements a singleton pattern for the SentimentAnalyzer,
     ensuring only one instance is created and reused throughout the application.
+    The instance is given a ResultCache unless CACHE_MAX_ENTRIES is 0, and a
+    PredictionStore when PREDICTION_STORE_PATH is set, both keyed by the model
+    and precision the analyzer actually loaded. Cache statistics are
+    registered with the metrics registry as the "cache" collector.
+    
+    torch and transformers are imported here on first use rather than when
+    this module is imported, so callers that only need summaries stay fast.
+    Creation is guarded by a lock, so concurrent first calls load the model
+    only once.
     
     Returns:
         SentimentAnalyzer: The singleton instance of the sentiment analyzer
     """
     global _analyzer
-    if _analyzer is None:
-        _analyzer = SentimentAnalyzer()
+    if _analyzer is not None:
+        return _analyzer
+    with _init_lock:
+        if _analyzer is not None:
+            return _analyzer
+        start = time.perf_counter()
+        from app.utils.sentiment_analyzer import SentimentAnalyzer
+        import_seconds = time.perf_counter() - start
+        
+        analyzer = SentimentAnalyzer()
+        # Key cached and stored predictions by the precision actually loaded,
+        # which an autotune profile may have changed
+        manager = analyzer.model_manager
+        if CACHE_MAX_ENTRIES > 0:
+            analyzer.cache = ResultCache(model_name=manager.model_name, precision=manager.precision)
+            get_metrics().register_collector("cache", analyzer.cache.stats)
+        if PREDICTION_STORE_PATH:
+            analyzer.store = PredictionStore(
+                PREDICTION_STORE_PATH,
+                model_fingerprint(model_name=manager.model_name, precision=manager.precision)
+            )
+        _startup_report["import_seconds"] = import_seconds
+        _startup_report.update(analyzer.model_manager.load_timings)
+        _analyzer = analyzer
     return _analyzer
 
-def analyze_sentiment(text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
+def get_model_registry() -> "ModelRegistry":
+    """
+    Get or create the model registry used for non-default models.
+    
+    The registry holds the models listed in MODEL_REGISTRY, loads them on
+    first use and evicts the least recently used ones when their weights
+    exceed MODEL_MEMORY_BUDGET_BYTES.
+    
+    Returns:
+        ModelRegistry: The singleton model registry
+    """
+    global _registry
+    with _init_lock:
+        if _registry is None:
+            from app.models.model_registry import ModelRegistry
+            _registry = ModelRegistry()
+    return _registry
+
+def get_analyzer_pool() -> AnalyzerPool:
+    """
+    Get or create the analyzer pool for multi-threaded callers.
+    
+    The pool's ANALYZER_POOL_SLOTS analyzers share the singleton analyzer's
+    model, result cache and prediction store, and split
+    ANALYZER_POOL_THREAD_BUDGET intra-op threads between them.
+    
+    Returns:
+        AnalyzerPool: The singleton analyzer pool
+        
+    Example:
+        >>> pool = get_analyzer_pool()
+        >>> with ThreadPoolExecutor(max_workers=16) as executor:
+        ...     results = list(executor.map(pool.analyze, texts))
+    """
+    global _pool
+    with _init_lock:
+        if _pool is None:
+            analyzer = get_analyzer()
+            _pool = AnalyzerPool(
+                model_manager=analyzer.model_manager,
+                cache=analyzer.cache,
+                store=analyzer.store
+            )
+    return _pool
+
+def warmup(batch_sizes: Sequence[int] = (1, BATCH_SIZE)) -> Dict[str, float]:
+    """
+    Load the model and run dummy batches so the first request is not slow.
+    
+    The dummy batches bypass the result cache and prediction store, so they
+    always reach the model and never leave entries behind.
+    
+    Args:
+        batch_sizes: Sizes of the dummy batches to run, in order
+        
+    Returns:
+        The startup report (see ``get_startup_report``)
+        
+    Example:
+        >>> warmup()
+        {'import_seconds': 2.1, 'tokenizer_load_seconds': 0.2, ...}
+    """
+    analyzer = get_analyzer()
+    durations = []
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        analyzer._infer_chunked(["This is a warm-up sentence."] * batch_size)
+        durations.append(time.perf_counter() - start)
+    if durations:
+        _startup_report.setdefault("first_forward_seconds", durations[0])
+        _startup_report["warmup_seconds"] = sum(durations)
+    return get_startup_report()
+
+def get_startup_report() -> Dict[str, float]:
+    """
+    Get the time spent on each startup stage of the singleton analyzer.
+    
+    Returns:
+        A dictionary that may contain (all values in seconds):
+            - import_seconds: Importing torch, transformers and the analyzer
+              (close to 0 if they were already imported)
+            - tokenizer_load_seconds: Loading the tokenizer
+            - model_load_seconds: Loading the model weights and applying precision
+            - backend_build_seconds: Tracing or compiling the forward backend
+            - first_forward_seconds: The first dummy batch run by ``warmup``
+            - warmup_seconds: All dummy batches run by the last ``warmup``
+        Stages that have not happened yet are missing.
+    """
+    return dict(_startup_report)
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Get the result cache used by the singleton analyzer.
+    
+    Returns:
+        The ResultCache of the singleton analyzer, or None if caching is disabled
+    
+    Example:
+        >>> get_result_cache().stats()
+        {'entries': 3, 'approx_bytes': 744, 'hits': 2, 'misses': 3, ...}
+    """
+    return get_analyzer().cache
+
+def get_prediction_store() -> Optional[PredictionStore]:
+    """
+    Get the persistent prediction store used by the singleton analyzer.
+    
+    Returns:
+        The PredictionStore of the singleton analyzer, or None if
+        PREDICTION_STORE_PATH is not set
+    """
+    return get_analyzer().store
+
+def analyze_sentiment(
+    text: Union[str, List[str]],
+    model: Optional[str] = None
+) -> Union[Dict, List[Dict]]:
     """
     Analyze the sentiment of the input text(s).
     
@@ -50,6 +233,9 @@ def analyze_sentiment(text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
     
     Args:
         text: Either a single text string or a list of text strings to analyze
+        model: Key of a model in MODEL_REGISTRY. The default model (or None)
+            uses the singleton analyzer with its cache and store; other
+            models are served by the model registry with their own labels.
         
     Returns:
         For single text: A dictionary containing:
@@ -64,11 +250,70 @@ def analyze_sentiment(text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
         >>> result = analyze_sentiment("Great product!")
         >>> # Batch processing
         >>> results = analyze_sentiment(["Great!", "Terrible!", "Okay"])
+        >>> # A model registered in MODEL_REGISTRY
+        >>> result = analyze_sentiment("Arrived broken.", model="reviews")
     """
-    analyzer = get_analyzer()
+    if model is None or model == DEFAULT_MODEL:
+        analyzer = get_analyzer()
+    else:
+        analyzer = get_model_registry().get_analyzer(model)
     return analyzer.analyze(text)
 
-def get_sentiment_summary(results: List[Dict]) -> Dict:
+def analyze_stream(
+    texts: Iterable[str],
+    batch_size: Optional[int] = None,
+    bucket_by_length: bool = False
+) -> Iterator[Dict]:
+    """
+    Analyze the sentiment of a stream of texts.
+    
+    Texts are pulled lazily from the iterable ``batch_size`` at a time, so at
+    most one batch of texts and results is held in memory. Results are yielded
+    in input order.
+    
+    Args:
+        texts: Any iterable of text strings, e.g. a generator or an open file
+        batch_size: Number of texts pulled and analyzed together (defaults
+            to the analyzer's batch size, which an autotune profile may set)
+        bucket_by_length: Group each pulled batch by tokenized length before
+            inference (see ``SentimentAnalyzer.analyze``)
+        
+    Yields:
+        One result dictionary per input text, in the same format as
+        ``analyze_sentiment``
+        
+    Example:
+        >>> summary = summarize_stream(analyze_stream(line.rstrip("\\n") for line in f))
+    """
+    if batch_size is not None and batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    analyzer = get_analyzer()
+    batch_size = batch_size or analyzer.batch_size
+    iterator = iter(texts)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield from analyzer.analyze(batch, bucket_by_length=bucket_by_length)
+
+def summarize_stream(results: Iterable[Dict]) -> Dict:
+    """
+    Generate a summary from an iterable of results in a single pass.
+    
+    Unlike building a list first, this consumes the results one at a time,
+    so it works with the generator returned by ``analyze_stream``.
+    
+    Args:
+        results: An iterable of sentiment analysis result dictionaries
+        
+    Returns:
+        A dictionary with the same keys as ``get_sentiment_summary``
+    """
+    aggregator = SentimentAggregator()
+    aggregator.update_many(results)
+    return aggregator.summary()
+
+def get_sentiment_summary(results: Union[List[Dict], "ResultBatch"]) -> Dict:
     """
     Generate a summary of sentiment analysis results.
     
@@ -77,7 +322,8 @@ def get_sentiment_summary(results: List[Dict]) -> Dict:
     sentiments, as well as confidence metrics.
     
     Args:
-        results: A list of sentiment analysis result dictionaries
+        results: A list of sentiment analysis result dictionaries, or a
+            columnar ResultBatch
         
     Returns:
         A dictionary containing summary statistics with the following keys:
@@ -88,6 +334,10 @@ def get_sentiment_summary(results: List[Dict]) -> Dict:
             - positive_percentage: Percentage of positive sentiments
             - negative_percentage: Percentage of negative sentiments
             - confidence_rate: Percentage of confident predictions
+            - mean_confidence, min_confidence, max_confidence: Confidence
+              statistics (None if no result carries a confidence)
+            - confidence_p50, confidence_p90, confidence_p99: Approximate
+              confidence quantiles from SentimentAggregator's histogram
             
     Example:
         >>> results = analyze_sentiment(["Great!", "Terrible!", "Okay"])
@@ -95,17 +345,7 @@ def get_sentiment_summary(results: List[Dict]) -> Dict:
         >>> print(summary)
         {'total_texts': 3, 'positive_count': 1, 'negative_count': 1, ...}
     """
-    total = len(results)
-    positive = sum(1 for r in results if r["sentiment"] == "POSITIVE")
-    negative = sum(1 for r in results if r["sentiment"] == "NEGATIVE")
-    confident = sum(1 for r in results if r["is_confident"])
-    
-    return {
-        "total_texts": total,
-        "positive_count": positive,
-        "negative_count": negative,
-        "confident_predictions": confident,
-        "positive_percentage": (positive / total) * 100 if total > 0 else 0,
-        "negative_percentage": (negative / total) * 100 if total > 0 else 0,
-        "confidence_rate": (confident / total) * 100 if total > 0 else 0
-    } 
\ No newline at end of file
+    if hasattr(results, "summary"):
+        # A columnar ResultBatch computes its summary with vectorized counts
+        return results.summary()
+    return summarize_stream(results) 
\ No newline at end of file
@@ -2,15 +2,23 @@
 Common test fixtures and configurations.
 
 This module provides shared test fixtures and configurations used across
-the test suite, including model instances and sample data.
+the test suite, including model instances and sample data. Analyzers
+created by tests never read the host's autotune profile.
 
 Author: Ofelia Webb <ofelia.b.webb@gmail.com>
 """
 
 import pytest
+from app.utils import sentiment_analyzer as sentiment_analyzer_module
 from app.utils.sentiment_analyzer import SentimentAnalyzer
 from app.models.model_manager import ModelManager
 
+@pytest.fixture(autouse=True)
+def no_autotune_profile(monkeypatch, tmp_path):
+    """Keep analyzers from picking up an autotune profile saved on this host."""
+    path = str(tmp_path / "autotune.json")
+    monkeypatch.setattr(sentiment_analyzer_module, "AUTOTUNE_PROFILE_PATH", path)
+
 @pytest.fixture
 def model_manager():
     """Fixture for ModelManager instance."""
@@ -0,0 +1,136 @@
+"""
+Unit tests for the sentiment aggregator.
+
+This module contains unit tests for SentimentAggregator, including
+incremental updates, pass-through tracking of streamed results, merging,
+state export and approximate quantiles.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import json
+
+import pytest
+from app.utils.aggregator import SentimentAggregator
+
+RESULTS = [
+    {"sentiment": "POSITIVE", "confidence": 0.9, "is_confident": True},
+    {"sentiment": "NEGATIVE", "confidence": 0.6, "is_confident": True},
+    {"sentiment": "POSITIVE", "confidence": 0.4, "is_confident": False},
+]
+
+def test_empty_summary():
+    """Test the summary of an aggregator with no results."""
+    summary = SentimentAggregator().summary()
+    
+    assert summary["total_texts"] == 0
+    assert summary["positive_percentage"] == 0
+    assert summary["confidence_rate"] == 0
+
+def test_update_many():
+    """Test counting a batch of results."""
+    aggregator = SentimentAggregator()
+    aggregator.update_many(RESULTS)
+    summary = aggregator.summary()
+    
+    assert summary["total_texts"] == 3
+    assert summary["positive_count"] == 2
+    assert summary["negative_count"] == 1
+    assert summary["confident_predictions"] == 2
+    assert summary["negative_percentage"] == pytest.approx(100 / 3)
+
+def test_track_passes_results_through():
+    """Test that tracking yields every result while counting it."""
+    aggregator = SentimentAggregator()
+    
+    assert list(aggregator.track(iter(RESULTS))) == RESULTS
+    assert aggregator.total == 3
+
+def test_summary_is_superset_with_confidence_stats():
+    """Test the confidence statistics added to the summary."""
+    aggregator = SentimentAggregator()
+    aggregator.update_many(RESULTS)
+    summary = aggregator.summary()
+    
+    assert summary["mean_confidence"] == pytest.approx((0.9 + 0.6 + 0.4) / 3)
+    assert summary["min_confidence"] == 0.4
+    assert summary["max_confidence"] == 0.9
+    assert 0.4 <= summary["confidence_p50"] <= summary["confidence_p99"] <= 0.9
+
+def test_results_without_confidence():
+    """Test that results without a confidence only update the counts."""
+    aggregator = SentimentAggregator()
+    aggregator.update({"sentiment": "POSITIVE", "is_confident": True})
+    summary = aggregator.summary()
+    
+    assert summary["positive_count"] == 1
+    assert summary["mean_confidence"] is None
+    assert summary["confidence_p50"] is None
+
+def test_merge_equals_single_aggregator():
+    """Test that merging shard aggregators equals aggregating everything at once."""
+    results = RESULTS * 10
+    whole = SentimentAggregator()
+    whole.update_many(results)
+    
+    shards = [SentimentAggregator() for _ in range(3)]
+    for index, result in enumerate(results):
+        shards[index % 3].update(result)
+    merged = SentimentAggregator.merge_all(shards)
+    
+    assert merged.summary() == pytest.approx(whole.summary())
+    assert merged.histogram == whole.histogram
+
+def test_merge_rejects_different_bins():
+    """Test that aggregators with different histograms cannot be merged."""
+    with pytest.raises(ValueError):
+        SentimentAggregator(bins=10).merge(SentimentAggregator(bins=20))
+
+def test_state_round_trip():
+    """Test exporting and restoring the state through JSON."""
+    aggregator = SentimentAggregator()
+    aggregator.update_many(RESULTS)
+    restored = SentimentAggregator.from_state(json.loads(json.dumps(aggregator.to_state())))
+    
+    assert restored.summary() == aggregator.summary()
+    assert SentimentAggregator.from_state(SentimentAggregator().to_state()).total == 0
+
+def test_quantiles_are_within_one_bin():
+    """Test histogram quantile accuracy on a uniform sample."""
+    aggregator = SentimentAggregator(bins=100)
+    confidences = [0.5 + i / 2000 for i in range(1000)]
+    aggregator.update_many(
+        {"sentiment": "POSITIVE", "confidence": c, "is_confident": True} for c in confidences
+    )
+    
+    assert aggregator.quantile(0.5) == pytest.approx(0.75, abs=0.01)
+    assert aggregator.quantile(0.9) == pytest.approx(0.95, abs=0.01)
+    with pytest.raises(ValueError):
+        aggregator.quantile(1.5)
+
+def test_update_batch_matches_update_many():
+    """Test that columnar updates match per-result updates."""
+    from app.utils.result_batch import ResultBatch
+    
+    batch = ResultBatch(["a", "b", "c"], [1, 0, 1], [0.9, 0.6, 0.4])
+    columnar = SentimentAggregator()
+    columnar.update_batch(batch)
+    per_result = SentimentAggregator()
+    per_result.update_many(batch.to_dicts())
+    
+    assert columnar.summary() == pytest.approx(per_result.summary())
+    assert columnar.histogram == per_result.histogram
+
+def test_update_batch_with_custom_labels():
+    """Test that columnar updates count unknown sentiments like update does."""
+    from app.utils.result_batch import ResultBatch
+    from app.utils.sentiment_utils import get_sentiment_summary
+    
+    labels = {0: "BAD", 1: "OK", 2: "GOOD"}
+    batch = ResultBatch(["a", "b", "c"], [2, 0, 1], [0.9, 0.6, 0.4], labels=labels)
+    per_result = SentimentAggregator()
+    per_result.update_many(batch.to_dicts())
+    
+    assert batch.summary() == pytest.approx(per_result.summary())
+    assert get_sentiment_summary(batch)["total_texts"] == 3
+    assert batch.summary()["positive_count"] == 0
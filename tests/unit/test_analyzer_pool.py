@@ -0,0 +1,81 @@
+"""
+Unit tests for the in-process analyzer pool.
+
+This module contains unit tests for AnalyzerPool, including slot sharing,
+blocking and timed-out checkouts, thread budgets and concurrent callers.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from app.utils.analyzer_pool import AnalyzerPool
+
+@pytest.fixture
+def pool(sentiment_analyzer):
+    """Fixture providing a two-slot pool sharing the analyzer's model."""
+    return AnalyzerPool(slots=2, thread_budget=4, model_manager=sentiment_analyzer.model_manager)
+
+def test_slots_share_one_model(pool):
+    """Test that every slot has its own analyzer on the same model."""
+    with pool.checkout() as first, pool.checkout() as second:
+        assert first is not second
+        assert first.model_manager is second.model_manager
+    assert pool.threads_per_slot == 2
+
+def test_checkout_timeout(sentiment_analyzer):
+    """Test that a checkout times out while every slot is busy."""
+    pool = AnalyzerPool(slots=1, model_manager=sentiment_analyzer.model_manager)
+    with pool.checkout():
+        with pytest.raises(TimeoutError):
+            with pool.checkout(timeout=0.01):
+                pass
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["available"] == 1
+
+def test_blocking_checkout_waits_for_release(sentiment_analyzer):
+    """Test that a blocking checkout gets the slot once it is returned."""
+    pool = AnalyzerPool(slots=1, model_manager=sentiment_analyzer.model_manager)
+    acquired = threading.Event()
+    
+    def borrow():
+        with pool.checkout():
+            acquired.set()
+    
+    with pool.checkout():
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        assert not acquired.wait(0.05)
+    thread.join(5)
+    assert acquired.is_set()
+    assert pool.stats()["waits"] == 1
+
+def test_concurrent_callers(pool, sample_texts):
+    """Test that many threads get correct results through a bounded number of slots."""
+    in_use = []
+    active = []
+    lock = threading.Lock()
+    
+    def analyze(text):
+        with pool.checkout() as analyzer:
+            with lock:
+                active.append(analyzer)
+                in_use.append(len(active))
+            result = analyzer.analyze(text)
+            with lock:
+                active.remove(analyzer)
+            return result
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(analyze, sample_texts * 4))
+    assert [r["text"] for r in results] == sample_texts * 4
+    assert max(in_use) <= pool.slots
+    assert pool.stats()["checkouts"] == len(sample_texts) * 4
+
+def test_invalid_slots():
+    """Test that a pool needs at least one slot."""
+    with pytest.raises(ValueError):
+        AnalyzerPool(slots=0)
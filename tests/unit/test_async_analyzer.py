@@ -0,0 +1,79 @@
+"""
+Unit tests for the asyncio micro-batching front end.
+
+This module contains unit tests for AsyncSentimentAnalyzer, including batch
+flushing by size and deadline, result routing and error propagation.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import asyncio
+
+import pytest
+from app.utils.async_analyzer import AsyncSentimentAnalyzer
+
+def test_async_analyze_single(sentiment_analyzer, positive_text):
+    """Test that a single awaited text gets its own result."""
+    async def run():
+        async_analyzer = AsyncSentimentAnalyzer(sentiment_analyzer, max_wait_ms=1)
+        result = await async_analyzer.analyze(positive_text)
+        await async_analyzer.close()
+        return result
+    
+    result = asyncio.run(run())
+    assert result["text"] == positive_text
+    assert result["sentiment"] in ["POSITIVE", "NEGATIVE"]
+
+def test_async_concurrent_callers_are_batched(sentiment_analyzer, sample_texts):
+    """Test that concurrent callers share micro-batches and get matching results."""
+    async def run():
+        async_analyzer = AsyncSentimentAnalyzer(
+            sentiment_analyzer, max_batch_size=len(sample_texts), max_wait_ms=1000
+        )
+        results = await asyncio.gather(
+            *(async_analyzer.analyze(text) for text in sample_texts)
+        )
+        await async_analyzer.close()
+        return results, async_analyzer.batches_run
+    
+    results, batches_run = asyncio.run(run())
+    assert [r["text"] for r in results] == sample_texts
+    assert batches_run == 1
+
+def test_async_deadline_flush(sentiment_analyzer, sample_texts):
+    """Test that a partial batch is flushed once the wait deadline passes."""
+    async def run():
+        async_analyzer = AsyncSentimentAnalyzer(
+            sentiment_analyzer, max_batch_size=100, max_wait_ms=5
+        )
+        results = await async_analyzer.analyze(sample_texts[:2])
+        await async_analyzer.close()
+        return results
+    
+    results = asyncio.run(run())
+    assert [r["text"] for r in results] == sample_texts[:2]
+
+def test_async_errors_reach_callers(sentiment_analyzer):
+    """Test that an inference error is raised in every waiting caller."""
+    def fail(texts):
+        raise RuntimeError("model failure")
+    
+    sentiment_analyzer._analyze_batch = fail
+    
+    async def run():
+        async_analyzer = AsyncSentimentAnalyzer(sentiment_analyzer, max_wait_ms=1)
+        with pytest.raises(RuntimeError):
+            await async_analyzer.analyze("text")
+        await async_analyzer.close()
+    
+    asyncio.run(run())
+
+def test_async_rejects_non_string(sentiment_analyzer):
+    """Test that non-string input is rejected."""
+    async def run():
+        async_analyzer = AsyncSentimentAnalyzer(sentiment_analyzer)
+        with pytest.raises(TypeError):
+            await async_analyzer.analyze(123)
+        await async_analyzer.close()
+    
+    asyncio.run(run())
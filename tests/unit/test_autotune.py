@@ -0,0 +1,101 @@
+"""
+Unit tests for hardware-aware autotuning.
+
+This module contains unit tests for the autotune search, profile
+persistence and host matching, and the analyzer picking up a saved profile.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import json
+
+import pytest
+import torch
+from app.config.settings import MODEL_NAME
+from app.utils import sentiment_analyzer as sentiment_analyzer_module
+from app.utils.autotune import autotune, host_fingerprint, load_profile, save_profile
+from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+@pytest.fixture
+def profile():
+    """Fixture providing a minimal profile for the current host."""
+    return {
+        "version": 2,
+        "model_name": MODEL_NAME,
+        "host": host_fingerprint(),
+        "batch_size": 7,
+        "intra_op_threads": torch.get_num_threads(),
+        "inter_op_threads": torch.get_num_interop_threads(),
+        "precision": "fp32",
+        "backend": "eager"
+    }
+
+def test_profile_round_trip(profile, tmp_path):
+    """Test that a saved profile loads back on the same host."""
+    path = save_profile(profile, str(tmp_path / "nested" / "autotune.json"))
+    assert load_profile(path) == profile
+
+def test_profile_for_other_host_is_ignored(profile, tmp_path):
+    """Test that profiles from another host, missing files and None are ignored."""
+    profile["host"] = dict(profile["host"], cpu_count=-1)
+    path = save_profile(profile, str(tmp_path / "autotune.json"))
+    assert load_profile(path) is None
+    assert load_profile(str(tmp_path / "missing.json")) is None
+    assert load_profile(None) is None
+
+def test_profiles_are_kept_per_model(profile, tmp_path):
+    """Test that each model gets its own profile in a shared file."""
+    path = str(tmp_path / "autotune.json")
+    other = dict(profile, model_name="other-model", batch_size=3, precision="int8")
+    save_profile(profile, path)
+    save_profile(other, path)
+    
+    assert load_profile(path) == profile
+    assert load_profile(path, model_name="other-model") == other
+    assert load_profile(path, model_name="unknown-model") is None
+
+def test_autotune_search(sentiment_analyzer, sample_texts):
+    """Test that every configuration is measured and the fastest eligible one wins."""
+    result = autotune(
+        sample_texts,
+        batch_sizes=(2, 4),
+        thread_counts=[1],
+        precisions=("fp32", "int8"),
+        model_manager=sentiment_analyzer.model_manager,
+        min_agreement=0.0,
+        repeats=1
+    )
+    assert len(result["trials"]) == 4
+    assert {trial["precision"] for trial in result["trials"]} == {"fp32", "int8"}
+    best = max(result["trials"], key=lambda trial: trial["texts_per_sec"])
+    assert (result["batch_size"], result["precision"]) == (best["batch_size"], best["precision"])
+    assert result["host"] == host_fingerprint()
+    assert result["model_name"] == sentiment_analyzer.model_manager.model_name
+    json.dumps(result)
+
+def test_ineligible_precision_is_not_chosen(sentiment_analyzer, sample_texts):
+    """Test that a configuration below the agreement threshold is never picked."""
+    result = autotune(
+        sample_texts,
+        batch_sizes=(2,),
+        thread_counts=[1],
+        precisions=("int8", "fp32"),
+        model_manager=sentiment_analyzer.model_manager,
+        min_agreement=1.01,
+        repeats=1
+    )
+    assert result["precision"] == "fp32"
+
+def test_analyzer_uses_profile(profile, monkeypatch, model_manager, tmp_path):
+    """Test that a new analyzer takes its defaults from the host profile."""
+    save_profile(profile, sentiment_analyzer_module.AUTOTUNE_PROFILE_PATH)
+    assert SentimentAnalyzer(model_manager=model_manager).batch_size == 7
+    assert SentimentAnalyzer(batch_size=3, model_manager=model_manager).profile is None
+    analyzer = SentimentAnalyzer()
+    assert analyzer.profile == profile
+    assert analyzer.model_manager.precision == "fp32"
+    
+    other = dict(profile, model_name="other-model")
+    other_path = save_profile(other, str(tmp_path / "other.json"))
+    monkeypatch.setattr(sentiment_analyzer_module, "AUTOTUNE_PROFILE_PATH", other_path)
+    assert SentimentAnalyzer(model_manager=model_manager).profile is None
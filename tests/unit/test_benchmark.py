@@ -0,0 +1,59 @@
+"""
+Unit tests for the offline benchmark suite.
+
+This module contains unit tests for the benchmark helpers, a small sweep on
+the tiny random model, and regression detection in report comparison.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import json
+
+import pytest
+from app.utils.benchmark import compare_reports, main, make_texts, run_suite
+
+def report(texts_per_sec, p95_ms, p99_ms, name="batch/short/bs8/t1"):
+    """Build a minimal report with one case."""
+    return {"cases": [{"name": name, "texts_per_sec": texts_per_sec, "p95_ms": p95_ms, "p99_ms": p99_ms}]}
+
+def test_make_texts_distributions():
+    """Test that synthetic texts are reproducible and respect their length range."""
+    short = make_texts(20, "short", seed=1)
+    assert short == make_texts(20, "short", seed=1)
+    assert all(len(text.split()) <= 16 for text in short)
+    assert min(len(text.split()) for text in make_texts(20, "long")) >= 150
+    with pytest.raises(ValueError):
+        make_texts(1, "huge")
+
+def test_run_suite_offline():
+    """Test that a small sweep runs on the tiny random model and reports every case."""
+    result = run_suite(batch_sizes=[2, 4], distributions=["short"], threads=[1], num_texts=8)
+    names = [case["name"] for case in result["cases"]]
+    assert names == ["single/short/bs1/t1", "batch/short/bs2/t1", "batch/short/bs4/t1"]
+    for case in result["cases"]:
+        assert case["texts"] == 8
+        assert case["texts_per_sec"] > 0
+        assert case["p50_ms"] <= case["p95_ms"] <= case["p99_ms"]
+        assert case["peak_rss_mb"] > 0
+
+def test_compare_flags_regressions():
+    """Test that slower throughput and higher tail latency are flagged as regressions."""
+    baseline = report(100.0, 10.0, 12.0)
+    assert compare_reports(baseline, report(95.0, 10.5, 12.0))["passed"]
+    comparison = compare_reports(baseline, report(80.0, 10.0, 20.0))
+    assert not comparison["passed"]
+    assert {r["metric"] for r in comparison["regressions"]} == {"texts_per_sec", "p99_ms"}
+
+def test_compare_reports_missing_cases():
+    """Test that baseline cases absent from the current report are listed."""
+    comparison = compare_reports(report(100.0, 10.0, 12.0), report(100.0, 10.0, 12.0, name="other"))
+    assert comparison["missing"] == ["batch/short/bs8/t1"]
+    assert comparison["compared"] == 0
+
+def test_compare_cli_exit_code(tmp_path):
+    """Test that the compare command exits with 1 when it finds regressions."""
+    baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline.write_text(json.dumps(report(100.0, 10.0, 12.0)))
+    current.write_text(json.dumps(report(50.0, 10.0, 12.0)))
+    assert main(["compare", str(baseline), str(current)]) == 1
+    assert main(["compare", str(baseline), str(baseline)]) == 0
@@ -0,0 +1,129 @@
+"""
+Unit tests for the bulk scoring job.
+
+This module contains unit tests for line indexing, shard ranges, the JSONL,
+CSV and plain-text readers, and resuming a killed job from its checkpoint.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import json
+
+import pytest
+from app.utils.bulk_job import build_line_index, parse_shard, run_job, shard_range
+
+def read_output(path):
+    """Read a JSONL output file."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_build_line_index():
+    """Test line offsets with and without a trailing newline."""
+    assert build_line_index(b"a\nbb\n").tolist() == [0, 2, 5]
+    assert build_line_index(b"a\nbb").tolist() == [0, 2, 4]
+    assert build_line_index(b"").tolist() == [0]
+
+def test_shards_cover_every_line():
+    """Test that shard ranges are contiguous, disjoint and complete."""
+    ranges = [shard_range(1, 11, index, 3) for index in range(3)]
+    assert ranges[0][0] == 1 and ranges[-1][1] == 11
+    assert all(ranges[i][1] == ranges[i + 1][0] for i in range(2))
+    assert parse_shard("2/4") == (2, 4)
+    with pytest.raises(ValueError):
+        parse_shard("4/4")
+
+def test_jsonl_job(sentiment_analyzer, sample_texts, tmp_path):
+    """Test scoring a JSONL file with ids, a blank line and a malformed record."""
+    source = tmp_path / "input.jsonl"
+    lines = [json.dumps({"id": f"r{i}", "text": text}) for i, text in enumerate(sample_texts)]
+    source.write_text("\n".join(lines + ["", "{not json"]) + "\n")
+    output = str(tmp_path / "output.jsonl")
+    stats = run_job(str(source), output, analyzer=sentiment_analyzer, progress=None)
+    rows = read_output(output)
+    assert [row["text"] for row in rows[:-1]] == sample_texts
+    assert [row["id"] for row in rows[:-1]] == [f"r{i}" for i in range(len(sample_texts))]
+    assert "error" in rows[-1] and rows[-1]["line"] == len(sample_texts) + 1
+    assert stats["records"] == len(sample_texts) + 1
+    assert stats["errors"] == 1
+
+def test_csv_shard(sentiment_analyzer, sample_texts, tmp_path):
+    """Test that a CSV shard covers only its share of the data lines."""
+    source = tmp_path / "input.csv"
+    source.write_text("id,text\n" + "".join(f'{i},"{text}"\n' for i, text in enumerate(sample_texts)))
+    outputs = []
+    for index in range(2):
+        output = str(tmp_path / f"output-{index}.jsonl")
+        run_job(str(source), output, shard=(index, 2), analyzer=sentiment_analyzer, progress=None)
+        outputs.extend(read_output(output))
+    assert [row["text"] for row in outputs] == sample_texts
+    assert [row["line"] for row in outputs] == list(range(1, len(sample_texts) + 1))
+
+def test_resume_after_crash(sentiment_analyzer, sample_texts, tmp_path):
+    """Test that a killed job resumes after its last checkpoint without duplicates."""
+    source = tmp_path / "input.txt"
+    source.write_text("\n".join(sample_texts * 2))
+    output = str(tmp_path / "output.jsonl")
+    
+    class Crashing:
+        calls = 0
+        
+        def analyze(self, texts, bucket_by_length=False):
+            self.calls += 1
+            if self.calls == 3:
+                raise KeyboardInterrupt
+            return sentiment_analyzer.analyze(texts)
+    
+    with pytest.raises(KeyboardInterrupt):
+        run_job(str(source), output, batch_size=3, analyzer=Crashing(), progress=None)
+    assert len(read_output(output)) == 6
+    
+    stats = run_job(str(source), output, batch_size=3, analyzer=sentiment_analyzer, progress=None)
+    assert stats["resumed_from"] == 6
+    assert [row["line"] for row in read_output(output)] == list(range(len(sample_texts) * 2))
+    
+    with pytest.raises(ValueError):
+        run_job(str(source), output, shard=(0, 2), analyzer=sentiment_analyzer, progress=None)
+
+def test_invalid_utf8_line(sentiment_analyzer, sample_texts, tmp_path):
+    """Test that a line of invalid UTF-8 gets an error row instead of aborting the job."""
+    source = tmp_path / "input.txt"
+    lines = [sample_texts[0].encode(), b"\xff\xfe broken", sample_texts[1].encode()]
+    source.write_bytes(b"\n".join(lines) + b"\n")
+    output = str(tmp_path / "output.jsonl")
+    stats = run_job(str(source), output, analyzer=sentiment_analyzer, progress=None)
+    rows = read_output(output)
+    
+    assert [row.get("text") for row in rows] == [sample_texts[0], None, sample_texts[1]]
+    assert "error" in rows[1] and rows[1]["line"] == 1
+    assert stats["errors"] == 1
+
+def test_short_csv_row(sentiment_analyzer, tmp_path):
+    """Test that a CSV row with missing fields gets an error row."""
+    source = tmp_path / "input.csv"
+    source.write_text("id,text\n1,good\n2\n3,bad\n")
+    output = str(tmp_path / "output.jsonl")
+    stats = run_job(str(source), output, analyzer=sentiment_analyzer, progress=None)
+    rows = read_output(output)
+    
+    assert [row.get("id") for row in rows] == ["1", None, "3"]
+    assert "error" in rows[1] and rows[1]["line"] == 2
+    assert stats["errors"] == 1
+
+def test_invalid_utf8_header(sentiment_analyzer, tmp_path):
+    """Test that a CSV header of invalid UTF-8 is reported as a ValueError."""
+    source = tmp_path / "input.csv"
+    source.write_bytes(b"id,t\xffext\n1,good\n")
+    with pytest.raises(ValueError, match="UTF-8"):
+        run_job(str(source), str(tmp_path / "output.jsonl"), analyzer=sentiment_analyzer, progress=None)
+
+def test_resume_rejects_different_parsing(sentiment_analyzer, tmp_path):
+    """Test that a checkpoint is not reused with another format or text field."""
+    source = tmp_path / "input.jsonl"
+    source.write_text(json.dumps({"text": "good", "body": "bad"}) + "\n")
+    output = str(tmp_path / "output.jsonl")
+    run_job(str(source), output, analyzer=sentiment_analyzer, progress=None)
+    
+    with pytest.raises(ValueError):
+        run_job(str(source), output, text_field="body", analyzer=sentiment_analyzer, progress=None)
+    with pytest.raises(ValueError):
+        run_job(str(source), output, input_format="txt", analyzer=sentiment_analyzer, progress=None)
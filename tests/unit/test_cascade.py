@@ -0,0 +1,69 @@
+"""
+Unit tests for the confidence-gated cascade.
+
+This module contains unit tests for HashedNgramClassifier and
+CascadeAnalyzer, including training, persistence, routing by threshold and
+the agreement report.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import pytest
+from app.utils.cascade import CascadeAnalyzer, HashedNgramClassifier, distill
+
+POSITIVE = ["i love it", "great product", "really great service", "love this so much", "excellent and great"]
+NEGATIVE = ["i hate it", "terrible product", "really awful service", "hate this so much", "awful and terrible"]
+
+@pytest.fixture
+def classifier():
+    """Fixture providing a classifier trained on a toy dataset."""
+    texts = POSITIVE + NEGATIVE
+    labels = [1] * len(POSITIVE) + [0] * len(NEGATIVE)
+    return HashedNgramClassifier(num_features=1024).fit(texts, labels, epochs=50)
+
+def test_classifier_learns(classifier):
+    """Test that the classifier separates the training data."""
+    label_ids, confidences = classifier.predict(["love it, great!", "terrible, I hate it"])
+    assert label_ids.tolist() == [1, 0]
+    assert all(0.5 < confidence <= 1 for confidence in confidences)
+
+def test_featurize_is_deterministic():
+    """Test that hashed features are normalized and stable across instances."""
+    indices, values, row_ids = HashedNgramClassifier(num_features=64).featurize(["a b a", ""])
+    again = HashedNgramClassifier(num_features=64).featurize(["a b a", ""])
+    assert indices.tolist() == again[0].tolist()
+    assert set(row_ids.tolist()) == {0}
+    assert abs(float((values ** 2).sum()) - 1) < 1e-6
+
+def test_save_and_load(classifier, tmp_path):
+    """Test that a saved classifier makes the same predictions after loading."""
+    path = str(tmp_path / "first_stage.npz")
+    classifier.save(path)
+    loaded = HashedNgramClassifier.load(path)
+    assert loaded.labels == classifier.labels
+    assert (loaded.predict_proba(POSITIVE) == classifier.predict_proba(POSITIVE)).all()
+
+def test_cascade_routing(classifier, sentiment_analyzer, sample_texts):
+    """Test that the threshold decides which stage answers each text."""
+    everything_fast = CascadeAnalyzer(classifier, sentiment_analyzer, threshold=0.0)
+    assert {r["stage"] for r in everything_fast.analyze(sample_texts)} == {"fast"}
+    
+    everything_slow = CascadeAnalyzer(classifier, sentiment_analyzer, threshold=1.01)
+    results = everything_slow.analyze(sample_texts)
+    assert {r["stage"] for r in results} == {"transformer"}
+    assert [r["text"] for r in results] == sample_texts
+    assert everything_slow.stats() == {"fast_count": 0, "transformer_count": 5, "fast_share": 0.0}
+
+def test_cascade_single_text(classifier, sentiment_analyzer, positive_text):
+    """Test that a single text returns a single result with a stage."""
+    result = CascadeAnalyzer(classifier, sentiment_analyzer).analyze(positive_text)
+    assert result["text"] == positive_text
+    assert result["stage"] in ["fast", "transformer"]
+
+def test_distill_and_report(sentiment_analyzer, sample_texts):
+    """Test that a classifier distilled from the transformer agrees with it on its training data."""
+    first_stage = distill(sample_texts * 4, sentiment_analyzer, epochs=30)
+    report = CascadeAnalyzer(first_stage, sentiment_analyzer, threshold=0.0).report(sample_texts)
+    assert report["total_texts"] == len(sample_texts)
+    assert report["fast_share"] == 1.0
+    assert report["first_stage_agreement"] == report["cascade_agreement"] == 1.0
@@ -0,0 +1,189 @@
+"""
+Unit tests for distributed scoring.
+
+This module contains unit tests for the Coordinator and its workers,
+including ordered results, re-queuing after lost connections and missed
+heartbeats, worker errors, authentication and local worker processes.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import json
+import socket
+import threading
+
+import pytest
+from app.utils.distributed import Coordinator, main, run_worker, start_local_workers
+
+def start_worker(coordinator, analyzer, **options):
+    """Run a worker in a background thread."""
+    thread = threading.Thread(
+        target=run_worker, args=(*coordinator.address, analyzer), kwargs=options, daemon=True
+    )
+    thread.start()
+    return thread
+
+def fake_worker(coordinator):
+    """Connect a raw socket that registers as a worker but never replies."""
+    sock = socket.create_connection(coordinator.address)
+    sock.sendall(b'{"type": "hello", "name": "fake", "labels": {}}\n')
+    assert coordinator.wait_for_workers(1, 5)
+    return sock
+
+def test_results_in_input_order(sentiment_analyzer, sample_texts, positive_text):
+    """Test that batches spread over two workers come back in input order."""
+    with Coordinator(port=0, batch_size=2) as coordinator:
+        start_worker(coordinator, sentiment_analyzer, name="a")
+        start_worker(coordinator, sentiment_analyzer, name="b")
+        assert coordinator.wait_for_workers(2, 5)
+        
+        assert coordinator.analyze(sample_texts, timeout=30) == sentiment_analyzer.analyze(sample_texts)
+        assert coordinator.analyze(positive_text, timeout=30) == sentiment_analyzer.analyze(positive_text)
+        assert coordinator.analyze([]) == []
+        stats = coordinator.stats()
+    
+    assert sorted(stats["workers"]) == ["a", "b"]
+    assert sum(worker["completed"] for worker in stats["workers"].values()) == 4
+
+def test_requeue_on_closed_connection(sentiment_analyzer, sample_texts):
+    """Test that a worker's batches are re-queued when its connection drops."""
+    with Coordinator(port=0, batch_size=2) as coordinator:
+        sock = fake_worker(coordinator)
+        future = coordinator.submit(sample_texts)
+        assert json.loads(sock.makefile("rb").readline())["type"] == "batch"
+        sock.close()
+        start_worker(coordinator, sentiment_analyzer)
+        
+        assert future.result(30) == sentiment_analyzer.analyze(sample_texts)
+        assert coordinator.stats()["lost_workers"] == 1
+        assert coordinator.stats()["requeued_batches"] == 2
+
+def test_requeue_on_missed_heartbeats(sentiment_analyzer, sample_texts):
+    """Test that a silent worker is dropped after the heartbeat timeout."""
+    with Coordinator(port=0, batch_size=2, heartbeat_timeout=0.3) as coordinator:
+        sock = fake_worker(coordinator)
+        future = coordinator.submit(sample_texts)
+        start_worker(coordinator, sentiment_analyzer, heartbeat_interval=0.05)
+        
+        assert future.result(30) == sentiment_analyzer.analyze(sample_texts)
+        assert coordinator.workers() != ["fake"]
+        assert coordinator.stats()["lost_workers"] == 1
+        sock.close()
+
+def test_batch_lost_too_often(sample_texts):
+    """Test that a job fails once a batch is lost on max_attempts workers."""
+    with Coordinator(port=0, max_attempts=1) as coordinator:
+        sock = fake_worker(coordinator)
+        future = coordinator.submit(sample_texts)
+        sock.makefile("rb").readline()
+        sock.close()
+        
+        with pytest.raises(RuntimeError, match="lost"):
+            future.result(5)
+
+def test_worker_error_fails_job(sentiment_analyzer, sample_texts):
+    """Test that an exception on a worker fails the job."""
+    class BrokenAnalyzer:
+        model_manager = sentiment_analyzer.model_manager
+
+        def _infer_chunked(self, texts):
+            raise ValueError("out of memory")
+    
+    with Coordinator(port=0) as coordinator:
+        start_worker(coordinator, BrokenAnalyzer())
+        with pytest.raises(RuntimeError, match="out of memory"):
+            coordinator.analyze(sample_texts, timeout=5)
+
+def test_malformed_result_fails_batch(sample_texts):
+    """Test that a result without predictions fails its job but keeps the worker."""
+    with Coordinator(port=0) as coordinator:
+        sock = fake_worker(coordinator)
+        future = coordinator.submit(sample_texts)
+        batch = json.loads(sock.makefile("rb").readline())
+        frames = [
+            "[1]",
+            json.dumps({"type": "result", "batch": [batch["batch"]]}),
+            json.dumps({"type": "result", "batch": batch["batch"]})
+        ]
+        sock.sendall("".join(frame + "\n" for frame in frames).encode("utf-8"))
+        
+        with pytest.raises(RuntimeError, match="malformed result"):
+            future.result(5)
+        assert coordinator.workers() == ["fake"]
+        sock.close()
+
+def test_token_required(sentiment_analyzer):
+    """Test that workers without the shared token are turned away."""
+    with Coordinator(port=0, token="secret") as coordinator:
+        start_worker(coordinator, sentiment_analyzer, token="wrong")
+        assert not coordinator.wait_for_workers(1, 0.5)
+        
+        start_worker(coordinator, sentiment_analyzer, token="secret")
+        assert coordinator.wait_for_workers(1, 5)
+
+def test_worker_skips_unexpected_messages(sentiment_analyzer, positive_text):
+    """Test that malformed or unknown frames do not stop a worker."""
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        worker = threading.Thread(
+            target=run_worker,
+            args=(*server.getsockname()[:2], sentiment_analyzer),
+            kwargs={"heartbeat_interval": 60},
+            daemon=True
+        )
+        worker.start()
+        sock, _ = server.accept()
+        with sock, sock.makefile("rb") as reader:
+            assert json.loads(reader.readline())["type"] == "hello"
+            frames = [
+                "not json",
+                "[1]",
+                json.dumps({"type": "ping"}),
+                json.dumps({"type": "batch"}),
+                json.dumps({"type": "batch", "batch": 7, "texts": [positive_text]})
+            ]
+            sock.sendall("".join(frame + "\n" for frame in frames).encode("utf-8"))
+            reply = json.loads(reader.readline())
+            sock.sendall(b'{"type": "shutdown"}\n')
+            worker.join(5)
+    
+    assert reply["type"] == "result" and reply["batch"] == 7
+    assert not worker.is_alive()
+
+def test_local_worker_processes(sentiment_analyzer, sample_texts):
+    """Test scoring with worker processes standing in for nodes."""
+    expected = sentiment_analyzer.analyze(sample_texts)
+    with Coordinator(port=0, batch_size=2) as coordinator:
+        processes = start_local_workers(coordinator.address, 2, threads_per_worker=1)
+        try:
+            assert coordinator.wait_for_workers(2, 120)
+            results = coordinator.analyze(sample_texts, timeout=60)
+        finally:
+            coordinator.close()
+            for process in processes:
+                process.wait(30)
+    
+    assert [result["sentiment"] for result in results] == [result["sentiment"] for result in expected]
+    assert [result["confidence"] for result in results] == pytest.approx(
+        [result["confidence"] for result in expected], abs=1e-4
+    )
+    assert all(process.returncode == 0 for process in processes)
+
+def test_score_command_with_remote_worker(sentiment_analyzer, sample_texts, tmp_path):
+    """Test the score command with a worker that connects on its own."""
+    with socket.create_server(("127.0.0.1", 0)) as probe:
+        port = probe.getsockname()[1]
+    input_path = tmp_path / "texts.txt"
+    input_path.write_text("\n".join(sample_texts) + "\n", encoding="utf-8")
+    output_path = tmp_path / "scores.jsonl"
+    worker = threading.Thread(
+        target=run_worker, args=("127.0.0.1", port, sentiment_analyzer), daemon=True
+    )
+    worker.start()
+    
+    assert main(["score", str(input_path), str(output_path), "--port", str(port), "--workers", "1"]) == 0
+    
+    with open(output_path, encoding="utf-8") as f:
+        results = [json.loads(line) for line in f]
+    assert results == sentiment_analyzer.analyze(sample_texts)
+    worker.join(5)
+    assert not worker.is_alive()
@@ -0,0 +1,88 @@
+"""
+Unit tests for inference metrics.
+
+This module contains unit tests for MetricsRegistry, including stage timing,
+collectors, the Prometheus export and the instrumentation recorded by
+SentimentAnalyzer when metrics are enabled.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import pytest
+from app.utils.metrics import Histogram, MetricsRegistry, get_metrics
+
+@pytest.fixture
+def metrics():
+    """Fixture enabling the shared registry for one test."""
+    registry = get_metrics()
+    registry.reset()
+    registry.enable()
+    yield registry
+    registry.disable()
+    registry.reset()
+
+def test_disabled_registry_records_nothing():
+    """Test that timing is a no-op while the registry is disabled."""
+    registry = MetricsRegistry(enabled=False)
+    with registry.time("forward"):
+        pass
+    assert registry.stage_timings() == {}
+    assert registry.snapshot()["histograms"] == {}
+
+def test_histogram_buckets():
+    """Test that histogram buckets are cumulative and end with +Inf."""
+    histogram = Histogram([1, 5])
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("1", 2), ("5", 3), ("+Inf", 4)]
+    assert histogram.sum == 14.5
+
+def test_stage_timings_and_counters():
+    """Test that timed stages and counters show up in the snapshot."""
+    registry = MetricsRegistry(enabled=True)
+    with registry.time("tokenize"):
+        pass
+    registry.inc("sentiment_tokens_total", 12)
+    timings = registry.stage_timings()
+    assert timings["tokenize"]["count"] == 1
+    assert registry.snapshot()["counters"] == {"sentiment_tokens_total": 12}
+
+def test_collectors_export_numeric_gauges():
+    """Test that collector values are exported as gauges, skipping non-numbers."""
+    registry = MetricsRegistry()
+    registry.register_collector("cache", lambda: {"hits": 3, "hit_rate": 0.75, "name": "lru"})
+    assert registry.snapshot()["gauges"] == {
+        "sentiment_cache_hits": 3, "sentiment_cache_hit_rate": 0.75
+    }
+    registry.unregister_collector("cache")
+    assert registry.snapshot()["gauges"] == {}
+
+def test_prometheus_format():
+    """Test the Prometheus text exposition output."""
+    registry = MetricsRegistry(enabled=True)
+    registry.observe("sentiment_stage_seconds", 0.002, {"stage": "forward"})
+    registry.inc("sentiment_padding_tokens_total", 5)
+    text = registry.to_prometheus()
+    assert "# TYPE sentiment_stage_seconds histogram" in text
+    assert 'sentiment_stage_seconds_bucket{stage="forward",le="0.0025"} 1' in text
+    assert 'sentiment_stage_seconds_count{stage="forward"} 1' in text
+    assert "# TYPE sentiment_padding_tokens_total counter" in text
+    assert "sentiment_padding_tokens_total 5" in text
+    assert text.endswith("\n")
+
+def test_analyzer_records_stages(metrics, sentiment_analyzer, sample_texts):
+    """Test that a batch records every stage, its size and its padding."""
+    sentiment_analyzer.analyze(sample_texts)
+    timings = metrics.stage_timings()
+    assert {"tokenize", "forward", "postprocess"} <= set(timings)
+    snapshot = metrics.snapshot()
+    assert snapshot["histograms"]["sentiment_batch_size"]["count"] == 1
+    assert snapshot["counters"]["sentiment_tokens_total"] > 0
+    assert 0 < snapshot["counters"]["sentiment_padding_tokens_total"] < snapshot["counters"]["sentiment_tokens_total"]
+
+def test_analyzer_disabled_metrics(sentiment_analyzer, sample_texts):
+    """Test that nothing is recorded when metrics are disabled."""
+    registry = get_metrics()
+    registry.reset()
+    sentiment_analyzer.analyze(sample_texts)
+    assert registry.snapshot()["histograms"] == {}
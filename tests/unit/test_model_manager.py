@@ -0,0 +1,108 @@
+"""
+Unit tests for the model manager.
+
+This module contains unit tests for ModelManager, including device selection
+and the reduced-precision inference modes.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import pytest
+import torch
+from app.models.model_manager import ModelManager
+from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+def test_default_precision(model_manager):
+    """Test that the model loads in fp32 by default."""
+    model, tokenizer = model_manager.get_model_and_tokenizer()
+    
+    assert model_manager.precision == "fp32"
+    assert next(model.parameters()).dtype == torch.float32
+    assert tokenizer is not None
+
+def test_invalid_precision():
+    """Test that unknown precisions are rejected."""
+    with pytest.raises(ValueError):
+        ModelManager(precision="fp8")
+
+def test_int8_quantizes_linear_layers(sample_texts):
+    """Test that int8 mode replaces Linear layers and still predicts."""
+    manager = ModelManager(precision="int8")
+    model, _ = manager.get_model_and_tokenizer()
+    
+    assert manager.precision == "int8"
+    assert str(manager.get_device()) == "cpu"
+    assert not any(type(module) is torch.nn.Linear for module in model.modules())
+    
+    results = SentimentAnalyzer(model_manager=manager).analyze(sample_texts)
+    assert all(r["sentiment"] in ["POSITIVE", "NEGATIVE"] for r in results)
+
+@pytest.mark.filterwarnings("ignore:bf16 is not supported")
+def test_bf16_precision(sample_texts):
+    """Test that bf16 mode predicts or falls back to fp32 when unsupported."""
+    manager = ModelManager(precision="bf16")
+    
+    assert manager.precision in ["bf16", "fp32"]
+    results = SentimentAnalyzer(model_manager=manager).analyze(sample_texts)
+    assert all(0 <= r["confidence"] <= 1 for r in results)
+
+def test_invalid_backend():
+    """Test that unknown backends are rejected."""
+    with pytest.raises(ValueError):
+        ModelManager(backend="onnx")
+
+def assert_same_results(results, expected):
+    """Assert that two result lists agree on labels and, closely, on confidences."""
+    assert [r["sentiment"] for r in results] == [r["sentiment"] for r in expected]
+    assert [r["confidence"] for r in results] == pytest.approx(
+        [r["confidence"] for r in expected], abs=1e-4
+    )
+
+def test_torchscript_backend_matches_eager(sentiment_analyzer, sample_texts):
+    """Test that the traced backend is used on CPU and matches eager mode."""
+    manager = ModelManager(backend="torchscript", warmup_shapes=[(1, 8), (2, 16)])
+    results = SentimentAnalyzer(model_manager=manager).analyze(sample_texts)
+    
+    assert manager.backend == "torchscript"
+    assert_same_results(results, sentiment_analyzer.analyze(sample_texts))
+
+@pytest.mark.skipif(not hasattr(torch, "compile"), reason="torch.compile unavailable")
+@pytest.mark.filterwarnings("ignore:compile backend unavailable")
+def test_compile_backend_matches_eager(sentiment_analyzer, sample_texts):
+    """Test that the compiled backend, or its eager fallback, matches eager mode."""
+    manager = ModelManager(backend="compile", warmup_shapes=[(1, 8), (2, 16)])
+    results = SentimentAnalyzer(model_manager=manager).analyze(sample_texts)
+    
+    assert manager.backend in ["compile", "eager"]
+    assert_same_results(results, sentiment_analyzer.analyze(sample_texts))
+
+@pytest.mark.parametrize(
+    "backend,target", [("torchscript", "jit.trace"), ("compile", "compile")]
+)
+def test_backend_falls_back_to_eager(monkeypatch, sample_texts, backend, target):
+    """Test that a failing tracer or compiler falls back to eager with a warning."""
+    def broken(*args, **kwargs):
+        raise RuntimeError("no compiler available")
+    
+    monkeypatch.setattr(f"torch.{target}", broken)
+    message = f"{backend} backend unavailable.*falling back to eager"
+    with pytest.warns(RuntimeWarning, match=message):
+        manager = ModelManager(backend=backend)
+    
+    assert manager.backend == "eager"
+    results = SentimentAnalyzer(model_manager=manager).analyze(sample_texts)
+    assert len(results) == len(sample_texts)
+
+def test_forward_with_embeddings_matches_hidden_states(model_manager, sample_texts):
+    """Test that the hooked embeddings match the model's own hidden states."""
+    model, tokenizer = model_manager.get_model_and_tokenizer()
+    inputs = tokenizer(sample_texts, padding=True, return_tensors="pt")
+    logits, pooled = model_manager.forward_with_embeddings(
+        inputs["input_ids"], inputs["attention_mask"]
+    )
+    with torch.no_grad():
+        outputs = model(**inputs, output_hidden_states=True)
+    
+    assert torch.allclose(logits, outputs.logits)
+    assert torch.allclose(pooled, outputs.hidden_states[-1][:, 0])
+    assert not model.base_model._forward_hooks
@@ -0,0 +1,76 @@
+"""
+Unit tests for the multi-model registry.
+
+This module contains unit tests for ModelRegistry, including lazy loading,
+per-model label maps, LRU eviction under a memory budget and tokenizer
+sharing, using small random models saved locally.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import pytest
+from app.models.model_registry import ModelRegistry
+from app.utils.benchmark import build_tiny_model
+
+@pytest.fixture(scope="module")
+def model_dirs(tmp_path_factory):
+    """Fixture providing two small random models with the same vocabulary."""
+    root = tmp_path_factory.mktemp("models")
+    return build_tiny_model(str(root / "a"), seed=0), build_tiny_model(str(root / "b"), seed=1)
+
+def test_models_load_lazily(model_dirs):
+    """Test that no model is loaded until it is first used."""
+    registry = ModelRegistry({"a": {"model_name": model_dirs[0]}}, default_model="a")
+    assert registry.loaded_models() == []
+    assert registry.get_analyzer() is registry.get_analyzer("a")
+    assert registry.loaded_models() == ["a"]
+    assert registry.loads == 1
+
+def test_per_model_labels(model_dirs, positive_text):
+    """Test that each model reports sentiments with its own label map."""
+    registry = ModelRegistry({
+        "a": {"model_name": model_dirs[0]},
+        "b": {"model_name": model_dirs[1], "labels": {0: "BAD", 1: "GOOD"}}
+    })
+    assert registry.get_analyzer("a").analyze(positive_text)["sentiment"] in ["POSITIVE", "NEGATIVE"]
+    assert registry.get_analyzer("b").analyze(positive_text)["sentiment"] in ["BAD", "GOOD"]
+    assert registry.get_analyzer("b").analyze_columnar([positive_text])[0]["sentiment"] in ["BAD", "GOOD"]
+
+def test_unknown_model():
+    """Test that selecting an unregistered model raises ValueError."""
+    with pytest.raises(ValueError):
+        ModelRegistry({}).get_analyzer("missing")
+
+def test_lru_eviction_under_budget(model_dirs):
+    """Test that the least recently used model is evicted when over budget."""
+    registry = ModelRegistry({"a": {"model_name": model_dirs[0]}, "b": {"model_name": model_dirs[1]}})
+    registry.memory_budget_bytes = int(registry.get_model_manager("a").memory_bytes() * 1.5)
+    registry.get_analyzer("b")
+    assert registry.loaded_models() == ["b"]
+    assert registry.evictions == 1
+    assert registry.memory_bytes() <= registry.memory_budget_bytes
+
+def test_recently_used_model_is_kept(model_dirs):
+    """Test that using a model moves it to the back of the eviction order."""
+    registry = ModelRegistry({
+        "a": {"model_name": model_dirs[0]},
+        "b": {"model_name": model_dirs[1]},
+        "c": {"model_name": model_dirs[0], "labels": {0: "BAD", 1: "GOOD"}}
+    })
+    registry.get_analyzer("a")
+    registry.get_analyzer("b")
+    registry.get_analyzer("a")
+    registry.memory_budget_bytes = registry.memory_bytes()
+    registry.get_analyzer("c")
+    assert registry.loaded_models() == ["a", "c"]
+
+def test_tokenizers_are_shared(model_dirs):
+    """Test that models with identical tokenizers share one instance."""
+    registry = ModelRegistry({"a": {"model_name": model_dirs[0]}, "b": {"model_name": model_dirs[1]}})
+    first = registry.get_model_manager("a")
+    second = registry.get_model_manager("b")
+    assert first.tokenizer is second.tokenizer
+    assert registry.stats()["tokenizers"] == 1
+    registry.evict("a")
+    registry.evict("b")
+    assert registry.stats()["tokenizers"] == 0
@@ -0,0 +1,39 @@
+"""
+Unit tests for precision parity checks.
+
+This module contains unit tests for the parity report that compares
+reduced-precision inference against fp32.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+from app.utils.parity import check_precision_parity, compare_analyzers
+
+def test_identical_analyzers_agree(sentiment_analyzer, sample_texts):
+    """Test that an analyzer compared with itself fully agrees."""
+    report = compare_analyzers(sample_texts, sentiment_analyzer, sentiment_analyzer)
+    
+    assert report["total_texts"] == len(sample_texts)
+    assert report["disagreements"] == 0
+    assert report["label_agreement"] == 1.0
+    assert report["max_confidence_drift"] == 0.0
+    assert report["passed"] is True
+
+def test_empty_reference_set(sentiment_analyzer):
+    """Test the report for an empty reference set."""
+    report = compare_analyzers([], sentiment_analyzer, sentiment_analyzer)
+    
+    assert report["total_texts"] == 0
+    assert report["passed"] is True
+
+def test_int8_parity_report(sentiment_analyzer, sample_texts):
+    """Test the int8 parity report against the fp32 reference."""
+    report = check_precision_parity(
+        sample_texts, "int8", min_agreement=0.0, reference=sentiment_analyzer
+    )
+    
+    assert report["precision"] == "int8"
+    assert 0 <= report["label_agreement"] <= 1
+    assert report["disagreements"] == round((1 - report["label_agreement"]) * len(sample_texts))
+    assert 0 <= report["mean_confidence_drift"] <= report["max_confidence_drift"] <= 1
+    assert report["passed"] is True
@@ -0,0 +1,87 @@
+"""
+Unit tests for the pipelined batch executor.
+
+This module contains unit tests for PipelinedExecutor, including output
+ordering, bounded look-ahead, error propagation and its use by
+SentimentAnalyzer.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import threading
+
+import pytest
+from app.utils.pipeline import PipelinedExecutor
+from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+def test_outputs_in_order():
+    """Test that outputs come back in input order."""
+    executor = PipelinedExecutor(lambda x: x + 1, lambda x: x * 2, str, depth=2)
+    
+    assert list(executor.run(range(10))) == [str((i + 1) * 2) for i in range(10)]
+    executor.close()
+
+def test_stages_run_on_background_threads():
+    """Test that prepare and finish run off the calling thread."""
+    threads = {}
+    
+    def record(stage):
+        def run(value):
+            threads.setdefault(stage, threading.current_thread().name)
+            return value
+        return run
+    
+    executor = PipelinedExecutor(record("prepare"), record("execute"), record("finish"))
+    list(executor.run(range(3)))
+    executor.close()
+    
+    assert threads["execute"] == threading.current_thread().name
+    assert threads["prepare"].startswith("pipeline-prepare")
+    assert threads["finish"].startswith("pipeline-finish")
+
+def test_look_ahead_is_bounded():
+    """Test that the producer never runs more than depth items ahead."""
+    pulled = []
+    executed = []
+    
+    def source():
+        for i in range(20):
+            pulled.append(i)
+            yield i
+    
+    def execute(value):
+        assert len(pulled) - len(executed) <= 3
+        executed.append(value)
+        return value
+    
+    executor = PipelinedExecutor(lambda x: x, execute, lambda x: x, depth=2)
+    assert list(executor.run(source())) == list(range(20))
+    executor.close()
+
+def test_errors_propagate():
+    """Test that an exception in a background stage reaches the caller."""
+    def fail(value):
+        if value == 3:
+            raise RuntimeError("tokenizer failure")
+        return value
+    
+    executor = PipelinedExecutor(fail, lambda x: x, lambda x: x)
+    with pytest.raises(RuntimeError):
+        list(executor.run(range(5)))
+    executor.close()
+
+def test_invalid_depth():
+    """Test that a non-positive depth is rejected."""
+    with pytest.raises(ValueError):
+        PipelinedExecutor(str, str, str, depth=0)
+
+def test_pipelined_analyzer_matches(sentiment_analyzer, sample_texts):
+    """Test that the pipelined analyzer gives the same results."""
+    pipelined = SentimentAnalyzer(
+        batch_size=2, model_manager=sentiment_analyzer.model_manager, pipelined=True
+    )
+    texts = sample_texts * 3
+    sentiment_analyzer.batch_size = 2
+    
+    assert pipelined.analyze(texts) == sentiment_analyzer.analyze(texts)
+    pipelined.pipeline.close()
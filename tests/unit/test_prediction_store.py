@@ -0,0 +1,105 @@
+"""
+Unit tests for the persistent prediction store.
+
+This module contains unit tests for PredictionStore, including bulk lookup and
+insert, model fingerprint invalidation, compaction and its integration with
+SentimentAnalyzer.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import pytest
+from app.utils.prediction_store import PredictionStore, main, model_fingerprint
+
+@pytest.fixture
+def store_path(tmp_path):
+    """Fixture for a temporary prediction store location."""
+    return str(tmp_path / "predictions.db")
+
+def test_lookup_and_insert(store_path):
+    """Test bulk insert followed by bulk lookup."""
+    store = PredictionStore(store_path)
+    store.insert(["Great!", "Terrible!"], [(1, 0.9), (0, 0.8)])
+    
+    assert store.lookup(["Terrible!", "Unknown", "  Great! "]) == [(0, 0.8), None, (1, 0.9)]
+    store.close()
+
+def test_predictions_persist_across_instances(store_path):
+    """Test that predictions survive reopening the store."""
+    store = PredictionStore(store_path)
+    store.insert(["Great!"], [(1, 0.9)])
+    store.close()
+    
+    reopened = PredictionStore(store_path)
+    assert reopened.lookup(["Great!"]) == [(1, 0.9)]
+    reopened.close()
+
+def test_model_change_invalidates(store_path):
+    """Test that predictions from another model fingerprint are not returned."""
+    old = PredictionStore(store_path, fingerprint=model_fingerprint("old-model"))
+    old.insert(["Great!"], [(1, 0.9)])
+    old.close()
+    
+    store = PredictionStore(store_path, fingerprint=model_fingerprint("new-model"))
+    assert store.lookup(["Great!"]) == [None]
+    assert store.stats()["stale_rows"] == 1
+    assert model_fingerprint("old-model", precision="int8") != model_fingerprint("old-model")
+    
+    assert store.compact() == 1
+    assert store.stats()["stale_rows"] == 0
+    store.close()
+
+def test_invalidate_current_model(store_path):
+    """Test explicit invalidation of the current fingerprint."""
+    store = PredictionStore(store_path)
+    store.insert(["a", "b"], [(1, 0.9), (0, 0.7)])
+    
+    assert store.invalidate() == 2
+    assert store.lookup(["a", "b"]) == [None, None]
+    store.close()
+
+def test_large_bulk_lookup(store_path):
+    """Test lookups larger than one SQL statement chunk."""
+    store = PredictionStore(store_path)
+    texts = [f"text {i}" for i in range(1200)]
+    store.insert(texts, [(i % 2, 0.5) for i in range(1200)])
+    
+    assert store.lookup(texts) == [(i % 2, 0.5) for i in range(1200)]
+    store.close()
+
+def test_compact_command(store_path, capsys):
+    """Test the compaction command line interface."""
+    PredictionStore(store_path, fingerprint="stale").insert(["a"], [(1, 0.9)])
+    
+    assert main(["compact", store_path]) == 0
+    assert "Removed 1 stale predictions" in capsys.readouterr().out
+
+def test_compact_command_keeps_current_precision(store_path, capsys):
+    """Test that compaction keeps rows written under the given precision."""
+    store = PredictionStore(store_path, fingerprint=model_fingerprint(precision="int8"))
+    store.insert(["a"], [(1, 0.9)])
+    store.close()
+    
+    assert main(["compact", store_path, "--precision", "int8"]) == 0
+    assert "Removed 0 stale predictions" in capsys.readouterr().out
+    assert main(["compact", store_path]) == 0
+    assert "Removed 1 stale predictions" in capsys.readouterr().out
+
+def test_missing_path():
+    """Test that a store requires a path."""
+    with pytest.raises(ValueError):
+        PredictionStore(None)
+
+def test_analyzer_uses_store(sentiment_analyzer, sample_texts, store_path):
+    """Test that stored predictions are reused instead of re-running the model."""
+    sentiment_analyzer.store = PredictionStore(store_path)
+    first = sentiment_analyzer.analyze(sample_texts)
+    
+    def fail(texts):
+        raise AssertionError(f"unexpected inference for {texts}")
+    
+    sentiment_analyzer._infer_chunked = fail
+    second = sentiment_analyzer.analyze(sample_texts)
+    
+    assert [r["sentiment"] for r in second] == [r["sentiment"] for r in first]
+    assert [r["confidence"] for r in second] == pytest.approx([r["confidence"] for r in first])
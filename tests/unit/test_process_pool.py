@@ -0,0 +1,72 @@
+"""
+Unit tests for the multi-process analyzer pool.
+
+This module contains unit tests for ProcessPoolAnalyzer, including result
+ordering across workers, thread partitioning and recovery from worker crashes.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import os
+
+import pytest
+from app.utils.process_pool import ProcessPoolAnalyzer, _worker_infer
+
+def _crash_once(texts):
+    """Worker task that kills its process the first time it runs."""
+    marker = os.environ["SENTIMENT_TEST_CRASH_MARKER"]
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return _worker_infer(texts)
+
+def _always_crash(texts):
+    """Worker task that always kills its process."""
+    os._exit(1)
+
+def test_thread_partitioning():
+    """Test that threads are split evenly across workers by default."""
+    pool = ProcessPoolAnalyzer(num_workers=2)
+    
+    assert pool.threads_per_worker == max(1, (os.cpu_count() or 1) // 2)
+    assert ProcessPoolAnalyzer(num_workers=2, threads_per_worker=3).threads_per_worker == 3
+
+def test_invalid_configuration():
+    """Test that invalid pool sizes are rejected."""
+    with pytest.raises(ValueError):
+        ProcessPoolAnalyzer(num_workers=2, chunk_size=0)
+    with pytest.raises(ValueError):
+        ProcessPoolAnalyzer(num_workers=0)
+    with pytest.raises(ValueError):
+        ProcessPoolAnalyzer(num_workers=-1)
+    with pytest.raises(ValueError):
+        ProcessPoolAnalyzer(num_workers=2, threads_per_worker=0)
+
+def test_pool_matches_analyzer(sentiment_analyzer, sample_texts):
+    """Test that pooled results match in-process results, in order."""
+    texts = sample_texts * 3
+    with ProcessPoolAnalyzer(num_workers=2, threads_per_worker=1, chunk_size=4) as pool:
+        results = pool.analyze(texts)
+        single = pool.analyze(sample_texts[0])
+    expected = sentiment_analyzer.analyze(texts)
+    
+    assert [r["text"] for r in results] == texts
+    assert [r["sentiment"] for r in results] == [r["sentiment"] for r in expected]
+    assert single["text"] == sample_texts[0]
+
+def test_pool_requeues_after_crash(sample_texts, tmp_path, monkeypatch):
+    """Test that chunks are re-queued when a worker process dies."""
+    monkeypatch.setenv("SENTIMENT_TEST_CRASH_MARKER", str(tmp_path / "crashed"))
+    with ProcessPoolAnalyzer(num_workers=1, threads_per_worker=1, chunk_size=2) as pool:
+        pool._task = _crash_once
+        results = pool.analyze(sample_texts)
+    
+    assert [r["text"] for r in results] == sample_texts
+    assert pool.restarts == 1
+
+def test_pool_gives_up_after_max_restarts(sample_texts):
+    """Test that repeated crashes raise instead of retrying forever."""
+    with ProcessPoolAnalyzer(num_workers=1, threads_per_worker=1, max_restarts=1) as pool:
+        pool._task = _always_crash
+        with pytest.raises(RuntimeError):
+            pool.analyze(sample_texts)
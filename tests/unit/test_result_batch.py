@@ -0,0 +1,93 @@
+"""
+Unit tests for the columnar result batch.
+
+This module contains unit tests for ResultBatch, including conversion to the
+dictionary format, vectorized summaries, filtering, slicing and persistence.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import numpy as np
+import pytest
+from app.utils.result_batch import ResultBatch
+from app.utils.sentiment_utils import get_sentiment_summary
+
+@pytest.fixture
+def batch():
+    """Fixture for a small result batch."""
+    return ResultBatch(
+        ["Great!", "Terrible!", "Okay", "Loved it, 你好"],
+        [1, 0, 0, 1],
+        [0.99, 0.97, 0.45, 0.8]
+    )
+
+def test_to_dicts(batch):
+    """Test conversion to the list-of-dictionaries format."""
+    results = batch.to_dicts()
+    
+    assert results[0] == {
+        "text": "Great!",
+        "sentiment": "POSITIVE",
+        "confidence": pytest.approx(0.99),
+        "is_confident": True
+    }
+    assert results[2]["is_confident"] is False
+
+def test_summary_matches_dict_summary(batch):
+    """Test that the vectorized summary equals the dictionary-based summary."""
+    assert batch.summary() == get_sentiment_summary(batch.to_dicts())
+    assert get_sentiment_summary(batch) == batch.summary()
+
+def test_empty_summary():
+    """Test the summary of an empty batch."""
+    summary = ResultBatch([], [], []).summary()
+    
+    assert summary["total_texts"] == 0
+    assert summary["confidence_rate"] == 0
+
+def test_filter(batch):
+    """Test filtering by sentiment, confidence flag and threshold."""
+    assert list(batch.filter(sentiment="NEGATIVE").texts) == ["Terrible!", "Okay"]
+    assert list(batch.filter(sentiment="NEGATIVE", confident=True).texts) == ["Terrible!"]
+    assert list(batch.filter(min_confidence=0.9).texts) == ["Great!", "Terrible!"]
+    assert len(batch.filter(mask=np.array([True, False, False, False]))) == 1
+    
+    with pytest.raises(ValueError):
+        batch.filter(sentiment="NEUTRAL")
+
+def test_slicing_is_zero_copy(batch):
+    """Test that slices are views into the original columns."""
+    part = batch[1:3]
+    
+    assert len(part) == 2
+    assert np.shares_memory(part.confidences, batch.confidences)
+    assert np.shares_memory(part.label_ids, batch.label_ids)
+    assert part.texts[0] is batch.texts[1]
+
+def test_save_and_load(batch, tmp_path):
+    """Test round-tripping through .npy files."""
+    batch.save(str(tmp_path))
+    loaded = ResultBatch.load(str(tmp_path), mmap_mode="r")
+    
+    assert loaded.to_dicts() == batch.to_dicts()
+
+def test_concatenate(batch):
+    """Test joining batches."""
+    joined = ResultBatch.concatenate([batch[:2], batch[2:]])
+    
+    assert joined.to_dicts() == batch.to_dicts()
+    assert len(ResultBatch.concatenate([])) == 0
+
+def test_mismatched_columns():
+    """Test that columns of different lengths are rejected."""
+    with pytest.raises(ValueError):
+        ResultBatch(["a", "b"], [1], [0.5, 0.6])
+
+def test_analyze_columnar(sentiment_analyzer, sample_texts):
+    """Test that columnar analysis matches dictionary results."""
+    batch = sentiment_analyzer.analyze_columnar(sample_texts)
+    results = sentiment_analyzer.analyze(sample_texts)
+    
+    assert list(batch.texts) == sample_texts
+    assert [r["sentiment"] for r in batch] == [r["sentiment"] for r in results]
+    assert batch.confidences.tolist() == pytest.approx([r["confidence"] for r in results])
@@ -0,0 +1,104 @@
+"""
+Unit tests for the in-memory result cache.
+
+This module contains unit tests for ResultCache, including key construction,
+LRU eviction, memory limits and its integration with SentimentAnalyzer.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import pytest
+from app.utils.result_cache import _ENTRY_BYTES, ResultCache, normalize_text
+
+def test_normalize_text():
+    """Test whitespace normalization of cache keys."""
+    assert normalize_text("  Great \n\t product!  ") == "Great product!"
+
+def test_make_key_depends_on_model_and_text():
+    """Test that keys ignore whitespace but not model settings."""
+    cache = ResultCache(model_name="model-a", max_length=512)
+    other_model = ResultCache(model_name="model-b", max_length=512)
+    other_length = ResultCache(model_name="model-a", max_length=128)
+    other_precision = ResultCache(model_name="model-a", max_length=512, precision="int8")
+    
+    assert cache.make_key("Great  product") == cache.make_key("Great product")
+    assert cache.make_key("Great") != cache.make_key("Terrible")
+    assert cache.make_key("Great") != other_model.make_key("Great")
+    assert cache.make_key("Great") != other_length.make_key("Great")
+    assert cache.make_key("Great") != other_precision.make_key("Great")
+
+def test_get_put_and_counters():
+    """Test hit and miss counting."""
+    cache = ResultCache(max_entries=10)
+    key = cache.make_key("Great!")
+    
+    assert cache.get(key) is None
+    cache.put(key, (1, 0.9))
+    assert cache.get(key) == (1, 0.9)
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["hit_rate"] == 50
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = ResultCache(max_entries=2)
+    cache.put("a", (0, 0.5))
+    cache.put("b", (1, 0.6))
+    cache.get("a")
+    cache.put("c", (1, 0.7))
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == (0, 0.5)
+    assert cache.get("c") == (1, 0.7)
+    assert cache.evictions == 1
+
+def test_memory_limit_eviction():
+    """Test that the byte limit bounds the number of entries."""
+    cache = ResultCache(max_entries=1000, max_bytes=_ENTRY_BYTES * 3)
+    for index in range(5):
+        cache.put(str(index), (1, 0.9))
+    
+    assert len(cache) == 3
+    assert cache.stats()["approx_bytes"] <= _ENTRY_BYTES * 3
+    assert cache.evictions == 2
+
+def test_invalid_limits():
+    """Test that invalid limits are rejected."""
+    with pytest.raises(ValueError):
+        ResultCache(max_entries=0)
+    
+    with pytest.raises(ValueError):
+        ResultCache(max_bytes=1)
+
+def test_analyzer_deduplicates_batch(sentiment_analyzer, sample_texts):
+    """Test that repeated texts in a batch run through the model once."""
+    sentiment_analyzer.cache = ResultCache()
+    calls = []
+    infer = sentiment_analyzer._infer_chunked
+    
+    def counting_infer(texts):
+        calls.append(list(texts))
+        return infer(texts)
+    
+    sentiment_analyzer._infer_chunked = counting_infer
+    texts = sample_texts * 3
+    results = sentiment_analyzer.analyze(texts)
+    
+    assert [r["text"] for r in results] == texts
+    assert calls == [sample_texts]
+    
+    sentiment_analyzer.analyze(sample_texts)
+    assert len(calls) == 1
+    assert sentiment_analyzer.cache.stats()["hits"] == len(sample_texts)
+
+def test_cached_results_match_uncached(sentiment_analyzer, sample_texts):
+    """Test that cached predictions equal fresh predictions."""
+    uncached = sentiment_analyzer.analyze(sample_texts)
+    sentiment_analyzer.cache = ResultCache()
+    sentiment_analyzer.analyze(sample_texts)
+    cached = sentiment_analyzer.analyze(sample_texts)
+    
+    assert cached == uncached
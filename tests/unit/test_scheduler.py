@@ -0,0 +1,155 @@
+"""
+Unit tests for the priority scheduler.
+
+This module contains unit tests for PriorityScheduler, including result
+order, preemption of large requests, deadlines, cancellation and per-lane
+statistics.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import threading
+import time
+
+import pytest
+from app.utils.metrics import get_metrics
+from app.utils.scheduler import DeadlineExceededError, PriorityScheduler
+
+class GatedAnalyzer:
+    """Analyzer that records each chunk and blocks until released."""
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+    
+    def analyze(self, texts):
+        self.calls.append(list(texts))
+        self.started.set()
+        self.release.wait(5)
+        return self.analyzer.analyze(texts)
+
+@pytest.fixture
+def gated(sentiment_analyzer):
+    """Fixture providing a scheduler whose worker can be held on a chunk."""
+    analyzer = GatedAnalyzer(sentiment_analyzer)
+    scheduler = PriorityScheduler(analyzer, chunk_size=2)
+    yield scheduler, analyzer
+    analyzer.release.set()
+    scheduler.close()
+
+def test_results_match_analyzer(sentiment_analyzer, sample_texts, positive_text):
+    """Test that chunked requests return the analyzer's results in order."""
+    scheduler = PriorityScheduler(sentiment_analyzer, chunk_size=2)
+    try:
+        expected = sentiment_analyzer.analyze(sample_texts)
+        assert scheduler.analyze(sample_texts, lane="batch") == expected
+        expected = sentiment_analyzer.analyze(positive_text)
+        assert scheduler.analyze(positive_text) == expected
+        assert scheduler.analyze([]) == []
+    finally:
+        scheduler.close()
+
+def test_high_priority_preempts_large_request(gated):
+    """Test that an interactive request runs at the next chunk boundary."""
+    scheduler, analyzer = gated
+    backfill = scheduler.submit([f"review {i}" for i in range(6)], lane="batch")
+    analyzer.started.wait(5)
+    lookup = scheduler.submit("urgent", lane="interactive")
+    analyzer.release.set()
+    
+    assert lookup.result(5)["text"] == "urgent"
+    assert len(backfill.result(5)) == 6
+    assert analyzer.calls == [
+        ["review 0", "review 1"],
+        ["urgent"],
+        ["review 2", "review 3"],
+        ["review 4", "review 5"]
+    ]
+
+def test_small_requests_share_a_chunk(gated):
+    """Test that queued requests in one lane are analyzed together."""
+    scheduler, analyzer = gated
+    scheduler.submit("first")
+    analyzer.started.wait(5)
+    futures = [scheduler.submit(text) for text in ("a", "b", "c")]
+    analyzer.release.set()
+    
+    assert [future.result(5)["text"] for future in futures] == ["a", "b", "c"]
+    assert analyzer.calls == [["first"], ["a", "b"], ["c"]]
+
+def test_expired_request_dropped_before_inference(gated):
+    """Test that a request past its deadline is never analyzed."""
+    scheduler, analyzer = gated
+    scheduler.submit("first")
+    analyzer.started.wait(5)
+    late = scheduler.submit("late", lane="batch", deadline=0.01)
+    time.sleep(0.05)
+    analyzer.release.set()
+    
+    with pytest.raises(DeadlineExceededError):
+        late.result(5)
+    assert ["late"] not in analyzer.calls
+    assert scheduler.stats()["batch"]["expired"] == 1
+
+def test_cancelled_request_dropped(gated):
+    """Test that a request cancelled while queued is skipped."""
+    scheduler, analyzer = gated
+    scheduler.submit("first")
+    analyzer.started.wait(5)
+    assert scheduler.submit("cancelled").cancel()
+    done = scheduler.submit("kept")
+    analyzer.release.set()
+    
+    assert done.result(5)["text"] == "kept"
+    assert analyzer.calls == [["first"], ["kept"]]
+    assert scheduler.stats()["interactive"]["cancelled"] == 1
+
+def test_lane_stats_and_metrics(sentiment_analyzer, sample_texts):
+    """Test per-lane queue and latency statistics."""
+    scheduler = PriorityScheduler(sentiment_analyzer, chunk_size=2)
+    try:
+        scheduler.analyze(sample_texts, lane="batch")
+        stats = scheduler.stats()
+        
+        assert stats["batch"]["completed"] == 1
+        assert stats["batch"]["chunks"] == (len(sample_texts) + 1) // 2
+        assert stats["batch"]["latency_p95_ms"] > 0
+        assert stats["batch"]["queued_texts"] == 0
+        assert stats["interactive"]["latency_p95_ms"] == 0.0
+        assert "sentiment_scheduler_batch_completed 1" in get_metrics().to_prometheus()
+    finally:
+        scheduler.close()
+    assert "sentiment_scheduler_batch" not in get_metrics().to_prometheus()
+
+def test_named_schedulers_keep_their_metrics(sentiment_analyzer, positive_text):
+    """Test that schedulers need distinct names and export separate metrics."""
+    first = PriorityScheduler(sentiment_analyzer)
+    second = PriorityScheduler(sentiment_analyzer, name="scheduler_backfill")
+    try:
+        with pytest.raises(ValueError):
+            PriorityScheduler(sentiment_analyzer)
+        second.analyze(positive_text)
+        first.close()
+        
+        metrics = get_metrics().to_prometheus()
+        assert "sentiment_scheduler_backfill_interactive_completed 1" in metrics
+        assert "sentiment_scheduler_interactive_completed" not in metrics
+    finally:
+        first.close()
+        second.close()
+    
+    PriorityScheduler(sentiment_analyzer).close()
+
+def test_invalid_arguments(sentiment_analyzer):
+    """Test that unknown lanes and invalid chunk sizes are rejected."""
+    with pytest.raises(ValueError):
+        PriorityScheduler(sentiment_analyzer, chunk_size=0)
+    
+    scheduler = PriorityScheduler(sentiment_analyzer)
+    try:
+        with pytest.raises(ValueError):
+            scheduler.submit("text", lane="urgent")
+    finally:
+        scheduler.close()
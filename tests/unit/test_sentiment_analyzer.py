@@ -7,7 +7,9 @@ including initialization, text processing, and sentiment prediction.
 Author: Ofelia Webb <ofelia.b.webb@gmail.com>
 """
 
+import numpy as np
 import pytest
+import torch
 from app.utils.sentiment_analyzer import SentimentAnalyzer
 from app.config.settings import CONFIDENCE_THRESHOLD
 
@@ -87,4 +89,138 @@ def test_confidence_threshold(sentiment_analyzer):
     result = sentiment_analyzer._analyze_single(text)
     
     assert 0 <= result["confidence"] <= 1
-    assert result["is_confident"] == (result["confidence"] >= CONFIDENCE_THRESHOLD) 
\ No newline at end of file
+    assert result["is_confident"] == (result["confidence"] >= CONFIDENCE_THRESHOLD) 
+def test_analyze_batch_matches_single(sentiment_analyzer, sample_texts):
+    """Test that batched inference matches the per-text path."""
+    batch_results = sentiment_analyzer._analyze_batch(sample_texts)
+    single_results = [sentiment_analyzer._analyze_single(text) for text in sample_texts]
+    
+    for batch_result, single_result in zip(batch_results, single_results):
+        assert batch_result["text"] == single_result["text"]
+        assert batch_result["sentiment"] == single_result["sentiment"]
+        assert batch_result["confidence"] == pytest.approx(single_result["confidence"], abs=1e-4)
+
+def test_analyze_batch_chunking(sentiment_analyzer, sample_texts):
+    """Test that batches larger than batch_size are chunked and keep input order."""
+    sentiment_analyzer.batch_size = 2
+    texts = sample_texts * 3
+    results = sentiment_analyzer._analyze_batch(texts)
+    
+    assert [r["text"] for r in results] == texts
+
+def test_analyze_batch_empty(sentiment_analyzer):
+    """Test batch analysis of an empty list."""
+    assert sentiment_analyzer._analyze_batch([]) == []
+
+def test_invalid_batch_size():
+    """Test that a non-positive batch size is rejected."""
+    with pytest.raises(ValueError):
+        SentimentAnalyzer(batch_size=0)
+
+def test_analyze_bucketed_preserves_order(sentiment_analyzer, sample_texts):
+    """Test that length bucketing returns results in input order."""
+    texts = ["ok", "great " * 200, "bad", "fine " * 50] + sample_texts
+    sentiment_analyzer.batch_size = 2
+    bucketed = sentiment_analyzer.analyze(texts, bucket_by_length=True)
+    plain = sentiment_analyzer.analyze(texts)
+    
+    assert [r["text"] for r in bucketed] == texts
+    for bucketed_result, plain_result in zip(bucketed, plain):
+        assert bucketed_result["sentiment"] == plain_result["sentiment"]
+        assert bucketed_result["confidence"] == pytest.approx(plain_result["confidence"], abs=1e-4)
+
+def test_analyze_bucketed_padding_stats(sentiment_analyzer):
+    """Test that length bucketing reports avoided padding tokens."""
+    texts = ["short", "long " * 100, "tiny", "longer " * 100]
+    sentiment_analyzer.batch_size = 2
+    sentiment_analyzer.analyze(texts, bucket_by_length=True)
+    stats = sentiment_analyzer.last_padding_stats
+    
+    assert stats["padding_tokens"] < stats["unbucketed_padding_tokens"]
+    assert stats["padding_tokens_avoided"] == (
+        stats["unbucketed_padding_tokens"] - stats["padding_tokens"]
+    )
+
+def test_analyze_long_short_documents_match_analyze(sentiment_analyzer, sample_texts):
+    """Test that documents fitting in one window match the regular path."""
+    long_results = sentiment_analyzer.analyze_long(sample_texts)
+    results = sentiment_analyzer.analyze(sample_texts)
+    
+    for long_result, result in zip(long_results, results):
+        assert long_result["windows"] == 1
+        assert long_result["sentiment"] == result["sentiment"]
+        assert long_result["confidence"] == pytest.approx(result["confidence"], abs=1e-4)
+
+@pytest.mark.parametrize("aggregation", ["mean", "weighted", "max_confidence"])
+def test_analyze_long_windows(sentiment_analyzer, aggregation):
+    """Test that long documents are split into overlapping windows."""
+    documents = ["great " * 1200, "bad", "okay " * 600]
+    results = sentiment_analyzer.analyze_long(documents, stride=100, aggregation=aggregation)
+    
+    assert [r["text"] for r in results] == documents
+    assert results[0]["windows"] == 3
+    assert results[1]["windows"] == 1
+    assert results[2]["windows"] == 2
+    for result in results:
+        assert result["sentiment"] in ["POSITIVE", "NEGATIVE"]
+        assert 0 <= result["confidence"] <= 1
+
+def test_analyze_long_single_text(sentiment_analyzer, positive_text):
+    """Test long-document mode with a single text."""
+    result = sentiment_analyzer.analyze_long(positive_text)
+    
+    assert isinstance(result, dict)
+    assert result["text"] == positive_text
+
+def test_analyze_long_invalid_arguments(sentiment_analyzer):
+    """Test that invalid stride and aggregation values are rejected."""
+    with pytest.raises(ValueError):
+        sentiment_analyzer.analyze_long(["text"], aggregation="median")
+    
+    with pytest.raises(ValueError):
+        sentiment_analyzer.analyze_long(["text"], stride=10_000)
+
+def test_analyze_with_embeddings_matches_analyze(sentiment_analyzer, sample_texts):
+    """Test that exported logits and embeddings come from the scoring pass."""
+    results, logits, embeddings = sentiment_analyzer.analyze_with_embeddings(sample_texts)
+    hidden_size = sentiment_analyzer.model_manager.model.config.hidden_size
+    
+    assert logits.shape == (len(sample_texts), 2)
+    assert embeddings.shape == (len(sample_texts), hidden_size)
+    assert logits.flags["C_CONTIGUOUS"] and embeddings.flags["C_CONTIGUOUS"]
+    assert results.to_dicts() == sentiment_analyzer.analyze(sample_texts)
+    expected = torch.softmax(torch.from_numpy(logits), dim=1).max(dim=1).values.numpy()
+    assert np.allclose(results.confidences, expected)
+
+def test_analyze_with_embeddings_batch_invariant(sentiment_analyzer, sample_texts):
+    """Test that embeddings do not depend on how texts are batched."""
+    _, _, embeddings = sentiment_analyzer.analyze_with_embeddings(sample_texts)
+    _, _, single = SentimentAnalyzer(
+        batch_size=1, model_manager=sentiment_analyzer.model_manager
+    ).analyze_with_embeddings(sample_texts, pooling="cls")
+    _, _, mean = sentiment_analyzer.analyze_with_embeddings(sample_texts, pooling="mean")
+    
+    assert np.allclose(embeddings, single, atol=1e-4)
+    assert not np.allclose(embeddings, mean)
+
+def test_analyze_with_embeddings_to_npy(sentiment_analyzer, sample_texts, tmp_path):
+    """Test writing logits and embeddings straight to .npy files."""
+    logits_path = str(tmp_path / "logits.npy")
+    embeddings_path = str(tmp_path / "embeddings.npy")
+    _, logits, embeddings = sentiment_analyzer.analyze_with_embeddings(
+        sample_texts, logits_out=logits_path, embeddings_out=embeddings_path
+    )
+    
+    assert isinstance(embeddings, np.memmap)
+    assert np.array_equal(np.load(logits_path), logits)
+    assert np.array_equal(np.load(embeddings_path, mmap_mode="r"), embeddings)
+
+def test_analyze_with_embeddings_invalid_target(sentiment_analyzer, sample_texts):
+    """Test that a target array of the wrong shape or pooling is rejected."""
+    with pytest.raises(ValueError):
+        sentiment_analyzer.analyze_with_embeddings(
+            sample_texts, logits_out=np.empty((1, 2), dtype=np.float32)
+        )
+    
+    with pytest.raises(ValueError):
+        sentiment_analyzer.analyze_with_embeddings(sample_texts, pooling="max")
@@ -7,8 +7,21 @@ including text analysis and summary statistics generation.
 Author: Ofelia Webb <ofelia.b.webb@gmail.com>
 """
 
+import subprocess
+import sys
+import threading
+
 import pytest
-from app.utils.sentiment_utils import analyze_sentiment, get_sentiment_summary
+from app.config.settings import DEFAULT_MODEL
+from app.utils.sentiment_utils import (
+    analyze_sentiment,
+    analyze_stream,
+    get_result_cache,
+    get_sentiment_summary,
+    get_startup_report,
+    summarize_stream,
+    warmup
+)
 
 def test_analyze_sentiment_single(positive_text):
     """Test sentiment analysis for a single text."""
@@ -93,4 +106,136 @@ def test_get_sentiment_summary_counts(results, expected_positive, expected_negat
     """Test summary statistics counting."""
     summary = get_sentiment_summary(results)
     assert summary["positive_count"] == expected_positive
-    assert summary["negative_count"] == expected_negative 
\ No newline at end of file
+    assert summary["negative_count"] == expected_negative
+
+def test_get_result_cache_counts_repeats(positive_text):
+    """Test that the singleton analyzer serves repeated texts from its cache."""
+    cache = get_result_cache()
+    assert cache is not None
+    
+    analyze_sentiment(positive_text)
+    hits = cache.hits
+    analyze_sentiment(positive_text)
+    assert cache.hits == hits + 1
+
+def test_analyze_stream_matches_batch(sample_texts):
+    """Test that streaming yields the same results as batch analysis, in order."""
+    streamed = list(analyze_stream(iter(sample_texts), batch_size=2))
+    batched = analyze_sentiment(sample_texts)
+    
+    assert [r["text"] for r in streamed] == sample_texts
+    assert [r["sentiment"] for r in streamed] == [r["sentiment"] for r in batched]
+
+def test_analyze_stream_is_lazy(sample_texts):
+    """Test that the stream pulls at most one batch ahead of its consumer."""
+    pulled = []
+    
+    def source():
+        for text in sample_texts * 10:
+            pulled.append(text)
+            yield text
+    
+    stream = analyze_stream(source(), batch_size=3)
+    next(stream)
+    assert len(pulled) == 3
+
+def test_analyze_stream_uses_analyzer_batch_size(sample_texts, monkeypatch):
+    """Test that the stream defaults to the analyzer's batch size."""
+    from app.utils import sentiment_utils
+    analyzer = sentiment_utils.get_analyzer()
+    monkeypatch.setattr(analyzer, "batch_size", 3)
+    pulled = []
+    
+    def source():
+        for text in sample_texts * 10:
+            pulled.append(text)
+            yield text
+    
+    stream = analyze_stream(source())
+    next(stream)
+    assert len(pulled) == 3
+
+def test_analyze_stream_invalid_batch_size():
+    """Test that a non-positive batch size is rejected."""
+    with pytest.raises(ValueError):
+        list(analyze_stream(["text"], batch_size=0))
+
+def test_summarize_stream_matches_summary(sample_texts):
+    """Test that the streaming summary equals the list-based summary."""
+    results = analyze_sentiment(sample_texts)
+    
+    assert summarize_stream(iter(results)) == get_sentiment_summary(results)
+    assert summarize_stream(analyze_stream(sample_texts)) == get_sentiment_summary(results)
+
+def test_import_does_not_load_torch():
+    """Test that importing the utilities package defers torch and transformers."""
+    code = (
+        "import sys, app.utils; "
+        "assert 'torch' not in sys.modules; "
+        "assert 'transformers' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_warmup_reports_startup_stages():
+    """Test that warmup loads the model and reports each startup stage."""
+    cache = get_result_cache()
+    entries = len(cache)
+    report = warmup(batch_sizes=(1, 2))
+    
+    for stage in [
+        "import_seconds",
+        "tokenizer_load_seconds",
+        "model_load_seconds",
+        "backend_build_seconds",
+        "first_forward_seconds",
+        "warmup_seconds"
+    ]:
+        assert report[stage] >= 0
+    assert report == get_startup_report()
+    assert len(cache) == entries
+
+def test_analyze_sentiment_model_selector(positive_text):
+    """Test that the default model key uses the singleton and unknown keys are rejected."""
+    assert analyze_sentiment(positive_text, model=DEFAULT_MODEL) == analyze_sentiment(positive_text)
+    with pytest.raises(ValueError):
+        analyze_sentiment(positive_text, model="missing")
+
+def test_get_analyzer_thread_safe(monkeypatch):
+    """Test that concurrent first calls create a single analyzer."""
+    from app.utils import sentiment_utils
+    monkeypatch.setattr(sentiment_utils, "_analyzer", None)
+    barrier = threading.Barrier(4)
+    analyzers = []
+    
+    def load():
+        barrier.wait()
+        analyzers.append(sentiment_utils.get_analyzer())
+    
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(analyzers) == 4
+    assert all(analyzer is analyzers[0] for analyzer in analyzers)
+
+def test_get_analyzer_keys_cache_by_loaded_precision(monkeypatch):
+    """Test that the singleton's cache is keyed by the profile's precision."""
+    import torch
+    from app.utils import sentiment_analyzer, sentiment_utils
+    from app.utils.result_cache import ResultCache
+    profile = {
+        "batch_size": 4,
+        "intra_op_threads": torch.get_num_threads(),
+        "inter_op_threads": torch.get_num_interop_threads(),
+        "precision": "int8",
+        "backend": "eager"
+    }
+    monkeypatch.setattr(sentiment_analyzer, "load_profile", lambda *args, **kwargs: profile)
+    monkeypatch.setattr(sentiment_utils, "_analyzer", None)
+    analyzer = sentiment_utils.get_analyzer()
+    
+    assert analyzer.model_manager.precision == "int8"
+    key = analyzer.cache.make_key("Great")
+    assert key == ResultCache(precision="int8").make_key("Great")
+    assert key != ResultCache().make_key("Great")
@@ -0,0 +1,156 @@
+"""
+Unit tests for the local HTTP inference server.
+
+This module contains unit tests for SentimentServer and InferenceBatcher,
+including single and batch requests, readiness, admission control and
+request timeouts.
+
+Author: Ofelia Webb <ofelia.b.webb@gmail.com>
+"""
+
+import http.client
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from app.server import InferenceBatcher, QueueFullError, SentimentServer
+
+@pytest.fixture
+def server(sentiment_analyzer):
+    """Fixture providing a running server on a free port."""
+    server = SentimentServer(port=0, analyzer=sentiment_analyzer, max_wait_ms=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.ready.wait(5)
+    yield server
+    server.shutdown()
+
+def request(server, path, payload=None):
+    """Send a request and return (status, decoded JSON body)."""
+    host, port = server.address
+    data = json.dumps(payload).encode() if payload is not None else None
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{path}", data, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+def test_analyze_single_text(server, positive_text):
+    """Test that a single text gets a single result."""
+    status, body = request(server, "/analyze", {"text": positive_text})
+    assert status == 200
+    assert body["result"]["text"] == positive_text
+    assert body["result"]["sentiment"] in ["POSITIVE", "NEGATIVE"]
+
+def test_analyze_batch(server, sample_texts):
+    """Test that a batch request gets results in input order."""
+    status, body = request(server, "/analyze", {"texts": sample_texts})
+    assert status == 200
+    assert [r["text"] for r in body["results"]] == sample_texts
+
+def test_invalid_payload(server):
+    """Test that malformed requests are rejected with 400."""
+    assert request(server, "/analyze", {"text": 123})[0] == 400
+    assert request(server, "/analyze", {"texts": ["ok", None]})[0] == 400
+
+def test_invalid_content_length(server):
+    """Test that a missing, malformed or negative Content-Length is rejected."""
+    def post(headers):
+        connection = http.client.HTTPConnection(*server.address, timeout=5)
+        try:
+            connection.putrequest("POST", "/analyze")
+            for name, value in headers.items():
+                connection.putheader(name, value)
+            connection.endheaders()
+            return connection.getresponse().status
+        finally:
+            connection.close()
+    
+    assert post({}) == 411
+    assert post({"Content-Length": "ten"}) == 400
+    assert post({"Content-Length": "-1"}) == 400
+
+def test_batch_larger_than_queue(sentiment_analyzer, sample_texts):
+    """Test that a batch that can never fit in the queue gets 413, not 429."""
+    server = SentimentServer(port=0, analyzer=sentiment_analyzer, max_queue=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        server.ready.wait(5)
+        assert request(server, "/analyze", {"texts": sample_texts})[0] == 413
+        assert request(server, "/analyze", {"texts": sample_texts[:2]})[0] == 200
+    finally:
+        server.shutdown()
+
+def test_health_and_ready(server):
+    """Test the health and readiness endpoints once the model is loaded."""
+    status, body = request(server, "/health")
+    assert status == 200
+    assert body["model_loaded"] is True
+    assert request(server, "/ready") == (200, {"ready": True})
+
+def test_not_ready_until_loaded(sentiment_analyzer, positive_text):
+    """Test that requests get 503 until the model has loaded."""
+    server = SentimentServer(port=0, analyzer=sentiment_analyzer)
+    server.ready.wait(5)
+    server.ready.clear()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert request(server, "/ready")[0] == 503
+        assert request(server, "/analyze", {"text": positive_text})[0] == 503
+    finally:
+        server.shutdown()
+
+def test_queue_full_rejected():
+    """Test that texts beyond the queue bound are rejected all or nothing."""
+    release = threading.Event()
+    
+    def analyze(texts):
+        release.wait(5)
+        return [{"text": text} for text in texts]
+    
+    batcher = InferenceBatcher(analyze, max_queue=2, max_batch_size=1, max_wait_ms=0)
+    try:
+        batcher.submit(["a"])
+        while batcher.queue_depth():  # wait until the worker is busy with "a"
+            time.sleep(0.001)
+        batcher.submit(["b", "c"])
+        with pytest.raises(QueueFullError):
+            batcher.submit(["d", "e", "f"])
+        assert batcher.rejected == 3
+    finally:
+        release.set()
+        batcher.close()
+
+def test_request_timeout(sentiment_analyzer, positive_text):
+    """Test that a request waiting past its timeout gets 504."""
+    release = threading.Event()
+    server = SentimentServer(port=0, analyzer=sentiment_analyzer, request_timeout=0.05)
+    server.ready.wait(5)
+    server.batcher.analyze = lambda texts: release.wait(5) and sentiment_analyzer.analyze(texts)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert request(server, "/analyze", {"text": positive_text})[0] == 504
+    finally:
+        release.set()
+        server.shutdown()
+
+def test_batcher_shares_batches(sentiment_analyzer, sample_texts):
+    """Test that texts queued together are served in one batch."""
+    batcher = InferenceBatcher(sentiment_analyzer.analyze, max_batch_size=len(sample_texts), max_wait_ms=500)
+    try:
+        futures = [batcher.submit([text])[0] for text in sample_texts]
+        assert [f.result(10)["text"] for f in futures] == sample_texts
+        assert batcher.batches_run == 1
+    finally:
+        batcher.close()
+
+def test_metrics_endpoint(server):
+    """Test that /metrics returns Prometheus text including the server queue."""
+    host, port = server.address
+    with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=10) as response:
+        text = response.read().decode()
+    assert response.headers["Content-Type"].startswith("text/plain")
+    assert "sentiment_server_queue_depth 0" in text